@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+import util
+
+WINDOW_WIDTH = 3
+LINE_SET_MEAN_SPEED_THRESHOLD = 0.3
+SPEED_MULTIPLIER_THRESHOLD = 2.0
+SPEED_MULTIPLIER = 3
+MIN_AREA_PCT_ABOVE_THRESH = .01
+
+def _runs(above: np.ndarray, play_starts: np.ndarray) -> np.ndarray:
+    """Start of each run of frames above / below the threshold within a play."""
+    run_starts = play_starts.copy()
+    run_starts[1:] |= above[1:] != above[:-1]
+    return run_starts
+
+def line_set_frames(
+        df_tracking: pd.DataFrame,
+        window_width: int = WINDOW_WIDTH,
+        speed_threshold: float = LINE_SET_MEAN_SPEED_THRESHOLD,
+        speed_multiplier_threshold: float = SPEED_MULTIPLIER_THRESHOLD,
+        speed_multiplier: float = SPEED_MULTIPLIER,
+        min_area_pct_above_thresh: float = MIN_AREA_PCT_ABOVE_THRESH
+    ) -> pd.DataFrame:
+    """Find the line_set frames of every play.
+
+    The mean speed of the offense before the snap is computed per play and
+    frame with a single grouped reduction, then smoothed and split into runs
+    above / below the speed threshold with segmented array operations over
+    all plays at once. Runs above the threshold with less than
+    `min_area_pct_above_thresh` of the play's area (minor player movements)
+    are joined with the runs below it. The line_set frame of each run below
+    the threshold is its slowest frame, with later frames favoured. A play
+    can have multiple line_set frames.
+
+    Args:
+        df_tracking: Tracking data with game_play_id, frame_id, frame_type,
+            offense and s columns.
+        window_width: Width of the centered rolling mean. Defaults to 3.
+        speed_threshold: Mean team speed below which the line is set.
+            Defaults to 0.3.
+        speed_multiplier_threshold: Player speed from which speeds are
+            multiplied. Defaults to 2.0.
+        speed_multiplier: Multiplier of fast player speeds. Defaults to 3.
+        min_area_pct_above_thresh: Minimum share of the area of a run above
+            the threshold. Defaults to .01.
+
+    Returns:
+        DataFrame with game_play_id and frame_id of each line_set frame.
+    """
+    off_players = df_tracking.loc[
+        df_tracking['offense'] & (df_tracking['frame_type'] == 'BEFORE_SNAP'),
+        ['game_play_id', 'frame_id', 's']
+    ]
+    speed = off_players['s'].to_numpy()
+    off_players = off_players.assign(
+        s=np.where(speed >= speed_multiplier_threshold, speed * speed_multiplier, speed)
+    )
+    off_team = off_players.groupby(['game_play_id', 'frame_id'], sort=True, observed=True)['s'].mean()
+
+    game_play_ids = off_team.index.get_level_values('game_play_id').to_numpy()
+    frame_ids = off_team.index.get_level_values('frame_id').to_numpy()
+    play_starts = util.segment_starts(game_play_ids)
+
+    smoothed = util.segmented_rolling_mean(off_team.to_numpy(), play_starts, window_width)
+
+    # The notebook implementation reindexed each play's positional smoothed
+    # speeds by frame_id, so frame f takes the value at position f of the
+    # play (the next frame when frames start at 1). Keep that alignment so
+    # the labels are unchanged.
+    play_first = np.flatnonzero(play_starts)
+    play_ids = np.cumsum(play_starts) - 1
+    play_len = np.diff(np.append(play_first, len(smoothed)))[play_ids]
+    in_play = (frame_ids >= 0) & (frame_ids < play_len)
+    diff = np.full(len(smoothed), np.nan)
+    diff[in_play] = smoothed[play_first[play_ids[in_play]] + frame_ids[in_play]] - speed_threshold
+    above = diff > 0
+
+    # Share of the play's total absolute area of each run
+    run_starts = _runs(above, play_starts)
+    run_idx = np.flatnonzero(run_starts)
+    run_area = np.abs(np.add.reduceat(np.nan_to_num(diff), run_idx)) if len(run_idx) else np.array([])
+    run_play = play_ids[run_idx]
+    play_area = np.bincount(run_play, weights=run_area)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        area_pct = (run_area / play_area[run_play])[np.cumsum(run_starts) - 1]
+
+    # Join small runs above the threshold with the runs below it
+    diff = np.where((area_pct < min_area_pct_above_thresh) & above, -1e-10, diff)
+    above = diff > 0
+    run_ids = np.cumsum(_runs(above, play_starts))
+    diff = diff * (frame_ids / 1e3 + 1)
+
+    # Slowest frame of each run below the threshold (first one on ties)
+    below = np.flatnonzero(~above)
+    order = below[np.lexsort((diff[below], run_ids[below]))]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = run_ids[order][1:] != run_ids[order][:-1]
+    line_set = order[first]
+    line_set = line_set[~np.isnan(diff[line_set])]
+
+    return pd.DataFrame({
+        'game_play_id': game_play_ids[line_set],
+        'frame_id': frame_ids[line_set],
+    })
+
+def add_line_set_event(
+        df_tracking: pd.DataFrame,
+        events_col: str = 'event_new',
+        **kwargs
+    ) -> pd.DataFrame:
+    """Add line_set events to the tracking data.
+
+    Plays without a line_set frame default to the frame before the snap.
+
+    Args:
+        df_tracking: Tracking data.
+        events_col: Column name for the events. Defaults to 'event_new'.
+        kwargs: Thresholds passed to `line_set_frames`.
+
+    Returns:
+        The tracking data with line_set events.
+    """
+    df_line_set = line_set_frames(df_tracking, **kwargs)
+
+    missing = ~df_tracking['game_play_id'].isin(df_line_set['game_play_id'])
+    df_default = (
+        df_tracking.loc[missing & (df_tracking['frame_type'] == 'SNAP'), ['game_play_id', 'frame_id']]
+        .drop_duplicates('game_play_id')
+    )
+    df_default['frame_id'] -= 1
+    for gpid in df_default['game_play_id']:
+        print(f'WARNING: defaulted {gpid}\'s line_set value to one frame before ball snap.')
+
+    line_set_keys = pd.MultiIndex.from_frame(pd.concat([df_line_set, df_default]))
+    is_line_set = pd.MultiIndex.from_frame(df_tracking[['game_play_id', 'frame_id']]).isin(line_set_keys)
+    df_tracking.loc[is_line_set, events_col] = 'line_set'
+
+    return df_tracking
+
+def create_events(
+        df_tracking: pd.DataFrame,
+        events_col: str = 'event_new',
+        **kwargs
+    ) -> pd.DataFrame:
+    """Create events for line set and ball snap.
+
+    Args:
+        df_tracking: Tracking data.
+        events_col: Column name for the events. Defaults to 'event_new'.
+        kwargs: Thresholds passed to `line_set_frames`, e.g.
+            speed_threshold.
+
+    Returns:
+        DataFrame with the new events column.
+    """
+    if events_col in df_tracking.columns:
+        df_tracking.drop(columns=events_col, inplace=True)
+
+    df_tracking[events_col] = np.nan
+
+    df_tracking = add_line_set_event(df_tracking, events_col=events_col, **kwargs)
+
+    # Add 'ball_snap' event
+    df_tracking.loc[df_tracking['frame_type'] == 'SNAP', events_col] = 'ball_snap'
+
+    return df_tracking
+
+def play_catalog(
+        df_tracking: pd.DataFrame,
+        events: list = ('man_in_motion', 'shift'),
+        event_col: str = 'event',
+        key: list = ('game_id', 'play_id')
+    ) -> pd.DataFrame:
+    """Flag which events happen in each play.
+
+    The event column is encoded once against `events` and reduced per play
+    with a single grouped `any`, instead of collecting a list of events for
+    every play and scanning it once per event.
+
+    Args:
+        df_tracking: Tracking data.
+        events: Events to flag. Defaults to ('man_in_motion', 'shift').
+        event_col: Column with the events. Defaults to 'event'.
+        key: Columns identifying a play. Defaults to ('game_id', 'play_id').
+
+    Returns:
+        DataFrame with one row per play with the key columns, a boolean
+        has_{event} column per event and the number of frames n_frames.
+    """
+    key = list(key)
+    event_codes = pd.Categorical(df_tracking[event_col], categories=list(events)).codes
+    df = pd.DataFrame({col: df_tracking[col].to_numpy() for col in key})
+    flag_cols = [f'has_{event}' for event in events]
+    for i, col in enumerate(flag_cols):
+        df[col] = event_codes == i
+    df['frame_id'] = df_tracking['frame_id'].to_numpy()
+
+    catalog = df.groupby(key, sort=True, observed=True).agg(
+        **{col: (col, 'any') for col in flag_cols},
+        n_frames=('frame_id', 'nunique')
+    )
+    return catalog.reset_index()
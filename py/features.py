@@ -0,0 +1,187 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import util
+
+WINDOW_AGGS = {
+    'mean': np.nanmean,
+    'min': np.nanmin,
+    'max': np.nanmax,
+    'sum': np.nansum,
+    'std': np.nanstd,
+}
+BALL_NFL_ID = -1
+
+class SnapIndex:
+    def __init__(
+            self,
+            df_tracking: pd.DataFrame,
+            role_col: str = 'position_by_loc'
+        ) -> None:
+        """Index of tracking data by play, player and frame offset.
+
+        The tracking data is sorted once by game_play_id, nfl_id and frame_id,
+        so the row of any frame relative to an anchor frame of the play, e.g.
+        ball_snap_fid or last_line_set_fid, is a binary search for every
+        player at once. Snapshots and windowed aggregates of many features
+        are then gathered for all players at once, without querying or
+        merging the tracking data per feature.
+
+        Args:
+            df_tracking: Tracking data with game_play_id, nfl_id, frame_id and
+                anchor columns (constant within a play). The football (NaN
+                nfl_id) is one segment per play.
+            role_col: Column used to select players by role. Defaults to
+                'position_by_loc'.
+        """
+        self.df = df_tracking
+        self.role_col = role_col
+
+        game_play_codes, _ = pd.factorize(df_tracking['game_play_id'], sort=True)
+        nfl_ids = df_tracking['nfl_id'].to_numpy()
+        # The football has no nfl_id: a sentinel keeps its rows in one segment per play
+        player_keys = df_tracking['nfl_id'].fillna(BALL_NFL_ID).to_numpy()
+        self.order = np.lexsort((df_tracking['frame_id'].to_numpy(), player_keys, game_play_codes))
+        self.frame_ids = df_tracking['frame_id'].to_numpy()[self.order]
+
+        seg_starts = util.segment_starts(game_play_codes[self.order], player_keys[self.order])
+        self.seg_start = np.flatnonzero(seg_starts)
+
+        # Sorted (segment, frame) keys, so a frame of a segment is one searchsorted
+        self._frame_span = int(np.nanmax(self.frame_ids, initial=0)) + 1
+        self._keys = (np.cumsum(seg_starts) - 1) * self._frame_span + self.frame_ids
+
+        first_rows = self.order[self.seg_start]
+        self.segments = pd.DataFrame({
+            'game_play_id': df_tracking['game_play_id'].to_numpy()[first_rows],
+            'nfl_id': nfl_ids[first_rows],
+        })
+        if role_col in df_tracking.columns:
+            self.segments[role_col] = df_tracking[role_col].to_numpy()[first_rows]
+        self._anchors = {}
+
+    def __len__(self) -> int:
+        return len(self.seg_start)
+
+    def anchor(self, anchor: str) -> np.ndarray:
+        """Anchor frame of each segment."""
+        if anchor not in self._anchors:
+            self._anchors[anchor] = self.df[anchor].to_numpy(dtype=float)[self.order[self.seg_start]]
+        return self._anchors[anchor]
+
+    def rows(
+            self,
+            offset: int,
+            anchor: str = 'ball_snap_fid',
+            segments: np.ndarray | None = None
+        ) -> np.ndarray:
+        """Row of frame `anchor + offset` of each segment.
+
+        Args:
+            offset: Number of frames after the anchor frame.
+            anchor: Column with the anchor frame. Defaults to 'ball_snap_fid'.
+            segments: Positions of the segments. Defaults to None (all).
+
+        Returns:
+            Row positions in `df`, -1 where the player has no such frame.
+        """
+        if segments is None:
+            segments = np.arange(len(self))
+        target = self.anchor(anchor)[segments] + offset
+        ok = ~np.isnan(target) & (target >= 0) & (target < self._frame_span)
+
+        keys = segments[ok] * self._frame_span + target[ok].astype(np.int64)
+        sorted_rows = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = self._keys[sorted_rows] == keys
+
+        rows = np.full(len(segments), -1)
+        rows[np.flatnonzero(ok)[found]] = self.order[sorted_rows[found]]
+        return rows
+
+    def _values(self, column: str, rows: np.ndarray) -> np.ndarray:
+        values = self.df[column].to_numpy(dtype=float)[np.maximum(rows, 0)]
+        return np.where(rows >= 0, values, np.nan)
+
+    def gather(
+            self,
+            features: dict,
+            anchor: str = 'ball_snap_fid',
+            roles: list | None = None
+        ) -> pd.DataFrame:
+        """Gather snapshot and window features of each player.
+
+        Features are given as a dictionary of name to specification:
+            - (column, offset): value of column at frame `anchor + offset`.
+            - (column, (start, stop), agg): agg of column over frames
+              `anchor + start` to `anchor + stop` (inclusive). agg is one of
+              'mean', 'min', 'max', 'sum' or 'std', missing frames are skipped.
+        Each frame offset is looked up once and shared by all features.
+
+        Args:
+            features: Feature specifications by name.
+            anchor: Column with the anchor frame. Defaults to 'ball_snap_fid'.
+            roles: Only gather players with one of these roles. Defaults to
+                None (all players).
+
+        Returns:
+            DataFrame with one row per player with game_play_id, nfl_id, role
+            and feature columns.
+        """
+        segments = np.arange(len(self))
+        if roles is not None:
+            segments = segments[self.segments[self.role_col].isin(roles).to_numpy()]
+
+        offsets = set()
+        for name, spec in features.items():
+            if len(spec) == 2:
+                offsets.add(spec[1])
+            elif len(spec) == 3 and spec[2] in WINDOW_AGGS:
+                offsets.update(range(spec[1][0], spec[1][1] + 1))
+            else:
+                raise ValueError(f"Invalid specification for feature '{name}'. Must be " +
+                                 f"(column, offset) or (column, (start, stop), agg) with agg " +
+                                 f"one of {list(WINDOW_AGGS)}.")
+        rows = {offset: self.rows(offset, anchor, segments) for offset in sorted(offsets)}
+
+        df_features = self.segments.iloc[segments].reset_index(drop=True)
+        for name, spec in features.items():
+            if len(spec) == 2:
+                df_features[name] = self._values(spec[0], rows[spec[1]])
+            else:
+                column, (start, stop), agg = spec
+                window = np.column_stack([
+                    self._values(column, rows[offset]) for offset in range(start, stop + 1)
+                ])
+                with warnings.catch_warnings():
+                    # All-NaN windows (player missing every frame) give NaN
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    df_features[name] = WINDOW_AGGS[agg](window, axis=1)
+        return df_features
+
+    def gather_wide(
+            self,
+            features: dict,
+            anchor: str = 'ball_snap_fid',
+            roles: list | None = None,
+            player_agg: str = 'mean'
+        ) -> pd.DataFrame:
+        """Gather features as a wide table with one row per play.
+
+        Columns are named `{role}_{feature}`. Players sharing a role within a
+        play (e.g. several WRs) are combined with `player_agg`.
+
+        Returns:
+            DataFrame indexed by game_play_id.
+        """
+        df_features = self.gather(features, anchor, roles)
+        df_wide = df_features.pivot_table(
+            index='game_play_id',
+            columns=self.role_col,
+            values=list(features),
+            aggfunc=player_agg,
+            observed=True
+        )
+        df_wide.columns = [f'{role}_{name}' for name, role in df_wide.columns]
+        return df_wide
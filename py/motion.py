@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+import util
+
+MOVING_THRESHOLD = 1.0
+N_FRAMES_NOT_MOVING = 15
+SPEED_WINDOW_WIDTH = 3
+
+def _motion_frames_loop(
+        moving: np.ndarray,
+        seg_first: np.ndarray,
+        seg_snap: np.ndarray,
+        n_frames_not_moving: int
+    ) -> np.ndarray:
+    """Scan each segment backwards from the snap, see `motion_frames`."""
+    motion_frame = np.zeros(len(moving), dtype=np.bool_)
+    for seg in range(len(seg_first)):
+        first, snap = seg_first[seg], seg_snap[seg]
+        if snap < 0:
+            continue
+
+        # Last moving frame before the snap
+        last_moving = -1
+        for idx in range(snap - 1, first - 1, -1):
+            if moving[idx]:
+                last_moving = idx
+                break
+        if last_moving < 0:
+            continue
+
+        # Move backwards, stopping after n_frames_not_moving non moving frames
+        start = last_moving
+        for idx in range(last_moving - 1, first - 1, -1):
+            if moving[idx]:
+                start = idx
+            elif start - idx > n_frames_not_moving:
+                break
+        motion_frame[start:last_moving + 1] = True
+    return motion_frame
+
+_motion_frames_jit = njit(cache=True)(_motion_frames_loop) if njit is not None else None
+
+def speed_profiles(
+        df_tracking: pd.DataFrame,
+        window_width: int = SPEED_WINDOW_WIDTH,
+        columns: list = ()
+    ) -> pd.DataFrame:
+    """Smoothed speed of every player of every play.
+
+    Rows are sorted into (game_play_id, nfl_id) segments ordered by frame,
+    and the centered rolling mean of every segment is computed in a single
+    segmented pass. The table is indexed by the sorted game_play_id, so the
+    rows of a play are a binary search away (`profiles.loc[gpid:gpid]`).
+    This is what `PlaySpeedViewer` slices instead of scanning the tracking
+    data. Pass `s_smoothed` as the speed_col of `motion_frames` to detect
+    motion on the smoothed speed.
+
+    Args:
+        df_tracking: Tracking data with game_play_id, nfl_id, frame_id and s
+            columns, e.g. only the rows of the motion players.
+        window_width: Width of the centered rolling mean. Defaults to 3.
+        columns: Other columns kept in the table, e.g. ['frame_type',
+            'motion_frame']. Defaults to ().
+
+    Returns:
+        DataFrame indexed by game_play_id with nfl_id, frame_id, s,
+        s_smoothed and the requested columns.
+    """
+    game_play_codes, _ = pd.factorize(df_tracking['game_play_id'], sort=True)
+    order = np.lexsort((
+        df_tracking['frame_id'].to_numpy(),
+        df_tracking['nfl_id'].to_numpy(),
+        game_play_codes,
+    ))
+    profiles = df_tracking[['game_play_id', 'nfl_id', 'frame_id', 's', *columns]].take(order)
+    seg_starts = util.segment_starts(game_play_codes[order], profiles['nfl_id'].to_numpy())
+    profiles['s_smoothed'] = util.segmented_rolling_mean(profiles['s'].to_numpy(), seg_starts, window_width)
+    return profiles.set_index('game_play_id')
+
+def motion_frames(
+        df_motion: pd.DataFrame,
+        moving_threshold: float = MOVING_THRESHOLD,
+        n_frames_not_moving: int = N_FRAMES_NOT_MOVING,
+        use_numba: bool | None = None,
+        speed_col: str = 's'
+    ) -> pd.Series:
+    """Find the frames of the last motion before the snap of each player.
+
+    Working backwards from the snap, the motion ends at the last frame a
+    player is moving (speed of at least `moving_threshold`) and starts at the
+    earliest moving frame reachable without a gap of more than
+    `n_frames_not_moving` frames that are not moving.
+
+    Rows are split into (game_play_id, nfl_id) segments ordered by frame, and
+    the boundaries of every segment are found at once with cumulative array
+    operations. With `use_numba` the same backwards scan runs as a compiled
+    loop over the segment offsets instead.
+
+    Args:
+        df_motion: Tracking data of the motion players with game_play_id,
+            nfl_id, frame_id, frame_type and speed columns.
+        moving_threshold: Speed from which a player is moving. Defaults to 1.0.
+        n_frames_not_moving: Number of frames a player can stop without
+            ending the motion. Defaults to 15.
+        use_numba: Use the Numba kernel. Defaults to None (use it when Numba
+            is installed).
+        speed_col: Column of the speeds, e.g. s_smoothed of
+            `speed_profiles`. Defaults to 's'.
+
+    Returns:
+        Boolean Series aligned with `df_motion`, True for motion frames.
+        Segments without a SNAP frame have no motion frames.
+    """
+    if use_numba and _motion_frames_jit is None:
+        raise ValueError("use_numba=True but numba is not installed.")
+    if use_numba is None:
+        use_numba = _motion_frames_jit is not None
+
+    game_play_codes, _ = pd.factorize(df_motion['game_play_id'], sort=True)
+    order = np.lexsort((
+        df_motion['frame_id'].to_numpy(),
+        df_motion['nfl_id'].to_numpy(),
+        game_play_codes,
+    ))
+    game_play_ids = game_play_codes[order]
+    nfl_ids = df_motion['nfl_id'].to_numpy()[order]
+    moving = (df_motion[speed_col].to_numpy() >= moving_threshold)[order]
+    is_snap = (df_motion['frame_type'] == 'SNAP').to_numpy()[order]
+
+    n_rows = len(order)
+    seg_starts = util.segment_starts(game_play_ids, nfl_ids)
+    seg_first = np.flatnonzero(seg_starts)
+    seg_ids = np.cumsum(seg_starts) - 1
+    positions = np.arange(n_rows)
+
+    # First SNAP row of each segment (-1 if there is none)
+    seg_snap = np.full(len(seg_first), -1)
+    snap_rows = np.flatnonzero(is_snap)[::-1]
+    seg_snap[seg_ids[snap_rows]] = snap_rows
+
+    if use_numba:
+        motion_sorted = _motion_frames_jit(moving, seg_first, seg_snap, n_frames_not_moving)
+    else:
+        # Last moving row before the snap of each segment
+        before_snap = moving & (positions < seg_snap[seg_ids])
+        last_moving = np.full(len(seg_first), -1)
+        last_moving[seg_ids[before_snap]] = positions[before_snap]
+
+        # The motion starts after the last gap of more than n_frames_not_moving
+        # between moving rows (or at the first moving row of the segment)
+        moving_rows = np.flatnonzero(moving)
+        gap_break = np.ones(len(moving_rows), dtype=bool)
+        gap_break[1:] = (
+            (seg_ids[moving_rows[1:]] != seg_ids[moving_rows[:-1]]) |
+            (moving_rows[1:] - moving_rows[:-1] - 1 > n_frames_not_moving)
+        )
+        run_start = np.maximum.accumulate(np.where(gap_break, moving_rows, -1))
+        start = np.full(n_rows, -1)
+        start[moving_rows] = run_start
+
+        # Mark [start, last_moving] of each segment with a difference array
+        has_motion = last_moving >= 0
+        bounds = np.zeros(n_rows + 1, dtype=np.int64)
+        np.add.at(bounds, start[last_moving[has_motion]], 1)
+        np.add.at(bounds, last_moving[has_motion] + 1, -1)
+        motion_sorted = np.cumsum(bounds[:-1]) > 0
+
+    motion_frame = np.empty(n_rows, dtype=bool)
+    motion_frame[order] = motion_sorted
+    return pd.Series(motion_frame, index=df_motion.index, name='motion_frame')
+
+def add_motion_frame(
+        df_motion: pd.DataFrame,
+        moving_threshold: float = MOVING_THRESHOLD,
+        n_frames_not_moving: int = N_FRAMES_NOT_MOVING,
+        use_numba: bool | None = None,
+        speed_col: str = 's'
+    ) -> pd.DataFrame:
+    """Add the moving and motion_frame columns, see `motion_frames`."""
+    df_motion['moving'] = df_motion[speed_col] >= moving_threshold
+    df_motion['motion_frame'] = motion_frames(df_motion, moving_threshold, n_frames_not_moving, use_numba, speed_col)
+    return df_motion
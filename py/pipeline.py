@@ -0,0 +1,504 @@
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import inspect
+import logging
+import argparse
+import multiprocessing
+from os.path import join
+
+import pandas as pd
+from tqdm import tqdm
+
+import events
+import motion
+import stages
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.pipeline.json'
+PY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Stage:
+    def __init__(
+            self,
+            name: str,
+            func: callable,
+            outputs: list,
+            inputs: list = (),
+            sources: list = (),
+            params: dict | None = None,
+            version: str = ''
+        ) -> None:
+        """A per-week step of the processing pipeline.
+
+        Args:
+            name: Name of the stage.
+            func: Called as `func(week, **inputs, **params)`. Returns a
+                DataFrame, or a tuple of DataFrames when there are several
+                outputs.
+            outputs: File names written under `wk{week}/`, e.g.
+                ['tracking_final.pkl'].
+            inputs: Names of upstream stages. Their outputs are passed to
+                func as keyword arguments named after the stage.
+            sources: Raw files read by func, formatted with the week, e.g.
+                'data/raw/tracking_week_{week}.csv'.
+            params: Parameters passed to func, e.g.
+                {'speed_threshold': 0.3}. Defaults to None.
+            version: Bump to invalidate the stage when something
+                `code_hash` does not cover changes, e.g. a third-party
+                package. Defaults to ''.
+        """
+        self.name = name
+        self.func = func
+        self.outputs = [outputs] if isinstance(outputs, str) else list(outputs)
+        self.inputs = list(inputs)
+        self.sources = list(sources)
+        self.params = params or {}
+        self.version = version
+
+    def code_hash(self) -> str:
+        """Hash of the code of func and of the repo code it depends on.
+
+        Covers the source of func, of the functions and the values of the
+        constants of its module which it references (recursively), and the
+        files of the repo modules (under py/) which any of them use, with
+        the repo modules those import. Editing e.g. events.py invalidates
+        every stage calling into it.
+        """
+        sources, paths = _code_dependencies(self.func)
+        digest = hashlib.sha256()
+        for source in sources:
+            digest.update(source.encode('utf-8'))
+        for path in sorted(paths):
+            digest.update(os.path.relpath(path, PY_DIR).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+def _repo_file(obj) -> str | None:
+    """Path of the repo module (under py/) defining obj, if any."""
+    module = obj if inspect.ismodule(obj) else inspect.getmodule(obj)
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    return path if path.startswith(PY_DIR + os.sep) else None
+
+def _code_names(code) -> set:
+    """Global names used by a code object and the code nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+def _module_dependencies(path: str, module, paths: set) -> None:
+    """Add a repo module file and the repo modules it imports to paths."""
+    if path in paths:
+        return
+    paths.add(path)
+    for value in vars(module).values():
+        if inspect.ismodule(value) or inspect.isclass(value) or inspect.isfunction(value):
+            dependency = _repo_file(value)
+            if dependency is not None:
+                _module_dependencies(dependency, inspect.getmodule(value), paths)
+
+def _code_dependencies(func: callable) -> tuple:
+    """Sources and repo module files a function depends on.
+
+    Returns:
+        The sources of func and of the functions of its module it references
+        (constants as their repr), and the set of paths of the repo modules
+        referenced by any of them, see `Stage.code_hash`.
+    """
+    sources, paths, seen = [], set(), set()
+    stack = [func]
+    while stack:
+        func = stack.pop()
+        if id(func) in seen:
+            continue
+        seen.add(id(func))
+        try:
+            sources.append(inspect.getsource(func))
+        except (OSError, TypeError):
+            sources.append(getattr(func, '__qualname__', repr(func)))
+        code = getattr(func, '__code__', None)
+        if code is None:
+            continue
+        module_globals = func.__globals__
+        for name in sorted(_code_names(code)):
+            if name not in module_globals:
+                continue
+            value = module_globals[name]
+            if inspect.isfunction(value) and value.__globals__ is module_globals:
+                stack.append(value)
+            elif inspect.ismodule(value) or inspect.isclass(value) or inspect.isfunction(value):
+                path = _repo_file(value)
+                if path is not None:
+                    _module_dependencies(path, inspect.getmodule(value), paths)
+            elif isinstance(value, (bool, int, float, str, tuple, list, dict, set, frozenset)):
+                sources.append(f'{name} = {value!r}')
+    return sources, paths
+
+def _source_fingerprint(path: str) -> list:
+    """Size and modification time of a raw file (None if it is missing)."""
+    if not os.path.exists(path):
+        return [path, None, None]
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+class Pipeline:
+    def __init__(
+            self,
+            stages: list,
+            processed_data_path: str
+        ) -> None:
+        """Incremental runner of per-week stages.
+
+        Each stage of each week is cached under a key hashing the stage's
+        code, parameters and raw source files, and the keys of its upstream
+        stages. Running the pipeline only recomputes the (stage, week) pairs
+        whose key changed, e.g. after changing LINE_SET_MEAN_SPEED_THRESHOLD
+        or adding a new week of tracking data, plus everything downstream of
+        them. Weeks are independent and can run in parallel.
+
+        Outputs are written to `{processed_data_path}/wk{week}/`, the same
+        files the notebooks read, and the keys to a manifest next to them.
+
+        Args:
+            stages: The stages. Upstream stages must be listed in `stages`.
+            processed_data_path: Root directory of the processed data.
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name '{stage.name}'.")
+            self.stages[stage.name] = stage
+        self.processed_data_path = processed_data_path
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list:
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline at stage '{name}'.")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'.")
+            visiting.add(name)
+            for upstream in self.stages[name].inputs:
+                visit(upstream)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _required(self, targets: list | None) -> list:
+        """Stages needed for the targets, in topological order."""
+        if targets is None:
+            return self.order
+        required, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'.")
+            if name not in required:
+                required.add(name)
+                stack.extend(self.stages[name].inputs)
+        return [name for name in self.order if name in required]
+
+    def week_dir(self, week: int) -> str:
+        return join(self.processed_data_path, f'wk{week}')
+
+    def discover_weeks(self) -> list:
+        """Weeks with the raw files of every per-week source.
+
+        Sources without `{week}` (e.g. games.csv) do not restrict the weeks.
+        """
+        weeks = None
+        for stage in self.stages.values():
+            for source in stage.sources:
+                if '{week}' not in source:
+                    continue
+                pattern = re.compile(re.escape(source).replace(re.escape('{week}'), r'(\d+)') + '$')
+                found = {
+                    int(match.group(1))
+                    for path in glob.glob(source.replace('{week}', '*'))
+                    if (match := pattern.match(path))
+                }
+                weeks = found if weeks is None else weeks & found
+        return sorted(weeks or [])
+
+    def keys(self, week: int, targets: list | None = None) -> dict:
+        """Cache key of each stage for a week."""
+        keys = {}
+        for name in self._required(targets):
+            stage = self.stages[name]
+            payload = {
+                'stage': name,
+                'code': stage.code_hash(),
+                'version': stage.version,
+                'params': stage.params,
+                'inputs': [keys[upstream] for upstream in stage.inputs],
+                'sources': [_source_fingerprint(source.format(week=week)) for source in stage.sources],
+            }
+            encoded = json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')
+            keys[name] = hashlib.sha256(encoded).hexdigest()
+        return keys
+
+    def _read_manifest(self, week: int) -> dict:
+        path = join(self.week_dir(week), MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_manifest(self, week: int, manifest: dict) -> None:
+        path = join(self.week_dir(week), MANIFEST_NAME)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _is_cached(self, week: int, name: str, key: str, manifest: dict) -> bool:
+        return manifest.get(name) == key and all(
+            os.path.exists(join(self.week_dir(week), output)) for output in self.stages[name].outputs
+        )
+
+    def _load(self, week: int, name: str):
+        outputs = [pd.read_pickle(join(self.week_dir(week), output)) for output in self.stages[name].outputs]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+    def _save(self, week: int, name: str, result) -> None:
+        outputs = self.stages[name].outputs
+        results = [result] if len(outputs) == 1 else list(result)
+        if len(results) != len(outputs):
+            raise ValueError(f"Stage '{name}' returned {len(results)} outputs, expected {len(outputs)}.")
+        for output, df in zip(outputs, results):
+            path = join(self.week_dir(week), output)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            df.to_pickle(tmp_path, compression=None)
+            os.replace(tmp_path, path)
+
+    def run_week(
+            self,
+            week: int,
+            targets: list | None = None,
+            force: bool = False
+        ) -> list:
+        """Run the stages of a single week, skipping cached ones.
+
+        Returns:
+            One record per stage with week, stage, status ('cached',
+            'computed', 'failed' or 'skipped'), key, seconds and error.
+        """
+        os.makedirs(self.week_dir(week), exist_ok=True)
+        keys = self.keys(week, targets)
+        manifest = self._read_manifest(week)
+        loaded, failed, records = {}, set(), []
+
+        def get(name):
+            if name not in loaded:
+                loaded[name] = self._load(week, name)
+            return loaded[name]
+
+        for name in self._required(targets):
+            stage = self.stages[name]
+            record = {'week': week, 'stage': name, 'key': keys[name], 'seconds': 0., 'error': None}
+            if any(upstream in failed for upstream in stage.inputs):
+                failed.add(name)
+                records.append({**record, 'status': 'skipped', 'error': 'upstream stage failed'})
+                continue
+            if not force and self._is_cached(week, name, keys[name], manifest):
+                records.append({**record, 'status': 'cached'})
+                continue
+
+            start = time.perf_counter()
+            try:
+                inputs = {upstream: get(upstream) for upstream in stage.inputs}
+                result = stage.func(week, **inputs, **stage.params)
+                self._save(week, name, result)
+            except Exception as e:
+                failed.add(name)
+                records.append({**record, 'status': 'failed', 'seconds': time.perf_counter() - start,
+                                'error': f'{type(e).__name__}: {e}'})
+                continue
+            loaded[name] = result
+            manifest[name] = keys[name]
+            self._write_manifest(week, manifest)
+            records.append({**record, 'status': 'computed', 'seconds': time.perf_counter() - start})
+        return records
+
+    def _run_week_task(self, task: tuple) -> list:
+        week, targets, force = task
+        return self.run_week(week, targets, force)
+
+    def run(
+            self,
+            weeks: list | None = None,
+            targets: list | None = None,
+            workers: int = 1,
+            force: bool = False
+        ) -> pd.DataFrame:
+        """Run the pipeline for several weeks.
+
+        Args:
+            weeks: Weeks to run. Defaults to None (`discover_weeks`).
+            targets: Stages to bring up to date, with their upstream stages.
+                Defaults to None (all stages).
+            workers: Number of weeks run in parallel processes. Defaults to 1.
+            force: Recompute cached stages. Defaults to False.
+
+        Returns:
+            DataFrame with one row per week and stage, see `run_week`.
+        """
+        if weeks is None:
+            weeks = self.discover_weeks()
+        tasks = [(week, targets, force) for week in weeks]
+
+        records = []
+        if workers > 1 and len(tasks) > 1:
+            ctx = multiprocessing.get_context('fork')
+            with ctx.Pool(min(workers, len(tasks))) as pool:
+                for week_records in tqdm(pool.imap_unordered(self._run_week_task, tasks), total=len(tasks)):
+                    records.extend(week_records)
+        else:
+            for task in tqdm(tasks):
+                records.extend(self._run_week_task(task))
+
+        df_report = pd.DataFrame(records, columns=['week', 'stage', 'status', 'seconds', 'key', 'error'])
+        df_report = df_report.sort_values(['week', 'stage'], key=lambda col: (
+            col if col.name == 'week' else col.map(self.order.index)
+        )).reset_index(drop=True)
+        for row in df_report.query('status == "failed"').itertuples():
+            logger.warning(f'Week {row.week} stage {row.stage} failed: {row.error}')
+        return df_report
+
+def default_stages(
+        raw_data_path: str,
+        processed_data_path: str,
+        line_set_speed_threshold: float = events.LINE_SET_MEAN_SPEED_THRESHOLD,
+        motion_speed_threshold: float = stages.MOTION_SPEED_THRESHOLD,
+        moving_threshold: float = motion.MOVING_THRESHOLD,
+        n_frames_not_moving: int = motion.N_FRAMES_NOT_MOVING,
+        speed_window_width: int | None = None
+    ) -> list:
+    """The stages of the notebooks, from the raw tracking data to the run concept features.
+
+    tracking (notebook 01) -> tracking_final (02) -> motion_plays (03) and
+    run_concept (04). The stages read run_plays.pkl and players.pkl, see
+    `stages.write_season_data`.
+
+    Args:
+        raw_data_path: Directory of the raw competition CSVs.
+        processed_data_path: Root directory of the processed data.
+        line_set_speed_threshold: Mean team speed below which the line is
+            set. Defaults to LINE_SET_MEAN_SPEED_THRESHOLD.
+        motion_speed_threshold: Speed from which a player is moving when
+            finding the motion player. Defaults to MOTION_SPEED_THRESHOLD.
+        moving_threshold: Speed from which the motion player is moving when
+            finding the motion frames. Defaults to MOVING_THRESHOLD.
+        n_frames_not_moving: Number of frames the motion player can stop
+            without ending the motion. Defaults to N_FRAMES_NOT_MOVING.
+        speed_window_width: Width of the rolling mean of the speed the
+            motion frames are found on, see `motion.speed_profiles`.
+            Defaults to None (the raw speed).
+
+    Returns:
+        The stages, to run with `Pipeline`.
+    """
+    run_plays_path = join(processed_data_path, 'run_plays.pkl')
+    players_path = join(processed_data_path, 'players.pkl')
+    season_sources = [join(raw_data_path, name) for name in ['games.csv', 'plays.csv', 'player_play.csv', 'players.csv']]
+    return [
+        Stage(
+            'tracking',
+            stages.filter_run_plays,
+            outputs=stages.TRACKING_TABLES,
+            sources=[join(raw_data_path, 'tracking_week_{week}.csv'), run_plays_path] + season_sources,
+            params={
+                'raw_data_path': raw_data_path,
+                'store_path': join(processed_data_path, 'tracking_store'),
+                'run_plays_path': run_plays_path,
+            }
+        ),
+        Stage(
+            'tracking_final',
+            stages.finalize_tracking,
+            outputs=stages.TRACKING_FINAL_TABLES,
+            inputs=['tracking'],
+            sources=[players_path],
+            params={
+                'players_path': players_path,
+                'line_set_speed_threshold': line_set_speed_threshold,
+                'motion_speed_threshold': motion_speed_threshold,
+            }
+        ),
+        Stage(
+            'motion_plays',
+            stages.classify_motion,
+            outputs='motion_plays.pkl',
+            inputs=['tracking_final'],
+            params={
+                'moving_threshold': moving_threshold,
+                'n_frames_not_moving': n_frames_not_moving,
+                'speed_window_width': speed_window_width,
+            }
+        ),
+        Stage(
+            'run_concept',
+            stages.run_concept_features,
+            outputs='run_concept.pkl',
+            inputs=['tracking_final'],
+            sources=[players_path],
+            params={'players_path': players_path}
+        ),
+    ]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the per-week processing pipeline of the notebooks.')
+    parser.add_argument('--paths', default='paths.json', help='JSON file with the raw_data and processed_data paths.')
+    parser.add_argument('--weeks', type=int, nargs='+', default=None, help='Weeks to run. Defaults to every week with raw data.')
+    parser.add_argument('--targets', nargs='+', default=None, help='Stages to bring up to date. Defaults to all stages.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of weeks run in parallel.')
+    parser.add_argument('--force', action='store_true', help='Recompute cached stages.')
+    parser.add_argument('--line-set-speed-threshold', type=float, default=events.LINE_SET_MEAN_SPEED_THRESHOLD,
+                        help='Mean team speed below which the line is set.')
+    parser.add_argument('--motion-speed-threshold', type=float, default=stages.MOTION_SPEED_THRESHOLD,
+                        help='Speed from which a player is moving when finding the motion player.')
+    parser.add_argument('--moving-threshold', type=float, default=motion.MOVING_THRESHOLD,
+                        help='Speed from which the motion player is moving when finding the motion frames.')
+    parser.add_argument('--n-frames-not-moving', type=int, default=motion.N_FRAMES_NOT_MOVING,
+                        help='Number of frames the motion player can stop without ending the motion.')
+    parser.add_argument('--speed-window-width', type=int, default=None,
+                        help='Find the motion frames on the speed smoothed over this many frames. Defaults to the raw speed.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(args.paths, 'r') as f:
+        paths = json.load(f)
+    stages.write_season_data(paths['raw_data'], paths['processed_data'])
+    pipeline = Pipeline(
+        default_stages(
+            paths['raw_data'],
+            paths['processed_data'],
+            line_set_speed_threshold=args.line_set_speed_threshold,
+            motion_speed_threshold=args.motion_speed_threshold,
+            moving_threshold=args.moving_threshold,
+            n_frames_not_moving=args.n_frames_not_moving,
+            speed_window_width=args.speed_window_width
+        ),
+        paths['processed_data']
+    )
+    df_report = pipeline.run(args.weeks, args.targets, args.workers, args.force)
+    pd.set_option('display.width', 200)
+    print(df_report.to_string(index=False))
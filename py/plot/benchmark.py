@@ -0,0 +1,449 @@
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.font_manager import FontProperties
+
+from plotter import NFLPlayAnimator
+from plot_simple import plot_play_with_speed
+from utils.logo_cache import LogoCache
+from utils.encoder import ffmpeg_available
+
+GAME_ID = 2022091100
+PLAY_ID = 55
+LOS = 35
+YARDS_TO_GO = 10
+
+OFFENSE = [
+    # position, position_by_loc, x offset from the ball, yards behind the LOS
+    ('QB', 'QB', 0, 5),
+    ('RB', 'RB', 0, 7),
+    ('WR', 'WR', -20, 1),
+    ('WR', 'WR', -16, 1),
+    ('WR', 'WR', 20, 1),
+    ('TE', 'TE', 6, 1),
+    ('T', 'LT', -4, 1),
+    ('G', 'LG', -2, 1),
+    ('C', 'C', 0, 1),
+    ('G', 'RG', 2, 1),
+    ('T', 'RT', 4, 1),
+]
+DEFENSE = [
+    ('DE', -5, 1), ('DT', -1.5, 1), ('DT', 1.5, 1), ('DE', 5, 1),
+    ('OLB', -7, 5), ('MLB', 0, 5), ('OLB', 7, 5),
+    ('CB', -20, 7), ('CB', 20, 7), ('SS', -8, 12), ('FS', 8, 14),
+]
+
+DISPLAY_TYPES = ['dots-team', 'dots-positional', 'positions', 'jerseys']
+BASE_CONFIG = {
+    'show_scoreboard': False,
+    'player_display_type': 'dots-team',
+    'show_player_legend': False,
+    'plot_dir_arrows': False,
+    'show_trenches_paths': False,
+}
+STAGES = ['init_animation', 'update_frame', 'draw_frame', 'animate_play_file', 'animate_play_jshtml']
+
+def synthetic_play(
+        n_frames: int = 60,
+        game_id: int = GAME_ID,
+        play_id: int = PLAY_ID,
+        seed: int = 0
+    ) -> tuple:
+    """Generate a synthetic run play with 22 players and the ball.
+
+    The offense lines up below the line of scrimmage moving up the field
+    (standardized direction), a WR goes in motion before the snap and the
+    ball follows the RB after the snap. The tracking data has the columns
+    used by `NFLPlayAnimator` and `plot_simple.plot_play_with_speed`.
+
+    Args:
+        n_frames: Number of frames of the play. Defaults to 60.
+        game_id: The game id. Defaults to 2022091100.
+        play_id: The play id. Defaults to 55.
+        seed: Seed of the random jitter. Defaults to 0.
+
+    Returns:
+        Tuple of the tracking data and the play data (one row).
+    """
+    if n_frames < 10:
+        raise ValueError("n_frames must be at least 10.")
+    rng = np.random.default_rng(seed)
+    frame_ids = np.arange(1, n_frames + 1)
+    line_set_frame = max(2, n_frames // 6)
+    snap_frame = max(line_set_frame + 2, n_frames // 3)
+    after_snap = np.clip(frame_ids - snap_frame, 0, None) / 10
+    ball_x = 53.3 / 2
+
+    players = []
+    for i, (position, position_by_loc, dx, depth) in enumerate(OFFENSE):
+        players.append({
+            'nfl_id': 40000 + i, 'club': 'KC', 'position': position, 'position_by_loc': position_by_loc,
+            'jersey_number': [15, 25, 10, 11, 17, 87, 62, 65, 52, 67, 73][i], 'offense': True,
+            'x0': ball_x + dx, 'y0': LOS - depth, 'speed': 6 if position_by_loc in ['RB', 'WR'] else 2.5,
+            'motion_player': i == 3,
+        })
+    for i, (position, dx, depth) in enumerate(DEFENSE):
+        players.append({
+            'nfl_id': 50000 + i, 'club': 'BUF', 'position': position, 'position_by_loc': position,
+            'jersey_number': [57, 99, 93, 94, 58, 3, 40, 24, 29, 31, 22][i], 'offense': False,
+            'x0': ball_x + dx, 'y0': LOS + depth, 'speed': -3.5, 'motion_player': False,
+        })
+
+    rows = []
+    rb = next(p for p in players if p['position_by_loc'] == 'RB')
+    for p in players:
+        jitter = rng.normal(0, 0.03, (n_frames, 2)).cumsum(axis=0)
+        x = p['x0'] + jitter[:, 0]
+        y = p['y0'] + jitter[:, 1] + p['speed'] * after_snap
+        if p['motion_player']:
+            # Jet motion across the formation in the frames before the snap
+            motion = np.clip((frame_ids - line_set_frame) / max(snap_frame - line_set_frame, 1), 0, 1)
+            x = x + 12 * motion
+        if not p['offense']:
+            # Pursue the RB once the ball is snapped
+            x = x + (rb['x0'] - p['x0']) * np.clip(after_snap, 0, 1) * 0.5
+        rows.append(pd.DataFrame({
+            'nfl_id': float(p['nfl_id']), 'display_name': f"{p['club']} {p['position']} {p['nfl_id']}",
+            'frame_id': frame_ids, 'club': p['club'], 'jersey_number': float(p['jersey_number']),
+            'position': p['position'], 'position_by_loc': p['position_by_loc'], 'offense': p['offense'],
+            'motion_player': p['motion_player'], 'x': x, 'y': y,
+        }))
+
+    ball_y = np.where(frame_ids < snap_frame, LOS, LOS - 6 + rb['speed'] * after_snap)
+    rows.append(pd.DataFrame({
+        'nfl_id': np.nan, 'display_name': 'football', 'frame_id': frame_ids, 'club': 'football',
+        'jersey_number': np.nan, 'position': None, 'position_by_loc': None, 'offense': False,
+        'motion_player': False, 'x': ball_x, 'y': ball_y,
+    }))
+
+    df_tracking = pd.concat(rows, ignore_index=True)
+    df_tracking.insert(0, 'play_id', play_id)
+    df_tracking.insert(0, 'game_id', game_id)
+    df_tracking['game_play_id'] = f'{game_id}_{play_id}'
+    df_tracking = df_tracking.sort_values(['frame_id', 'nfl_id'], na_position='last').reset_index(drop=True)
+
+    # Speeds and angles from the frame to frame displacement
+    grouped = df_tracking.groupby('display_name', sort=False)
+    dx = grouped['x'].diff().fillna(0)
+    dy = grouped['y'].diff().fillna(0)
+    df_tracking['dis'] = np.hypot(dx, dy)
+    df_tracking['s'] = df_tracking['dis'] * 10
+    df_tracking['a'] = grouped['s'].diff().abs().fillna(0) * 10
+    df_tracking['dir'] = np.degrees(np.arctan2(dy, dx)) % 360
+    df_tracking['o'] = np.where(df_tracking['offense'], 90., 270.) + rng.normal(0, 10, len(df_tracking))
+
+    events = {line_set_frame: 'line_set', line_set_frame + 1: 'man_in_motion', snap_frame: 'ball_snap',
+              n_frames - 2: 'tackle'}
+    df_tracking['event'] = df_tracking['frame_id'].map(events)
+    df_tracking['event_new'] = df_tracking['event']
+    df_tracking['frame_type'] = np.select(
+        [df_tracking['frame_id'] < snap_frame, df_tracking['frame_id'] == snap_frame],
+        ['BEFORE_SNAP', 'SNAP'],
+        'AFTER_SNAP'
+    )
+    df_tracking['motion_frame'] = (
+        df_tracking['motion_player'] & df_tracking['frame_id'].between(line_set_frame, snap_frame - 1)
+    )
+    df_tracking['on_oline'] = df_tracking['position_by_loc'].isin(['LT', 'LG', 'C', 'RG', 'RT'])
+    df_tracking['primary_rb'] = df_tracking['position_by_loc'] == 'RB'
+    df_tracking['puller_left_of_rt'] = df_tracking['position_by_loc'] == 'RG'
+    df_tracking['puller_left_of_center'] = False
+    df_tracking['absolute_yardline_number'] = LOS
+    df_tracking['yards_to_go'] = YARDS_TO_GO
+
+    df_play = pd.DataFrame([{
+        'game_id': game_id, 'play_id': play_id,
+        'home_team_logo': 'synthetic://logo/KC', 'away_team_logo': 'synthetic://logo/BUF',
+        'home_team_wordmark': 'synthetic://wordmark/KC',
+        'play_clock_at_snap': 7, 'game_clock': '12:34',
+        'absolute_yardline_number': LOS, 'yards_to_go': YARDS_TO_GO,
+        'home_team_color': '#E31837', 'away_team_color': '#00338D',
+        'possession_team': 'KC', 'defensive_team': 'BUF',
+        'possession_team_color': '#E31837', 'possession_team_color2': '#FFB81C',
+        'defensive_team_color': '#00338D', 'defensive_team_color2': '#C60C30',
+        'down_and_dist': f'1st & {YARDS_TO_GO}', 'quarter_with_suffix': '2nd',
+        'pre_snap_home_score': 7, 'pre_snap_visitor_score': 3,
+        'home_team_abbr': 'KC', 'away_team_abbr': 'BUF',
+    }])
+    return df_tracking, df_play
+
+def seed_logo_cache(cache_dir: str, df_play: pd.DataFrame) -> None:
+    """Write placeholder logos and wordmarks so the benchmark never fetches."""
+    cache = LogoCache(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    shapes = {'logo': (47, 98, 4), 'wordmark': (40, 240, 4), 'wordmark_rotated': (40, 240, 4)}
+    requests = [(url, 'logo') for url in df_play[['home_team_logo', 'away_team_logo']].values.ravel()]
+    requests += [(url, variant) for url in df_play['home_team_wordmark'] for variant in ['wordmark', 'wordmark_rotated']]
+    for url, variant in requests:
+        img = np.full(shapes[variant], 200, dtype=np.uint8)
+        np.save(cache._path(url, variant), img)
+
+def _summary(seconds: list) -> dict:
+    seconds = np.asarray(seconds)
+    return {
+        'n': int(len(seconds)),
+        'median': float(np.median(seconds)),
+        'mean': float(seconds.mean()),
+        'min': float(seconds.min()),
+        'p95': float(np.percentile(seconds, 95)),
+        'total': float(seconds.sum()),
+    }
+
+def _make_animator(df_tracking, df_play, config, cache_dir, ffmpeg_path) -> NFLPlayAnimator:
+    npa = NFLPlayAnimator(df_tracking, df_play, logo_cache_dir=cache_dir, ffmpeg_path=ffmpeg_path, **config)
+    if not os.path.exists(npa.numbers_font.get_file()):
+        npa.numbers_font = FontProperties(weight='bold')
+    return npa
+
+def benchmark_animator(
+        df_tracking: pd.DataFrame,
+        df_play: pd.DataFrame,
+        config: dict,
+        repeats: int = 3,
+        stages: list = STAGES,
+        cache_dir: str = None,
+        ffmpeg_path: str = 'ffmpeg',
+        out_dir: str = None
+    ) -> list:
+    """Time the stages of rendering a play with NFLPlayAnimator.
+
+    Stages:
+        init_animation: Static layers and retained artists of the play.
+        update_frame: Moving the artists to a frame, per frame.
+        draw_frame: Rasterizing a frame with the Agg canvas, per frame.
+        animate_play_file: End-to-end render to an .mp4 file.
+        animate_play_jshtml: End-to-end render to notebook HTML.
+
+    Returns:
+        One record per stage with the timings in seconds.
+    """
+    npa = _make_animator(df_tracking, df_play, config, cache_dir, ffmpeg_path)
+    game_id, play_id = df_play[['game_id', 'play_id']].iloc[0].tolist()
+    n_frames = int(df_tracking['frame_id'].nunique())
+    records = []
+
+    def record(stage, seconds, **extra):
+        records.append({'stage': stage, 'n_frames': n_frames, 'seconds': _summary(seconds), **extra})
+
+    if {'init_animation', 'update_frame', 'draw_frame'} & set(stages):
+        init_seconds, update_seconds, draw_seconds = [], [], []
+        for _ in range(repeats):
+            npa._filter_data(game_id, play_id)
+            npa._reset_flags_and_attributes()
+            npa.blit = False
+            npa._create_figure(agg=True)
+
+            start = time.perf_counter()
+            npa.init_animation()
+            init_seconds.append(time.perf_counter() - start)
+
+            for frame_id in npa.frame_ids:
+                start = time.perf_counter()
+                npa.update_frame(frame_id)
+                update_seconds.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                npa.fig.canvas.draw()
+                draw_seconds.append(time.perf_counter() - start)
+        for stage, seconds in [('init_animation', init_seconds), ('update_frame', update_seconds),
+                               ('draw_frame', draw_seconds)]:
+            if stage in stages:
+                record(stage, seconds)
+
+    if 'animate_play_file' in stages:
+        if not ffmpeg_available(ffmpeg_path):
+            records.append({'stage': 'animate_play_file', 'n_frames': n_frames, 'seconds': None,
+                            'skipped': f'{ffmpeg_path} not found'})
+        else:
+            filepath = os.path.join(out_dir, f'{game_id}_{play_id}.mp4')
+            seconds = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                npa.animate_play(game_id, play_id, output='file', filepath=filepath)
+                seconds.append(time.perf_counter() - start)
+            record('animate_play_file', seconds, bytes=os.path.getsize(filepath))
+
+    if 'animate_play_jshtml' in stages:
+        seconds = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            html = npa.animate_play(game_id, play_id, output='console')
+            seconds.append(time.perf_counter() - start)
+        record('animate_play_jshtml', seconds, bytes=len(html.data.encode('utf-8')))
+
+    plt.close('all')
+    return records
+
+def benchmark_plot_simple(df_tracking: pd.DataFrame, repeats: int = 3, **kwargs) -> list:
+    """Time `plot_simple.plot_play_with_speed` end-to-end (to jshtml)."""
+    game_play_id = df_tracking['game_play_id'].iloc[0]
+    kwargs = {
+        'plot_motion': True, 'show_motion_frames': True, 'highlight_oline': True,
+        'highlight_primary_rb': True, 'highlight_pullers': True, 'event_col': 'event_new', **kwargs
+    }
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        html = plot_play_with_speed(df_tracking, game_play_id, **kwargs)
+        seconds.append(time.perf_counter() - start)
+    plt.close('all')
+    return [{
+        'stage': 'plot_play_with_speed',
+        'n_frames': int(df_tracking['frame_id'].nunique()),
+        'seconds': _summary(seconds),
+        'bytes': len(html.data.encode('utf-8')),
+    }]
+
+def benchmark_cases() -> dict:
+    """Animator configurations benchmarked, by case name.
+
+    Every display type is timed on its own, and each optional layer is
+    timed on top of the base configuration, so the cost of a layer is the
+    difference with the 'dots-team' case.
+    """
+    cases = {}
+    for display_type in DISPLAY_TYPES:
+        cases[display_type] = {**BASE_CONFIG, 'player_display_type': display_type}
+    for option in ['show_trenches_paths', 'plot_dir_arrows', 'show_scoreboard']:
+        cases[option] = {**BASE_CONFIG, option: True}
+    cases['show_player_legend'] = {**BASE_CONFIG, 'player_display_type': 'jerseys', 'show_player_legend': True}
+    cases['all'] = {
+        'show_scoreboard': True,
+        'player_display_type': 'jerseys',
+        'show_player_legend': True,
+        'plot_dir_arrows': True,
+        'show_trenches_paths': True,
+    }
+    return cases
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(
+        n_frames: int = 60,
+        repeats: int = 3,
+        cases: list | None = None,
+        stages: list = STAGES,
+        plot_simple: bool = True,
+        ffmpeg_path: str = 'ffmpeg',
+        seed: int = 0
+    ) -> dict:
+    """Run the render benchmarks on a synthetic play.
+
+    Args:
+        n_frames: Number of frames of the synthetic play. Defaults to 60.
+        repeats: Number of times each stage is run. Defaults to 3.
+        cases: Names of the animator cases to run, see `benchmark_cases`.
+            Defaults to None (all).
+        stages: Animator stages to time. Defaults to all of STAGES.
+        plot_simple: Also time `plot_play_with_speed`. Defaults to True.
+        ffmpeg_path: The ffmpeg executable. Defaults to 'ffmpeg'.
+        seed: Seed of the synthetic play. Defaults to 0.
+
+    Returns:
+        Dictionary with the run metadata ('meta') and one record per case
+        and stage ('results').
+    """
+    all_cases = benchmark_cases()
+    if cases is None:
+        cases = list(all_cases)
+    unknown = set(cases) - set(all_cases)
+    if unknown:
+        raise ValueError(f"Unknown cases {sorted(unknown)}. Must be in {list(all_cases)}.")
+
+    # Arial and other fonts missing on workers would log a warning per text
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+    df_tracking, df_play = synthetic_play(n_frames, seed=seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = os.path.join(tmp_dir, 'logo_cache')
+        seed_logo_cache(cache_dir, df_play)
+        for case in cases:
+            print(f'Benchmarking {case}...')
+            records = benchmark_animator(
+                df_tracking, df_play, all_cases[case], repeats, stages, cache_dir, ffmpeg_path, tmp_dir
+            )
+            results += [{'case': case, 'config': all_cases[case], **r} for r in records]
+        if plot_simple:
+            print('Benchmarking plot_play_with_speed...')
+            results += [{'case': 'plot_simple', 'config': {}, **r} for r in benchmark_plot_simple(df_tracking, repeats)]
+
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'matplotlib': matplotlib.__version__,
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'n_frames': n_frames,
+        'repeats': repeats,
+        'seed': seed,
+    }
+    return {'meta': meta, 'results': results}
+
+def results_table(results: dict) -> pd.DataFrame:
+    """Median seconds (and output size) of each case and stage."""
+    return pd.DataFrame([{
+        'case': r['case'],
+        'stage': r['stage'],
+        'median_s': r['seconds']['median'] if r['seconds'] else np.nan,
+        'p95_s': r['seconds']['p95'] if r['seconds'] else np.nan,
+        'bytes': r.get('bytes'),
+    } for r in results['results']])
+
+def compare_results(baseline: dict, current: dict) -> pd.DataFrame:
+    """Compare the median seconds of two runs, speedup > 1 is faster."""
+    df = results_table(baseline).merge(
+        results_table(current), on=['case', 'stage'], how='outer', suffixes=('_baseline', '')
+    )
+    df['speedup'] = df['median_s_baseline'] / df['median_s']
+    return df[['case', 'stage', 'median_s_baseline', 'median_s', 'speedup']]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark rendering plays on synthetic tracking data.')
+    parser.add_argument('--frames', type=int, default=60, help='Number of frames of the synthetic play.')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of runs of each stage.')
+    parser.add_argument('--cases', nargs='+', default=None, help=f'Cases to run, of {list(benchmark_cases())}.')
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES, help='Animator stages to time.')
+    parser.add_argument('--skip-plot-simple', action='store_true', help='Do not time plot_play_with_speed.')
+    parser.add_argument('--ffmpeg-path', default='ffmpeg', help='The ffmpeg executable.')
+    parser.add_argument('--output', default='render_benchmark.json', help='JSON file of the results.')
+    parser.add_argument('--compare', default=None, help='JSON file of a previous run to compare against.')
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        n_frames=args.frames,
+        repeats=args.repeats,
+        cases=args.cases,
+        stages=args.stages,
+        plot_simple=not args.skip_plot_simple,
+        ffmpeg_path=args.ffmpeg_path
+    )
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    pd.set_option('display.width', 200)
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            print(compare_results(json.load(f), results).to_string(index=False))
+    else:
+        print(results_table(results).to_string(index=False))
+    print(f'Results written to {args.output}')
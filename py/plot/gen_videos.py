@@ -18,6 +18,8 @@ ROOT_DIR = os.path.abspath(os.path.join(os.getcwd(), '..'))
 sys.path.insert(0, os.path.join(ROOT_DIR,'..','py'))
 
 import util
+import events
+import storage
 from plot.plotter import NFLPlayAnimator
 
 pd.set_option('display.max_rows',None)
@@ -33,22 +35,18 @@ df_play = pd.read_csv(join(DATA_DIR, "plays.csv"))
 df_player_play = pd.read_csv(join(DATA_DIR, "player_play.csv"))
 df_player = pd.read_csv(join(DATA_DIR, "players.csv"))
 
-tracking_dfs = []
+# Convert raw tracking weeks to the columnar store once, then load from it
+TRACKING_STORE = join(DATA_DIR, 'tracking_store')
 for wk in tqdm(WEEKS, desc="Loading tracking files"):
-    df = pd.read_csv(join(DATA_DIR, f'tracking_week_{wk}.csv'))
-    if 'week' not in df.columns:
-        df.insert(3,'week',wk)
-    tracking_dfs.append(df)
-    
-df_tracking = pd.concat(tracking_dfs, axis=0)
+    if not storage.week_exists(TRACKING_STORE, wk):
+        storage.convert_raw_tracking(DATA_DIR, TRACKING_STORE, weeks=[wk])
 
-del tracking_dfs
+df_tracking = storage.load_tracking(TRACKING_STORE, weeks=WEEKS)
 
 util.uncamelcase_columns(df_game)
 util.uncamelcase_columns(df_player)
 util.uncamelcase_columns(df_play)
 util.uncamelcase_columns(df_player_play)
-util.uncamelcase_columns(df_tracking)
 
 # standardize direction to be offense moving right
 df_tracking, df_play = util.standardize_direction(df_tracking, df_play)
@@ -151,6 +149,9 @@ if 'quarter_with_suffix' not in df_play.columns:
 from matplotlib import pyplot as plt
 from IPython.display import HTML
 
+# Log the time of each rendering stage per play and for the whole batch
+PROFILE = False
+
 npa = NFLPlayAnimator(
     df_tracking,
     df_play,
@@ -159,7 +160,8 @@ npa = NFLPlayAnimator(
     player_display_type='dots-team',
     show_player_legend=False,
     plot_dir_arrows=False,
-    show_trenches_paths=True
+    show_trenches_paths=True,
+    profile=PROFILE
 )
 
 WRITE_PATH = r'/Users/lukeneuendorf/Library/Mobile Documents/com~apple~CloudDocs/bdb25'
@@ -170,74 +172,65 @@ REGULAR_PATH = join(WRITE_PATH, 'regular')
 
 key = ['game_id','play_id']
 
-# Filter down to run plays only
 run_plays = ['INSIDE_LEFT', 'OUTSIDE_RIGHT', 'OUTSIDE_LEFT', 'INSIDE_RIGHT']
-df_run_plays = df_play.query('rush_location_type.isin(@run_plays)')[key + ['rush_location_type']]
-df_tracking = df_tracking.merge(df_run_plays, on=key, how='inner').dropna(subset=['rush_location_type'])
 
 # make folders in each directory for the different types of plays
 for path in [MOTION_PATH, SHIFT_PATH, MOTION_AND_SHIFT_PATH, REGULAR_PATH]:
     for folder in run_plays:
         if not os.path.exists(join(path, folder)):
             os.makedirs(join(path, folder))
-            
-plays_grouped = df_tracking.groupby(key)['event'].agg(list).reset_index()
-motion_only_plays = plays_grouped[
-    plays_grouped['event'].apply(lambda events: 'man_in_motion' in events and 'shift' not in events)
-]
-motion_only_plays = motion_only_plays[key].reset_index(drop=True)
-
-shift_only_plays = plays_grouped[
-    plays_grouped['event'].apply(lambda events: 'shift' in events and 'man_in_motion' not in events)
-]
-shift_only_plays = shift_only_plays[key].reset_index(drop=True)
-
-motion_and_shift_plays = plays_grouped[
-    plays_grouped['event'].apply(lambda events: 'shift' in events and 'man_in_motion' in events)
-]
-motion_and_shift_plays = motion_and_shift_plays[key].reset_index(drop=True)
-
-no_motion_no_shift_plays = plays_grouped[
-    plays_grouped['event'].apply(lambda events: 'shift' not in events and 'man_in_motion' not in events)
-]
-no_motion_no_shift_plays = no_motion_no_shift_plays[key].reset_index(drop=True)
-
-for i in tqdm(range(30), desc="Animating motion only plays"):
-    try:
-        row = np.random.choice(motion_only_plays.index)
-        game_id, play_id = motion_only_plays.loc[row, key]
-        run_type = df_tracking[(df_tracking['game_id'] == game_id) & (df_tracking['play_id'] == play_id)]['rush_location_type'].values[0]
-        FOLDER = join(MOTION_PATH, run_type)
-        npa.animate_play(game_id, play_id, output='file', filepath=join(FOLDER, f'{game_id}_{play_id}.mp4'))
-    except Exception as e:
-        logging.error(f'Failed to animate play a motion play: {e}')
-
-for i in tqdm(range(30), desc="Animating shift only plays"):
-    try:
-        row = np.random.choice(shift_only_plays.index)
-        game_id, play_id = shift_only_plays.loc[row, key]
-        run_type = df_tracking[(df_tracking['game_id'] == game_id) & (df_tracking['play_id'] == play_id)]['rush_location_type'].values[0]
-        FOLDER = join(SHIFT_PATH, run_type)
-        npa.animate_play(game_id, play_id, output='file', filepath=join(FOLDER, f'{game_id}_{play_id}.mp4'))
-    except Exception as e:
-        logging.error(f'Failed to animate play a shift play: {e}')
-
-for i in tqdm(range(30), desc="Animating motion and shift plays"):
-    try:
-        row = np.random.choice(motion_and_shift_plays.index)
-        game_id, play_id = motion_and_shift_plays.loc[row, key]
-        run_type = df_tracking[(df_tracking['game_id'] == game_id) & (df_tracking['play_id'] == play_id)]['rush_location_type'].values[0]
-        FOLDER = join(MOTION_AND_SHIFT_PATH, run_type)
-        npa.animate_play(game_id, play_id, output='file', filepath=join(FOLDER, f'{game_id}_{play_id}.mp4'))
-    except Exception as e:
-        logging.error(f'Failed to animate play a motion and shift play: {e}')
-    
-for i in tqdm(range(30), desc="Animating regular plays"):
-    try:
-        row = np.random.choice(no_motion_no_shift_plays.index)
-        game_id, play_id = no_motion_no_shift_plays.loc[row, key]
-        run_type = df_tracking[(df_tracking['game_id'] == game_id) & (df_tracking['play_id'] == play_id)]['rush_location_type'].values[0]
-        FOLDER = join(REGULAR_PATH, run_type)
-        npa.animate_play(game_id, play_id, output='file', filepath=join(FOLDER, f'{game_id}_{play_id}.mp4'))
-    except Exception as e:
-        logging.error(f'Failed to animate play a regular play: {e}')
\ No newline at end of file
+
+# One row per run play with its motion / shift flags and run type
+df_catalog = events.play_catalog(df_tracking, events=['man_in_motion', 'shift'])
+df_catalog = df_catalog.merge(
+    df_play.query('rush_location_type.isin(@run_plays)')[key + ['rush_location_type']],
+    on=key,
+    how='inner'
+)
+df_catalog['path'] = np.select(
+    [
+        df_catalog['has_man_in_motion'] & ~df_catalog['has_shift'],
+        df_catalog['has_shift'] & ~df_catalog['has_man_in_motion'],
+        df_catalog['has_shift'] & df_catalog['has_man_in_motion'],
+    ],
+    [MOTION_PATH, SHIFT_PATH, MOTION_AND_SHIFT_PATH],
+    REGULAR_PATH
+)
+
+N_PLAYS = 30
+WORKERS = os.cpu_count()
+
+# Select plays for each category and route them to the folder of their run type
+selected_plays = []
+for path in [MOTION_PATH, SHIFT_PATH, MOTION_AND_SHIFT_PATH, REGULAR_PATH]:
+    plays = df_catalog[df_catalog['path'] == path]
+    if plays.empty:
+        continue
+    plays = plays.loc[np.random.choice(plays.index, N_PLAYS)]
+    selected_plays.append(pd.DataFrame({
+        'game_id': plays['game_id'],
+        'play_id': plays['play_id'],
+        'filepath': [
+            join(path, run_type, f'{game_id}_{play_id}.mp4')
+            for game_id, play_id, run_type in zip(plays['game_id'], plays['play_id'], plays['rush_location_type'])
+        ]
+    }))
+selected_plays = pd.concat(selected_plays, ignore_index=True).drop_duplicates(['game_id','play_id'])
+
+# Warm the logo cache before forking so workers never touch the network
+npa.logo_cache.prefetch(
+    df_teams['team_logo_wikipedia'].dropna().unique().tolist(),
+    df_teams['team_wordmark'].dropna().unique().tolist()
+)
+
+manifest = npa.render_many(
+    selected_plays,
+    workers=WORKERS,
+    manifest_path=join(WRITE_PATH, 'manifest.json')
+)
+
+for failed in manifest.query('status == "failed"').itertuples():
+    logging.error(f'Failed to animate play {failed.game_id}_{failed.play_id}: {failed.error}')
+
+if PROFILE:
+    print(npa.batch_timings.to_string())
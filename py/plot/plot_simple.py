@@ -1,223 +1,363 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from IPython.display import HTML
 
-def plot_play_with_speed(
-    df_tracking, 
-    game_play_id, 
-    NON_STATIONARY_THRESHOLD=1.0, 
-    MOVING_WINDOW=3, 
-    every_other_frame=True, 
-    event_col='event',
-    plot_motion=True,
-    highlight_offensive_positions=True,
-    show_motion_frames=False,
-    highlight_oline=False,
-    highlight_primary_rb=False,
-    highlight_pullers=False
-) -> HTML:
-    qry = 'game_play_id==@game_play_id'
-    tracking_play = df_tracking.query(qry).copy().reset_index(drop=True)
-
-    # Keep every other frame, the first and last frames, and frames with events
-    first_frame = tracking_play['frame_id'].min()
-    last_frame = tracking_play['frame_id'].max()
-    frames_with_events = tracking_play.groupby('frame_id')[event_col].transform('any')
-
-    if every_other_frame:
-        tracking_play = tracking_play[
-            (tracking_play['frame_id'] == first_frame) | 
-            (tracking_play['frame_id'] == last_frame) | 
-            (frames_with_events) |
-            (tracking_play['frame_id'] % 2 == 0)  # Keep even frames only
-        ].copy().reset_index(drop=True)
-
-    frames = tracking_play['frame_id'].unique()
-    current_event = [None]  
-
-    field_width = 53.3
-
-    # Prepare speed data for the motion player
-    if plot_motion:
-        cols = ['frame_id','s','nfl_id']
-        if show_motion_frames:
-            cols = ['frame_id','s','motion_frame','nfl_id']
-        motion_query = df_tracking.query(
-            'game_play_id==@game_play_id and ' +
-            'offense and ' +
-            'motion_player'
-        )[cols]
-        motion_query['s_smoothed'] = motion_query['s'].rolling(window=MOVING_WINDOW, min_periods=1, center=True).mean()
-        min_speed = motion_query['s_smoothed'].min()
-        max_speed = motion_query['s_smoothed'].max()
-        ball_snap_frame_id = tracking_play.query('event_new == "ball_snap"').frame_id.iloc[0]
-        line_set_frame_ids = tracking_play.query('event_new == "line_set"').frame_id.values.tolist()
-        motion_player_id = motion_query['nfl_id'].iloc[0]
-
-        # Extract speed and frames
-        speed_frames = motion_query['frame_id'].values
-        speeds_smoothed = motion_query['s_smoothed'].values
-
-    if plot_motion:
-        fig, (ax, ax_speed) = plt.subplots(2, 1, figsize=(10, 10), gridspec_kw={'height_ratios': [5, 2]})
-    else:
-        fig, ax = plt.subplots(1, 1, figsize=(10, 5))
-    
-    padding = 2
-    min_y = tracking_play.y.min() - padding
-    max_y = tracking_play.y.max() + padding
-
-    los = tracking_play['absolute_yardline_number'].iloc[0]
-    to_go_line = los + tracking_play['yards_to_go'].iloc[0]
-
-    def update(frame_id):
-        """Update function for each animation frame."""
-        ax.clear()
-        if plot_motion:
-            ax_speed.clear()
+FIELD_WIDTH = 53.3
+LINEMAN_POSITIONS = ['LT', 'LG', 'C', 'RG', 'RT', 'T', 'G']
+
+class PlaySpeedViewer:
+    def __init__(
+            self,
+            NON_STATIONARY_THRESHOLD: float = 1.0,
+            MOVING_WINDOW: int = 3,
+            every_other_frame: bool = True,
+            event_col: str = 'event',
+            plot_motion: bool = True,
+            highlight_offensive_positions: bool = True,
+            show_motion_frames: bool = False,
+            highlight_oline: bool = False,
+            highlight_primary_rb: bool = False,
+            highlight_pullers: bool = False
+        ) -> None:
+        """Animation of a play with the speed of its motion player.
+
+        The figure and its artists (one scatter per role, the lines of
+        scrimmage, the texts and the speed curve) are created once. Loading a
+        play computes the role of every row and the rows of every frame once,
+        so each animation frame only moves the scatter offsets of each role,
+        updates the texts and moves a cursor along the speed curve. The viewer
+        can be reused for many plays.
+
+        Args:
+            NON_STATIONARY_THRESHOLD: Speed (yd/s) drawn as the moving
+                threshold. Defaults to 1.0.
+            MOVING_WINDOW: Width of the centered rolling mean of the speed.
+                Defaults to 3.
+            every_other_frame: Keep only the even frames, the first and last
+                frames and frames with events. Defaults to True.
+            event_col: Column of the events shown. Defaults to 'event'.
+            plot_motion: Highlight the motion player and plot its speed.
+                Defaults to True.
+            highlight_offensive_positions: Color the offense by position.
+                Defaults to True.
+            show_motion_frames: Shade the motion frames of the speed plot.
+                Defaults to False.
+            highlight_oline: Mark the offensive line. Defaults to False.
+            highlight_primary_rb: Mark the primary RB. Defaults to False.
+            highlight_pullers: Circle the pullers. Defaults to False.
+        """
+        self.NON_STATIONARY_THRESHOLD = NON_STATIONARY_THRESHOLD
+        self.MOVING_WINDOW = MOVING_WINDOW
+        self.every_other_frame = every_other_frame
+        self.event_col = event_col
+        self.plot_motion = plot_motion
+        self.highlight_offensive_positions = highlight_offensive_positions
+        self.show_motion_frames = show_motion_frames
+        self.highlight_oline = highlight_oline
+        self.highlight_primary_rb = highlight_primary_rb
+        self.highlight_pullers = highlight_pullers
+        self._create_figure()
+
+    def _roles(self) -> list:
+        """Scatter style of each role, in drawing order."""
+        roles = []
+        if self.highlight_offensive_positions:
+            roles += [
+                ('lineman', dict(c='lightblue', edgecolor='black', label='Lineman', zorder=2)),
+                ('qb', dict(c='purple', edgecolor='black', label='QB', zorder=2)),
+                ('rb', dict(c='orange', edgecolor='black', label='RB', zorder=2)),
+                ('fb', dict(c='pink', edgecolor='black', label='FB', zorder=2)),
+                ('te', dict(c='green', edgecolor='black', label='TE', zorder=2)),
+                ('wr', dict(c='red', edgecolor='black', label='WR', zorder=2)),
+            ]
+        else:
+            roles.append(('offense', dict(c='#fc8077', edgecolor='black', label='Offense', zorder=2)))
+        if self.highlight_oline:
+            roles.append(('oline', dict(c='red', marker='x', label='Offensive Line', zorder=2, s=20, lw=1)))
+        if self.highlight_primary_rb:
+            roles.append(('primary_rb', dict(c='green', marker='x', label='Primary RB', zorder=2, s=20, lw=1)))
+        if self.highlight_pullers:
+            roles.append(('pullers', dict(facecolors='none', edgecolor='pink', label='Puller', zorder=2)))
+        if self.plot_motion:
+            roles.append(('motion_player', dict(c='red', edgecolor='black', label='Motion Player', zorder=2)))
+        roles += [
+            ('defense', dict(c='blue', edgecolor='black', label='Defense', zorder=2)),
+            ('football', dict(c='brown', edgecolor='black', label='Football', s=20, zorder=3)),
+        ]
+        return roles
+
+    def _create_figure(self) -> None:
+        if self.plot_motion:
+            self.fig, (self.ax, self.ax_speed) = plt.subplots(
+                2, 1, figsize=(10, 10), gridspec_kw={'height_ratios': [5, 2]}
+            )
+        else:
+            self.fig, self.ax = plt.subplots(1, 1, figsize=(10, 5))
+            self.ax_speed = None
+        plt.subplots_adjust(left=0.1, right=0.9, bottom=0.1, top=0.95)
+        plt.close(self.fig)
 
         # Field plot
+        ax = self.ax
         ax.set_facecolor('lightgrey')
         ax.set_yticks(np.arange(10, 110+1, 5))
         ax.grid(which='major', axis='y', linestyle='-', linewidth='0.5', color='black', zorder=1)
-
         for spine in ax.spines.values():
             spine.set_visible(False)
-
         ax.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-        ax.set_xlim(0, field_width)
-        ax.set_ylim(min_y, max_y)
-
-        current_frame = tracking_play.query('frame_id == @frame_id')
-
-        if highlight_offensive_positions:
-            lineman = current_frame.query('offense and position_by_loc in ["LT","LG","C","RG","RT","T","G"]')
-            qb = current_frame.query('offense and position_by_loc == "QB"')
-            rb = current_frame.query('offense and position_by_loc == "RB"')
-            fb = current_frame.query('offense and position_by_loc == "FB"')
-            te = current_frame.query('offense and position_by_loc == "TE"')
-            wr = current_frame.query('offense and position_by_loc == "WR"')
-        else:
-            offense = current_frame.query('offense')
-
-        if highlight_offensive_positions:
-            ax.scatter(lineman.x, lineman.y, c='lightblue', edgecolor='black', label='Lineman', zorder=2)
-            ax.scatter(qb.x, qb.y, c='purple', edgecolor='black', label='QB', zorder=2)
-            ax.scatter(rb.x, rb.y, c='orange', edgecolor='black', label='RB', zorder=2)
-            ax.scatter(fb.x, fb.y, c='pink', edgecolor='black', label='FB', zorder=2)
-            ax.scatter(te.x, te.y, c='green', edgecolor='black', label='TE', zorder=2)
-            ax.scatter(wr.x, wr.y, c='red', edgecolor='black', label='WR', zorder=2)
-
-        if not highlight_offensive_positions:
-            ax.scatter(offense.x, offense.y, c='#fc8077', edgecolor='black', label='Offense', zorder=2)
-
-        if highlight_oline:
-            oline = current_frame.query('offense and on_oline')
-            ax.scatter(oline.x, oline.y, c='red', marker='x', label='Offensive Line', zorder=2, s=20, lw=1)
-
-        if highlight_primary_rb:
-            primary_rb = current_frame.query('offense and primary_rb')
-            ax.scatter(primary_rb.x, primary_rb.y, c='green', marker='x', label='Primary RB', zorder=2, s=20, lw=1)
-
-        if highlight_pullers:
-            pullers = current_frame.query('offense and (puller_left_of_rt or puller_left_of_center)')
-            ax.scatter(pullers.x, pullers.y, facecolors="none", edgecolor='pink', label='Puller', zorder=2)
-
-        if plot_motion:
-            motion_player = current_frame.query('motion_player')
-            ax.scatter(motion_player.x, motion_player.y, c='red', edgecolor='black', label='Motion Player', zorder=2)
+        ax.set_xlim(0, FIELD_WIDTH)
 
-        # Plot defense and football
-        defense = current_frame.query('~offense and club != "football"')
-        football = current_frame.query('club == "football"')
-        ax.scatter(defense.x, defense.y, c='blue', edgecolor='black', label='Defense', zorder=2)
-        ax.scatter(football.x, football.y, c='brown', edgecolor='black', label='Football', s=20, zorder=3)
+        empty = np.empty((0, 2))
+        self.scatters = {role: ax.scatter(empty[:, 0], empty[:, 1], **style) for role, style in self._roles()}
 
-        # Plot the line of scrimmage and to-go line
-        ax.axhline(los, color='blue', linewidth=1.2, linestyle='-', zorder=1)
-        ax.axhline(to_go_line, color='yellow', linewidth=1.2, linestyle='-', zorder=1)
+        # Line of scrimmage and to-go line
+        self.los_line = ax.axhline(0, color='blue', linewidth=1.2, linestyle='-', zorder=1)
+        self.to_go_line = ax.axhline(0, color='yellow', linewidth=1.2, linestyle='-', zorder=1)
 
-        # Event annotation
-        event = current_frame[event_col].iloc[0]
-        box_color = 'white'  # Default color
-        alpha_value = 0.8    # Transparency value
-        
-        # Set box color based on event type
-        if event == 'line_set':
-            box_color = 'green'
-            alpha_value = 0.5  # More transparency for the green box
-        elif event == 'ball_snap':
-            box_color = 'red'
-            alpha_value = 0.5  # More transparency for the red box
-        
-        ax.text(
-            1, max_y + 1.5, f"{event}",
-            fontsize=12, ha='left', color='black',
-            bbox=dict(facecolor=box_color, alpha=alpha_value),
-            zorder=4
+        self.event_text = ax.text(
+            1, 0, '', fontsize=12, ha='left', color='black',
+            bbox=dict(facecolor='white', alpha=0.8), zorder=4
+        )
+        self.time_text = ax.text(
+            52.3, 0, '', fontsize=12, ha='right', color='black',
+            bbox=dict(facecolor='white', alpha=0.8), zorder=4
         )
+        ax.legend(loc='upper right', bbox_to_anchor=(1, 1))
 
-        ax.text(52.3, max_y + 1.5, f"{frame_id / 10:.01f} s", fontsize=12, ha='right', color='black', 
-                bbox=dict(facecolor='white', alpha=0.8), zorder=4)
-
-        # Speed plot
-        if plot_motion:
-            up_to_frame = motion_query[motion_query['frame_id'] <= frame_id]
-            ax_speed.plot(
-                up_to_frame['frame_id'], 
-                up_to_frame['s_smoothed'], 
-                zorder=2, 
-                color='red'
+        if self.plot_motion:
+            self.ax_speed.set_xlabel('Frame ID')
+            self.ax_speed.set_ylabel('Speed (yd/s)')
+            self.speed_cursor = self.ax_speed.axvline(0, color='black', lw=1, zorder=3)
+            self._speed_artists = []
+
+    def _select_frames(self, tracking_play: pd.DataFrame) -> pd.DataFrame:
+        """Keep every other frame, the first and last frames, and frames with events."""
+        first_frame = tracking_play['frame_id'].min()
+        last_frame = tracking_play['frame_id'].max()
+        frames_with_events = tracking_play.groupby('frame_id')[self.event_col].transform('any')
+        return tracking_play[
+            (tracking_play['frame_id'] == first_frame) |
+            (tracking_play['frame_id'] == last_frame) |
+            (frames_with_events) |
+            (tracking_play['frame_id'] % 2 == 0)  # Keep even frames only
+        ]
+
+    def _role_masks(self, tracking_play: pd.DataFrame) -> dict:
+        """Rows of each role, computed once per play."""
+        offense = tracking_play['offense'].to_numpy(dtype=bool)
+        club = tracking_play['club'].to_numpy()
+        masks = {}
+        if self.highlight_offensive_positions:
+            position = tracking_play['position_by_loc'].to_numpy()
+            masks['lineman'] = offense & np.isin(position, LINEMAN_POSITIONS)
+            for role, pos in [('qb', 'QB'), ('rb', 'RB'), ('fb', 'FB'), ('te', 'TE'), ('wr', 'WR')]:
+                masks[role] = offense & (position == pos)
+        else:
+            masks['offense'] = offense
+        if self.highlight_oline:
+            masks['oline'] = offense & tracking_play['on_oline'].to_numpy(dtype=bool)
+        if self.highlight_primary_rb:
+            masks['primary_rb'] = offense & tracking_play['primary_rb'].to_numpy(dtype=bool)
+        if self.highlight_pullers:
+            masks['pullers'] = offense & (
+                tracking_play['puller_left_of_rt'].to_numpy(dtype=bool) |
+                tracking_play['puller_left_of_center'].to_numpy(dtype=bool)
             )
+        if self.plot_motion:
+            masks['motion_player'] = tracking_play['motion_player'].to_numpy(dtype=bool)
+        masks['defense'] = ~offense & (club != 'football')
+        masks['football'] = club == 'football'
+        return masks
+
+    def _motion_speed(
+            self,
+            play_rows: pd.DataFrame,
+            game_play_id,
+            speed_profiles: pd.DataFrame | None = None
+        ) -> pd.DataFrame:
+        """Smoothed speed of the play's motion player over all its frames."""
+        motion = play_rows[
+            play_rows['offense'].to_numpy(dtype=bool) & play_rows['motion_player'].to_numpy(dtype=bool)
+        ]
+        motion = motion[motion['nfl_id'] == motion['nfl_id'].iloc[0]].sort_values('frame_id')
+        cols = ['frame_id', 's', 'nfl_id'] + (['motion_frame'] if self.show_motion_frames else [])
+        motion = motion[cols].reset_index(drop=True)
+        if speed_profiles is None:
+            motion['s_smoothed'] = motion['s'].rolling(window=self.MOVING_WINDOW, min_periods=1, center=True).mean()
+            return motion
+
+        # Binary search of the play in the sorted table, see motion.speed_profiles.
+        # The frames shown are those of the play's rows, smoothed over the whole play
+        profile = speed_profiles.loc[game_play_id:game_play_id]
+        profile = profile[profile['nfl_id'].to_numpy() == motion['nfl_id'].iloc[0]]
+        return motion.drop(columns='s').merge(profile[['frame_id', 's', 's_smoothed']], on='frame_id')
+
+    def load_play(
+            self,
+            df_tracking: pd.DataFrame,
+            game_play_id,
+            speed_profiles: pd.DataFrame | None = None
+        ) -> None:
+        """Prepare the frames and redraw the static layers of a play.
+
+        Args:
+            df_tracking: Tracking data containing the play.
+            game_play_id: The play to show.
+            speed_profiles: Smoothed speeds of many plays from
+                `motion.speed_profiles`, sliced for the motion player instead
+                of smoothing the play's speeds (MOVING_WINDOW is then the
+                table's window). Defaults to None.
+        """
+        play_rows = df_tracking[df_tracking['game_play_id'] == game_play_id]
+        tracking_play = self._select_frames(play_rows) if self.every_other_frame else play_rows
+        tracking_play = tracking_play.sort_values('frame_id', kind='stable')
+
+        # Rows of each frame are contiguous: frame i spans bounds[i]:bounds[i+1]
+        frame_id_rows = tracking_play['frame_id'].to_numpy()
+        self.frame_ids, frame_starts = np.unique(frame_id_rows, return_index=True)
+        bounds = np.append(frame_starts, len(frame_id_rows))
+        self._frame_index = {frame_id: i for i, frame_id in enumerate(self.frame_ids)}
+        self._events = tracking_play[self.event_col].to_numpy()[frame_starts]
+
+        # Positions of each role in frame order, and where each frame starts in them
+        xy = tracking_play[['x', 'y']].to_numpy(dtype=float)
+        self._role_xy = {}
+        self._role_bounds = {}
+        for role, mask in self._role_masks(tracking_play).items():
+            rows = np.flatnonzero(mask)
+            self._role_xy[role] = xy[rows]
+            self._role_bounds[role] = np.searchsorted(rows, bounds)
+
+        padding = 2
+        min_y = tracking_play['y'].min() - padding
+        self.max_y = tracking_play['y'].max() + padding
+        self.ax.set_ylim(min_y, self.max_y)
+
+        los = tracking_play['absolute_yardline_number'].iloc[0]
+        self.los_line.set_ydata([los, los])
+        to_go_line = los + tracking_play['yards_to_go'].iloc[0]
+        self.to_go_line.set_ydata([to_go_line, to_go_line])
+        self.event_text.set_y(self.max_y + 1.5)
+        self.time_text.set_y(self.max_y + 1.5)
+
+        if self.plot_motion:
+            self._plot_speed(play_rows, game_play_id, speed_profiles)
+
+    def _plot_speed(self, play_rows: pd.DataFrame, game_play_id, speed_profiles: pd.DataFrame | None) -> None:
+        """Draw the whole speed curve of the motion player once."""
+        ax_speed = self.ax_speed
+        for artist in self._speed_artists:
+            artist.remove()
+
+        motion = self._motion_speed(play_rows, game_play_id, speed_profiles)
+        frames = motion['frame_id'].to_numpy()
+        speeds = motion['s_smoothed'].to_numpy()
+        min_speed, max_speed = np.nanmin(speeds), np.nanmax(speeds)
+        events = play_rows['event_new'].to_numpy()
+        ball_snap_frame_id = play_rows['frame_id'].to_numpy()[events == 'ball_snap'][0]
+        line_set_frame_ids = np.unique(play_rows['frame_id'].to_numpy()[events == 'line_set'])
+
+        artists = [
+            ax_speed.plot(frames, speeds, zorder=2, color='red')[0],
             ax_speed.hlines(
-                NON_STATIONARY_THRESHOLD, 
-                xmin=motion_query['frame_id'].min(), 
-                xmax=motion_query['frame_id'].max(), 
-                color='darkgrey',
-                zorder=1
-            )
+                self.NON_STATIONARY_THRESHOLD, xmin=frames.min(), xmax=frames.max(),
+                color='darkgrey', zorder=1
+            ),
             ax_speed.fill_between(
-                up_to_frame['frame_id'],  # x values
-                up_to_frame['s_smoothed'],  # y values
-                NON_STATIONARY_THRESHOLD,  # baseline
-                where=up_to_frame['s_smoothed'] > NON_STATIONARY_THRESHOLD,  # condition for shading
-                interpolate=True,         # interpolates between points
-                color='lightgrey',       # shading color
-                alpha=0.5,               # transparency
-                zorder=0
-            )
-
-            ax_speed.axvline(ball_snap_frame_id, color='black', linestyle='--', zorder=1)
-
-            for line_set_frame_id in line_set_frame_ids:
-                ax_speed.axvline(line_set_frame_id, color='green', linestyle='--', zorder=1, lw=1)
-
-            if show_motion_frames:
-                motion_frames = up_to_frame.query('motion_frame').frame_id.values.tolist()
-                if motion_frames:
-                    ax_speed.fill_between(
-                        x=motion_frames,  # x values
-                        y1=min_speed-2,  # y values
-                        y2=max_speed+2,
-                        color='red',       # shading color
-                        alpha=0.5,               # transparency
-                        zorder=0
-                    )
-
-            ax_speed.set_xlabel('Frame ID')
-            ax_speed.set_ylabel('Speed (yd/s)')
-            ax_speed.set_xlim(motion_query['frame_id'].min(), motion_query['frame_id'].max())
-            ax_speed.set_ylim(min_speed-2, max_speed+2)
-            ax_speed.title.set_text(f"Motion Player: {motion_player_id}")
-
-        # show legend
-        ax.legend(loc='upper right', bbox_to_anchor=(1, 1))
-
-    ani = FuncAnimation(fig, update, frames=frames, interval=100, repeat=False)
+                frames, speeds, self.NON_STATIONARY_THRESHOLD,
+                where=speeds > self.NON_STATIONARY_THRESHOLD,
+                interpolate=True, color='lightgrey', alpha=0.5, zorder=0
+            ),
+            ax_speed.axvline(ball_snap_frame_id, color='black', linestyle='--', zorder=1),
+        ]
+        for line_set_frame_id in line_set_frame_ids:
+            artists.append(ax_speed.axvline(line_set_frame_id, color='green', linestyle='--', zorder=1, lw=1))
+        if self.show_motion_frames:
+            artists.append(ax_speed.fill_between(
+                frames, min_speed-2, max_speed+2, where=motion['motion_frame'].to_numpy(dtype=bool),
+                color='red', alpha=0.5, zorder=0
+            ))
+        self._speed_artists = artists
+
+        ax_speed.set_xlim(frames.min(), frames.max())
+        ax_speed.set_ylim(min_speed-2, max_speed+2)
+        ax_speed.title.set_text(f"Motion Player: {motion['nfl_id'].iloc[0]}")
+
+    def update(self, frame_id) -> None:
+        """Move the players, texts and speed cursor to a frame."""
+        i = self._frame_index[frame_id]
+        for role, scatter in self.scatters.items():
+            start, stop = self._role_bounds[role][i:i+2]
+            scatter.set_offsets(self._role_xy[role][start:stop])
 
-    plt.subplots_adjust(left=0.1, right=0.9, bottom=0.1, top=0.95)
-
-    plt.close(fig)
+        # Event annotation
+        event = self._events[i]
+        box_color, alpha_value = {
+            'line_set': ('green', 0.5),
+            'ball_snap': ('red', 0.5),
+        }.get(event, ('white', 0.8))
+        self.event_text.set_text(f"{event}")
+        self.event_text.get_bbox_patch().set(facecolor=box_color, alpha=alpha_value)
+        self.time_text.set_text(f"{frame_id / 10:.01f} s")
+
+        if self.plot_motion:
+            self.speed_cursor.set_xdata([frame_id, frame_id])
+
+    def animate(
+            self,
+            df_tracking: pd.DataFrame,
+            game_play_id,
+            speed_profiles: pd.DataFrame | None = None,
+            fps: int = 5
+        ) -> HTML:
+        """Animation of a play as notebook HTML.
+
+        Args:
+            df_tracking: Tracking data containing the play.
+            game_play_id: The play to show.
+            speed_profiles: Smoothed speeds, see `load_play`. Defaults to None.
+            fps: Frames per second. Defaults to 5.
+
+        Returns:
+            The jshtml animation.
+        """
+        self.load_play(df_tracking, game_play_id, speed_profiles)
+        ani = FuncAnimation(self.fig, self.update, frames=self.frame_ids, interval=100, repeat=False)
+        return HTML(ani.to_jshtml(fps=fps))
 
-    return HTML(ani.to_jshtml(fps=5))
\ No newline at end of file
+def plot_play_with_speed(
+    df_tracking,
+    game_play_id,
+    NON_STATIONARY_THRESHOLD=1.0,
+    MOVING_WINDOW=3,
+    every_other_frame=True,
+    event_col='event',
+    plot_motion=True,
+    highlight_offensive_positions=True,
+    show_motion_frames=False,
+    highlight_oline=False,
+    highlight_primary_rb=False,
+    highlight_pullers=False,
+    speed_profiles=None
+) -> HTML:
+    """Animation of a play with the speed of its motion player, see `PlaySpeedViewer`.
+
+    When viewing many plays of a large tracking frame, build the smoothed
+    speeds of all plays once with `motion.speed_profiles` and pass them as
+    speed_profiles.
+    """
+    viewer = PlaySpeedViewer(
+        NON_STATIONARY_THRESHOLD=NON_STATIONARY_THRESHOLD,
+        MOVING_WINDOW=MOVING_WINDOW,
+        every_other_frame=every_other_frame,
+        event_col=event_col,
+        plot_motion=plot_motion,
+        highlight_offensive_positions=highlight_offensive_positions,
+        show_motion_frames=show_motion_frames,
+        highlight_oline=highlight_oline,
+        highlight_primary_rb=highlight_primary_rb,
+        highlight_pullers=highlight_pullers
+    )
+    return viewer.animate(df_tracking, game_play_id, speed_profiles)
@@ -1,21 +1,67 @@
+import os
+import copy
+import json
+import time
+import logging
+import warnings
+import multiprocessing as mp
+
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.patches import Rectangle, Polygon, Ellipse
 from matplotlib.font_manager import FontProperties
 from matplotlib.offsetbox import OffsetImage
-from matplotlib.patches import Wedge
+from matplotlib.collections import PatchCollection, PolyCollection
 from matplotlib.colors import to_rgba
+import matplotlib.transforms as mtransforms
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import matplotlib.colors as mcolors
 from IPython.display import HTML
-import urllib
-import PIL
 import numpy as np
 import pandas as pd
+from tqdm import tqdm
 
 from utils.image_functions import contrast_ratio, plot_image
+from utils.play_index import PlayIndex
+from utils.logo_cache import LogoCache, DEFAULT_CACHE_DIR
+from utils.encoder import FFmpegEncoder, ffmpeg_available
+from utils.profiling import StageTimer, timings_table, profile_call
+from utils.scrubber import FrameScrubber
+from utils.preview import PreviewRenderer
+from utils.vector_player import encode_array, to_centi, render_player_html, iframe_html, MISSING
 from visualization.scoreboard import Scoreboard
 
+logger = logging.getLogger(__name__)
+
+# Animator shared with forked batch render workers (see render_many)
+_BATCH_ANIMATOR = None
+
+def _init_batch_worker() -> None:
+    plt.switch_backend('Agg')
+
+def _render_batch_play(task: dict) -> dict:
+    """Render a single play of a batch, recording failures instead of raising."""
+    result = dict(task, status='ok', error=None)
+    start = time.perf_counter()
+    try:
+        _BATCH_ANIMATOR.animate_play(
+            task['game_id'],
+            task['play_id'],
+            output=task['output'],
+            filepath=task['filepath'],
+            fps=task['fps']
+        )
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    result['pid'] = os.getpid()
+    if _BATCH_ANIMATOR.timer.enabled:
+        result['timings'] = _BATCH_ANIMATOR.last_timings
+    return result
+
 class NFLPlayAnimator:
     def __init__(
         self, 
@@ -26,7 +72,11 @@ class NFLPlayAnimator:
         player_display_type: str = 'jerseys',
         show_player_legend: bool = True,
         plot_dir_arrows: bool = False,
-        show_trenches_paths: bool = False
+        show_trenches_paths: bool = False,
+        trenches_path_length: int | None = None,
+        logo_cache_dir: str = DEFAULT_CACHE_DIR,
+        ffmpeg_path: str = 'ffmpeg',
+        profile: bool = False
     ) -> None:
         """Used to plot 2d nfl tracking data.
         
@@ -47,16 +97,33 @@ class NFLPlayAnimator:
             plot_dir_arrows: Plot arrows showing player direction
             show_trenches_paths: Show paths of defensive and offensive linemen
                 as well as linebackers and tight ends.
+            trenches_path_length: Number of trailing frames to show in the 
+                trenches paths. Defaults to None (the full path).
+            logo_cache_dir: Directory of the on-disk team logo and wordmark 
+                cache. Defaults to '../../data/logo_cache'.
+            ffmpeg_path: The ffmpeg executable used to encode file outputs.
+                Defaults to 'ffmpeg'.
+            profile: Time each rendering stage (data filtering, field, 
+                scoreboard, legend, players, camera, trails, canvas draw and
+                encode) of every play, see `last_timings`. Defaults to False.
         """
 
-        self.df_tracking = df_tracking
+        # Sort and index the tracking data once so selecting a play or a
+        # frame is a slice rather than a scan of every row
+        self.play_index = PlayIndex(df_tracking)
+        self.df_tracking = self.play_index.df
         self.df_play = df_play
+        self._play_rows = {
+            key: i for i, key in enumerate(zip(df_play['game_id'].tolist(), df_play['play_id'].tolist()))
+        }
         self.show_scoreboard = show_scoreboard
         self.clock_rolling = clock_rolling
         self.player_display_type = player_display_type
         self.show_player_legend = show_player_legend
         self.plot_dir_arrows = plot_dir_arrows
         self.show_trenches_paths = show_trenches_paths
+        self.trenches_path_length = trenches_path_length
+        self.trenches_positions = ['T','TE','G','C','ILB','MLB','LB','DE','DT','NT','OLB']
         self.aspect_ratio = 1
         self.y_delta = 35
         self.x_limit_min = 0
@@ -65,6 +132,12 @@ class NFLPlayAnimator:
         self.legend_width = 12
         self.legend_txt_color = 'black'
         self.scoreboard_height = 3
+        self.logo_cache = LogoCache(logo_cache_dir)
+        self.ffmpeg_path = ffmpeg_path
+        self.timer = StageTimer(profile)
+        self._preview = None
+        self.last_timings = None
+        self.batch_timings = None
         mpl.rcParams['animation.embed_limit'] = 100
 
         self.position_colors = {
@@ -150,77 +223,31 @@ class NFLPlayAnimator:
             self._set_snap_frame_id = True
         return self._snap_frame_id
     
-    # w 100 h 49
+    # w 98 h 47
     @property
     def home_img(self):
         if self._home_img is None:
-            img = PIL.Image.open(urllib.request.urlopen(self.play_data['home_team_logo']))
-            img = img.convert('RGBA')
-
-            # Resize the image to have a height of 100 pixels, keeping the aspect ratio
-            width, height = img.size
-            new_width = 98
-            new_height = int((new_width / width) * height)
-            img_resized = img.resize((new_width, new_height), PIL.Image.Resampling.LANCZOS)
-
-            # crop height to be 49 pixels
-            height_extra = new_height - 47
-            if height_extra > 0:
-                y = height_extra // 2
-                height_delta = height_extra - y
-                img_resized = img_resized.crop((10, y, new_width, new_height - height_delta))
-
-            img_offset = OffsetImage(img_resized, zoom=1)
-
-            self._home_img = img_offset
-
+            self._home_img = OffsetImage(self.logo_cache.get(self.play_data['home_team_logo'], 'logo'), zoom=1)
         return self._home_img
     
     @property
     def away_img(self):
         if self._away_img is None:
-            img = PIL.Image.open(urllib.request.urlopen(self.play_data['away_team_logo']))
-            img = img.convert('RGBA')
-
-            # Resize the image to have a height of 100 pixels, keeping the aspect ratio
-            width, height = img.size
-            new_width = 98
-            new_height = int((new_width / width) * height)
-            img_resized = img.resize((new_width, new_height), PIL.Image.Resampling.LANCZOS)
-
-            # crop height to be 49 pixels
-            height_extra = new_height - 47
-            if height_extra > 0:
-                y = height_extra // 2
-                height_delta = height_extra - y
-                img_resized = img_resized.crop((10, y, new_width, new_height - height_delta))
-
-            img_offset = OffsetImage(img_resized, zoom=1)
-
-            self._away_img = img_offset
-
+            self._away_img = OffsetImage(self.logo_cache.get(self.play_data['away_team_logo'], 'logo'), zoom=1)
         return self._away_img
     
     @property
     def home_wordmark(self):
         if self._home_wordmark is None:
             self._home_wordmark = OffsetImage(
-                PIL.Image.open(
-                    urllib.request.urlopen(
-                        self.play_data['home_team_wordmark']
-                    )
-                ).convert('RGBA'), zoom=1)
+                self.logo_cache.get(self.play_data['home_team_wordmark'], 'wordmark'), zoom=1)
         return self._home_wordmark
     
     @property
     def home_wordmark_rotated(self):
         if self._home_wordmark_rotated is None:
             self._home_wordmark_rotated = OffsetImage(
-                PIL.Image.open(
-                    urllib.request.urlopen(
-                        self.play_data['home_team_wordmark']
-                    )
-                ).convert('RGBA').rotate(180), zoom=1)
+                self.logo_cache.get(self.play_data['home_team_wordmark'], 'wordmark_rotated'), zoom=1)
         return self._home_wordmark_rotated
 
     @property
@@ -262,19 +289,28 @@ class NFLPlayAnimator:
         if show_player_legend is not None:
             self.show_player_legend = show_player_legend
 
+    def _to_axes_y(self, offset: float) -> float:
+        """Convert yards above the bottom of the view to axes coordinates."""
+        return offset / self.y_delta
+
     def plot_field(self):
-        """Plot the NFL field layout with square aspect ratio."""
+        """Plot the NFL field layout with square aspect ratio.
+
+        The field is drawn once per play and retained across frames; only the
+        y-limits change as the camera follows the ball.
+        """
         # Hard limits for the x-axis (do not exceed the field width)
         if self.show_player_legend:
             self.ax.set_xlim(self.x_limit_min, self.x_limit_max + self.legend_width )
         else:
             self.ax.set_xlim(self.x_limit_min, self.x_limit_max)
-        # Hard limits for the y-axis, updated dynamically later
-        self.ax.set_ylim(self.y_limit_min, self.y_limit_min + self.y_delta)
-
         # Set y-axis ticks every 5 yards, excluding end zones
         yticks = [i for i in range(0, 121, 5) if i not in [5, 115]]
         self.ax.set_yticks(yticks)
+
+        # Hard limits for the y-axis, updated per frame by the camera (after
+        # the ticks, since set_yticks expands the view to include them)
+        self.ax.set_ylim(self.y_limit_min, self.y_limit_min + self.y_delta)
         
         # Remove x-axis ticks
         self.ax.set_xticks([self.x_limit_min, self.x_limit_max])
@@ -298,20 +334,22 @@ class NFLPlayAnimator:
         # Draw first down line
         self.ax.axhline(y=self.play_data['absolute_yardline_number'] + self.play_data['yards_to_go'], color='yellow', linewidth=2, zorder=self.zorder['los_and_fd'])
 
-        # Add yard markers
+        # Add yard markers, batched into a single collection
+        centerfield = self.x_limit_max / 2
+        hash_marks = []
         for y in range(11, 110, 1):
             if y % 5 != 0:
-                centerfield = self.x_limit_max / 2
-                left_outer = Rectangle((1/2, y - 0.05), 2/3, 0.04, color='white')
-                left_inner = Rectangle((centerfield - (37/12 + 1/3), y - 0.05), 2/3, 0.04, color='white')
-                right_inner = Rectangle((centerfield + (37/12 - 1/3), y - 0.05), 2/3, 0.04, color='white')
-                right_outer = Rectangle((self.x_limit_max - 7/6, y - 0.05), 2/3, 0.04, color='white')
-
-            for hash_mark in [left_outer, left_inner, right_inner, right_outer]:
-                self.ax.add_patch(hash_mark)
+                hash_marks.extend([
+                    Rectangle((1/2, y - 0.05), 2/3, 0.04),
+                    Rectangle((centerfield - (37/12 + 1/3), y - 0.05), 2/3, 0.04),
+                    Rectangle((centerfield + (37/12 - 1/3), y - 0.05), 2/3, 0.04),
+                    Rectangle((self.x_limit_max - 7/6, y - 0.05), 2/3, 0.04),
+                ])
+        self.ax.add_collection(PatchCollection(hash_marks, facecolor='white', edgecolor='white', zorder=1))
 
         # Add yardline numbers
         yardline_labels = {20: "1 0", 30: "2 0", 40: "3 0", 50: "4 0", 60: "5 0", 70: "4 0", 80: "3 0", 90: "2 0", 100: "1 0"}
+        triangles = []
         for y, label in yardline_labels.items():
             # Add yardline numbers on the left side
             self.ax.text(
@@ -336,84 +374,91 @@ class NFLPlayAnimator:
 
             if y > 60:
                 # plot arrows gonig up
-                left_triangle = Polygon([[12, y + 1.8], [12.2, y + 2.55], [12.4, y + 1.8]], color='white')
-                right_triangle = Polygon([[self.x_limit_max - 12, y + 1.8], [self.x_limit_max - 12.2, y + 2.55], [self.x_limit_max - 12.4, y + 1.8]], color='white')
-                self.ax.add_patch(left_triangle)
-                self.ax.add_patch(right_triangle)
+                triangles.append(Polygon([[12, y + 1.8], [12.2, y + 2.55], [12.4, y + 1.8]]))
+                triangles.append(Polygon([[self.x_limit_max - 12, y + 1.8], [self.x_limit_max - 12.2, y + 2.55], [self.x_limit_max - 12.4, y + 1.8]]))
             elif y < 60:
                 # plot arrows going down
-                left_triangle = Polygon([[12, y - 1.8], [12.2, y - 2.55], [12.4, y - 1.8]], color='white')
-                right_triangle = Polygon([[self.x_limit_max - 12, y - 1.8], [self.x_limit_max - 12.2, y - 2.55], [self.x_limit_max - 12.4, y - 1.8]], color='white')
-                self.ax.add_patch(left_triangle)
-                self.ax.add_patch(right_triangle)
+                triangles.append(Polygon([[12, y - 1.8], [12.2, y - 2.55], [12.4, y - 1.8]]))
+                triangles.append(Polygon([[self.x_limit_max - 12, y - 1.8], [self.x_limit_max - 12.2, y - 2.55], [self.x_limit_max - 12.4, y - 1.8]]))
+        self.ax.add_collection(PatchCollection(triangles, facecolor='white', edgecolor='white', zorder=1))
 
-        # if y_limit_min + y_delta > 110, plot home_team_wordmark image from url in endzone
-        if self.y_limit_min + self.y_delta > 110:
+        # Plot the endzones if the camera reaches them at any point in the play
+        y_limit_mins = self.camera_y_limit_mins.values()
+        if max(y_limit_mins) + self.y_delta > 110:
             # plot darker endzone
             endzone = Rectangle((0, 110), self.x_limit_max, 10, color='#b8b8b8')
             self.ax.add_patch(endzone)
             plot_image(self.ax, self.x_limit_max / 2, 115, self.home_wordmark, ord=self.zorder['endzones'])
 
-        if self.y_limit_min < 10:
+        if min(y_limit_mins) < 10:
             # plot darker endzone
             endzone = Rectangle((0, 0), self.x_limit_max, 10, color='#b8b8b8')
             self.ax.add_patch(endzone)
             plot_image(self.ax, self.x_limit_max / 2, 5, self.home_wordmark_rotated, ord=self.zorder['endzones'])
 
+    def _legend_identifier(self) -> str:
+        """Column identifying the players of the legend, which needs jerseys or positions."""
+        if self.player_display_type == 'jerseys': 
+            return 'jersey_number'
+        elif self.player_display_type == 'positions': 
+            return 'position'
+        raise ValueError("Invalid player_display_type. Must be one of 'jerseys' or 'positions'" + 
+                         " when show_player_legend is True.")
+
     def plot_player_legend(self):
-        y = self.y_limit_min + self.y_delta
+        """Plot the player legend, pinned to the right side of the view."""
+        transform = mtransforms.blended_transform_factory(self.ax.transData, self.ax.transAxes)
+        y = self.y_delta
         if self.show_scoreboard: y -= self.scoreboard_height
         rect_heading = Rectangle(
-            (self.x_limit_max, y),
+            (self.x_limit_max, self._to_axes_y(y)),
             self.legend_width ,
-            .15,
+            self._to_axes_y(.15),
             color=self.legend_txt_color,
+            transform=transform,
             zorder=self.zorder['player_legend']
         )
         self.ax.add_patch(rect_heading)
 
         h = self.y_delta if self.show_scoreboard else self.y_delta + self.scoreboard_height
         rect_body = Rectangle(
-            (self.x_limit_max, self.y_limit_min),
+            (self.x_limit_max, 0),
             self.legend_width ,
-            h,
+            self._to_axes_y(h),
             color='#f0eee9',
+            transform=transform,
             zorder=self.zorder['player_legend']
         )
         self.ax.add_patch(rect_body)
 
         self.ax.text(
-            self.x_limit_max + (self.legend_width  / 2), y + 1.6,
+            self.x_limit_max + (self.legend_width  / 2), self._to_axes_y(y + 1.6),
             'Player Legend',
             ha='center', va='center',
             fontsize=20,
             fontweight='bold',
             color=self.legend_txt_color,
+            transform=transform,
             zorder=self.zorder['player_legend_text'],
             fontdict={'family':'Arial'}
         )
         
         # loop through tracking data, plot {jersey_number}: {display_name} for each unique player
-        if self.player_display_type == 'jerseys': 
-            identifier = 'jersey_number'
-        elif self.player_display_type == 'positions': 
-            identifier = 'position'
-        else:
-            raise ValueError("Invalid player_display_type. Must be one of 'jerseys' or 'positions'" + 
-                             " when show_player_legend is True.")
-        players = self.tracking_data.query('club!="football"').groupby(['club', 'nfl_id', 'jersey_number', 'position', 'display_name']).size().reset_index()
+        identifier = self._legend_identifier()
+        players = self.tracking_data.query('club!="football"').groupby(['club', 'nfl_id', 'jersey_number', 'position', 'display_name'], observed=True).size().reset_index()
         players = players.sort_values(['club', 'jersey_number']).reset_index(drop=True)
         current_team = None
         for i, player in players.iterrows():
             if player['club'] != current_team:
                 current_team = player['club']
                 self.ax.text(
-                    self.x_limit_max + .5, y - 1 - 1.3 * i,
+                    self.x_limit_max + .5, self._to_axes_y(y - 1 - 1.3 * i),
                     f'{current_team}',
                     ha='left', va='center',
                     fontsize=14,
                     fontweight='bold',
                     color=self.legend_txt_color,
+                    transform=transform,
                     zorder=self.zorder['player_legend_text'],
                     fontdict={'family':'Arial'}
                 )
@@ -423,236 +468,350 @@ class NFLPlayAnimator:
             else:
                 msg = f'{player[identifier]}: {player.display_name}'
             self.ax.text(
-                self.x_limit_max + 1.5, y - 1 - 1.3 * i,
+                self.x_limit_max + 1.5, self._to_axes_y(y - 1 - 1.3 * i),
                 msg,
                 ha='left', va='center',
                 fontsize=12,
                 fontweight='normal',
                 color=self.legend_txt_color,
+                transform=transform,
                 zorder=self.zorder['player_legend_text'],
                 fontdict={'family':'Arial'}
             )
-    
-    def update_frame(self, frame_id):
-        """Update the plot for each frame."""
-        self.ax.clear()
 
-        # Plot the field
-        self.plot_field()
+    def _player_glyph_vertices(self, x, y, orientation, radius):
+        """Compute the glyph outline of every player in one vectorized pass.
 
-        # Get data for the current frame
-        frame_data = self.tracking_data[self.tracking_data['frame_id'] == frame_id]
-        
-        ball_y = None
-        
-        # Plot players and football
-        if self.player_display_type in ['dots-positional', 'dots-team']:
-            radius = 0.4
-        else:
-            radius = 0.7
-        for club, group in frame_data.groupby('club'):
-            if club == 'football':
-                size = 140
-                if self.player_display_type in ['dots-positional', 'dots-team']:
-                    size = 80
-                ball_y = group['y'].iloc[0]
-                # Plot football as a regular circle
-                ellipse = Ellipse((group['x'], group['y']), width=0.5, height=0.8, angle=0 , color='brown', ec='black', zorder=self.zorder['football'])
-                self.ax.add_patch(ellipse)
-                self.ax.scatter(group['x'], group['y'], color='white', marker='|', s=size / 3, zorder=self.zorder['football'])
+        The glyph is a circle with a flat side and a front "half-square": the
+        back half of the circle (opposite the orientation) followed by the two 
+        front corners of the square extending from the flat side.
+
+        Args:
+            x: Array of player x positions.
+            y: Array of player y positions.
+            orientation: Array of player orientations in degrees.
+            radius: Radius of the circle.
+
+        Returns:
+            Array of shape (n_players, n_arc_points + 2, 2) with the vertices.
+        """
+        angle_rad = np.radians(orientation)[:, None]
+
+        # Back half of the circle, from the right side of the flat edge around
+        # to the left side of the flat edge
+        theta = angle_rad + np.pi/2 + self._glyph_arc
+        arc_x = x[:, None] + radius * np.cos(theta)
+        arc_y = y[:, None] + radius * np.sin(theta)
+
+        # Direction vector for the front of the player (where the square will extend)
+        dx = radius * np.cos(angle_rad)
+        dy = radius * np.sin(angle_rad)
+
+        verts = np.empty((len(x), self._glyph_arc.size + 2, 2))
+        verts[:, :-2, 0] = arc_x
+        verts[:, :-2, 1] = arc_y
+        # Front-left and front-right corners (extend forward from the flat edge)
+        verts[:, -2, 0] = arc_x[:, -1] + dx[:, 0]
+        verts[:, -2, 1] = arc_y[:, -1] + dy[:, 0]
+        verts[:, -1, 0] = arc_x[:, 0] + dx[:, 0]
+        verts[:, -1, 1] = arc_y[:, 0] + dy[:, 0]
+        return verts
+
+    def _dir_arrow_vertices(self, x, y, direction):
+        """Compute the direction arrow triangles of every player at once."""
+        dir_radians = np.radians(direction)
+        dx = 0.5 * np.cos(dir_radians)
+        dy = 0.5 * np.sin(dir_radians)
+        return np.stack([
+            np.column_stack([x + dx, y + dy]),
+            np.column_stack([x + 0.5 * dx - 0.25 * dy, y + 0.5 * dy + 0.25 * dx]),
+            np.column_stack([x + 0.5 * dx + 0.25 * dy, y + 0.5 * dy - 0.25 * dx]),
+        ], axis=1)
+
+    def _init_player_artists(self):
+        """Create the retained player, football and trail artists for the play.
+
+        Each team gets one PolyCollection for the player glyphs (and one for 
+        the direction arrows), so a frame is a handful of draw calls. Only the
+        geometry is updated in `update_frame`.
+        """
+        self._team_artists = {}
+        self._trail_artists = {}
+
+        radius = 0.4 if self.player_display_type in ['dots-positional', 'dots-team'] else 0.7
+        self._player_radius = radius
+        self._glyph_arc = np.linspace(0, np.pi, 17)
+
+        players = self.tracking_data.query('club != "football"').drop_duplicates('nfl_id').sort_values('nfl_id')
+        for club, team in players.groupby('club', observed=True):
+            # Assign teams different colors
+            if club == self.play_data['possession_team']:
+                color_hex = self.poss_tm_color
+                color = to_rgba(self.poss_tm_color)
+                path_color = 'grey'
+                ec = to_rgba(self.poss_tm_edge_color)
+                zord_players = self.zorder['offense']
+                zord_player_numbers = self.zorder['offense_numbers']
             else:
-                # Assign teams different colors
-                if club == self.play_data['possession_team']:
-                    color_hex = self.poss_tm_color
-                    color = to_rgba(self.poss_tm_color)
-                    path_color = 'grey'
-                    ec = to_rgba(self.poss_tm_edge_color)
-                    zord_players = self.zorder['offense']
-                    zord_player_numbers = self.zorder['offense_numbers']
-                else:
-                    color_hex = self.def_tm_color
-                    color = to_rgba(self.def_tm_color)
-                    path_color = 'black'
-                    ec = to_rgba(self.def_tm_edge_color)
-                    zord_players = self.zorder['defense']
-                    zord_player_numbers = self.zorder['defense_numbers']
-
-                if frame_id >= self.snap_frame_id and self.show_trenches_paths:
-                    positions = ['T','TE','G','C','ILB','MLB','LB','G','DE','DT','NT','OLB']
-                    plays_before_current_frame = self.tracking_data.query('frame_id < @frame_id and position in @positions')
-                    if plays_before_current_frame.query('club == @club').shape[0] != 0:
-                        self.ax.scatter(
-                            plays_before_current_frame.query('club == @club')['x'],
-                            plays_before_current_frame.query('club == @club')['y'],
-                            color=path_color,
-                            s=5,
-                            zorder=zord_players
-                        )
-
-                # Plot players as circles with a flat side and a front "half-square"
-                for _, player in group.iterrows():
-                    if self.player_display_type == 'dots-positional':
-                        color = self.position_colors[player['position']]
-                        if player['club'] == self.play_data['possession_team']:
-                            ec = 'black'
-                        else:
-                            ec = 'blue'
-                    
-                    orientation = player['o']
-                    x, y = player['x'], player['y']
-                                            
-                    # Create the Wedge for each player (flat side 180 degrees opposite orientation)
-                    wedge = Wedge((x, y), radius, theta1=orientation+90, theta2=orientation-90, color=color, zorder=zord_players, ec=ec)
-
-                    # Add the wedge to the axis
-                    self.ax.add_patch(wedge)
-
-                    # Calculate the half-square vertices
-                    square_length = radius  # Length of the half-square extension in front of the flat side of the circle
-                    angle_rad = np.radians(orientation)
-
-                    # Calculate the direction vector for the front of the player (where the square will extend)
-                    dx = square_length * np.cos(angle_rad)
-                    dy = square_length * np.sin(angle_rad)
-
-                    # Compute points along the flat edge of the circle (aligned with the player's orientation)
-                    left_edge_x = x + radius * np.cos(angle_rad - np.pi/2)  # Left side of the flat edge
-                    left_edge_y = y + radius * np.sin(angle_rad - np.pi/2)
-                    right_edge_x = x + radius * np.cos(angle_rad + np.pi/2)  # Right side of the flat edge
-                    right_edge_y = y + radius * np.sin(angle_rad + np.pi/2)
-
-                    # Define the four corners of the square, extending from the flat side
-                    # These corners are along the flat edge and then extend forward in the direction of the player's orientation
-                    corners = [
-                        (right_edge_x, right_edge_y),  # Right side of flat edge
-                        (left_edge_x, left_edge_y),    # Left side of flat edge
-                        (left_edge_x + dx, left_edge_y + dy),  # Front-left (extend forward)
-                        (right_edge_x + dx, right_edge_y + dy)  # Front-right (extend forward)
-                    ]
-
-                    # Create the half-square polygon and add it to the axis
-                    half_square = Polygon(corners, closed=True, color=color, zorder=zord_players, ec=ec)
-                    self.ax.add_patch(half_square)
-
-                    # add rectangular patch where circle and square meet
-                    patch_radius = radius - 0.08
-                    left_edge_x = x + patch_radius * np.cos(angle_rad - np.pi/2)  # Left side of the flat edge
-                    left_edge_y = y + patch_radius * np.sin(angle_rad - np.pi/2)
-                    right_edge_x = x + patch_radius * np.cos(angle_rad + np.pi/2)  # Right side of the flat edge
-                    right_edge_y = y + patch_radius * np.sin(angle_rad + np.pi/2)
-                    corners = [
-                        (right_edge_x + .1 * dx, right_edge_y + .1 * dy),
-                        (left_edge_x + .1 * dx, left_edge_y + .1 * dy),
-                        (left_edge_x -.1 * dx, left_edge_y - .1 * dy),
-                        (right_edge_x - .1 * dx, right_edge_y -.1 * dy)
-                    ]
-                    rect = Polygon(corners, closed=True, color=color, zorder=zord_players)
-                    self.ax.add_patch(rect)
-
-                    if self.plot_dir_arrows:
-                        dir_radians = np.radians(player['dir'])
-                        dx = 0.5 * np.cos(dir_radians)
-                        dy = 0.5 * np.sin(dir_radians)
-                        arrow = Polygon(
-                            [[x + dx, y + dy], [x + 0.5 * dx - 0.25 * dy, y + 0.5 * dy + 0.25 * dx], [x + 0.5 * dx + 0.25 * dy, y + 0.5 * dy - 0.25 * dx]],
-                            closed=True, color='black', zorder=zord_players
-                        )
-                        self.ax.add_patch(arrow)
-
-                    # Plot the player's jersey number, centered at (x, y)
-                    if self.player_display_type == 'jerseys':
-                        jersey_number = int(player['jersey_number'])  # Convert float to int
-                        self.ax.text(
-                            x, y, 
-                            str(jersey_number), 
-                            color='white', 
-                            ha='center', va='center', 
-                            fontweight='bold', 
-                            fontsize=12, 
-                            zorder=zord_player_numbers
-                        )
-                    elif self.player_display_type in ['positions', 'dots-team']:
-                        if self.player_display_type == 'positions':
-                            fontsize = 9
-                        else:
-                            fontsize = 7
-                        # calculate font color which maximizes contrast with player color
-                        font_color = '#000000' if contrast_ratio(color_hex, '#000000') > contrast_ratio(color_hex, '#ffffff') else '#ffffff'
-                        position = self.position_mapping.get(player['position'], player['position'])
-                        self.ax.text(
-                            x, y, 
-                            position, 
-                            color=font_color,
-                            ha='center', 
-                            va='center', 
-                            fontweight='bold',
-                            fontsize=fontsize,
-                            zorder=zord_player_numbers
-                        )
-            
+                color_hex = self.def_tm_color
+                color = to_rgba(self.def_tm_color)
+                path_color = 'black'
+                ec = to_rgba(self.def_tm_edge_color)
+                zord_players = self.zorder['defense']
+                zord_player_numbers = self.zorder['defense_numbers']
+
+            if self.player_display_type == 'dots-positional':
+                colors = np.array([self.position_colors[p] for p in team['position']])
+                ec = 'black' if club == self.play_data['possession_team'] else 'blue'
+            else:
+                colors = np.tile(color, (len(team), 1))
+
+            artists = {
+                'nfl_ids': team['nfl_id'].to_numpy(),
+                'colors': colors,
+                'bodies': PolyCollection([], facecolors=colors, edgecolors=ec, zorder=zord_players),
+                'labels': [],
+            }
+            self.ax.add_collection(artists['bodies'])
+            if self.plot_dir_arrows:
+                artists['arrows'] = PolyCollection([], facecolors='black', edgecolors='black', zorder=zord_players)
+                self.ax.add_collection(artists['arrows'])
+
+            # Plot the player's jersey number or position, centered at (x, y)
+            if self.player_display_type == 'jerseys':
+                for jersey_number in team['jersey_number']:
+                    artists['labels'].append(self.ax.text(
+                        0, 0, 
+                        str(int(jersey_number)), 
+                        color='white', 
+                        ha='center', va='center', 
+                        fontweight='bold', 
+                        fontsize=12, 
+                        zorder=zord_player_numbers,
+                        visible=False
+                    ))
+            elif self.player_display_type in ['positions', 'dots-team']:
+                fontsize = 9 if self.player_display_type == 'positions' else 7
+                # calculate font color which maximizes contrast with player color
+                font_color = '#000000' if contrast_ratio(color_hex, '#000000') > contrast_ratio(color_hex, '#ffffff') else '#ffffff'
+                for position in team['position']:
+                    artists['labels'].append(self.ax.text(
+                        0, 0, 
+                        self.position_mapping.get(position, position), 
+                        color=font_color,
+                        ha='center', 
+                        va='center', 
+                        fontweight='bold',
+                        fontsize=fontsize,
+                        zorder=zord_player_numbers,
+                        visible=False
+                    ))
+            self._team_artists[club] = artists
+
+            if self.show_trenches_paths:
+                self._trail_artists[club] = self.ax.scatter(
+                    [], [],
+                    color=path_color,
+                    s=5,
+                    zorder=zord_players
+                )
+
+        if self.show_trenches_paths:
+            self._init_trenches_paths()
+
+        # Plot football as an ellipse with laces
+        size = 80 if self.player_display_type in ['dots-positional', 'dots-team'] else 140
+        self._football_artists = [
+            Ellipse((0, 0), width=0.5, height=0.8, angle=0 , color='brown', ec='black', zorder=self.zorder['football']),
+            self.ax.scatter([], [], color='white', marker='|', s=size / 3, zorder=self.zorder['football']),
+        ]
+        self.ax.add_patch(self._football_artists[0])
+        for artist in self._football_artists:
+            artist.set_visible(False)
+
+    @property
+    def dynamic_artists(self) -> list:
+        """Artists which change between frames (used for blitting)."""
+        artists = []
+        for team in self._team_artists.values():
+            artists.append(team['bodies'])
+            if 'arrows' in team:
+                artists.append(team['arrows'])
+            artists += team['labels']
+        artists += list(self._trail_artists.values())
+        artists += self._football_artists
+        artists += self._scoreboard_artists
+        return artists
+
+    def _compute_camera(self):
+        """Precompute the y-limits for each frame as the camera follows the ball."""
+        ball_ys = self.tracking_data.query('club == "football"').set_index('frame_id')['y']
+        y_limit_min = self.y_limit_min
+        self.camera_y_limit_mins = {}
+        for frame_id in self.frame_ids:
+            ball_y = ball_ys.get(frame_id)
             # Dynamically adjust the y-axis limit based on the ball's y position
             if ball_y is not None:
-                if ball_y < self.y_limit_min + 10:  # Ball near the bottom
-                    self.y_limit_min = max(0, ball_y - 10)
-                elif ball_y > self.y_limit_min + self.y_delta - 10:  # Ball near the top
-                    self.y_limit_min = min(120 - self.y_delta, ball_y - self.y_delta + 10)
-                self.ax.set_ylim(self.y_limit_min, self.y_limit_min + self.y_delta)
-
-        if self.show_scoreboard: 
-            self.scoreboard.plot_scoreboard(
-                self.x_limit_max,
-                self.y_limit_min,
-                frame_id
+                if ball_y < y_limit_min + 10:  # Ball near the bottom
+                    y_limit_min = max(0, ball_y - 10)
+                elif ball_y > y_limit_min + self.y_delta - 10:  # Ball near the top
+                    y_limit_min = min(120 - self.y_delta, ball_y - self.y_delta + 10)
+            self.camera_y_limit_mins[frame_id] = y_limit_min
+
+    def _update_camera(self, frame_id):
+        y_limit_min = self.camera_y_limit_mins[frame_id]
+        if y_limit_min == self.y_limit_min:
+            return
+        self.y_limit_min = y_limit_min
+        self.ax.set_ylim(self.y_limit_min, self.y_limit_min + self.y_delta)
+        if self.blit:
+            # The cached blit background is stale once the view moves, redraw
+            # the static layers so FuncAnimation re-caches a fresh background.
+            self.fig.canvas.draw()
+
+    def _update_players(self, frame_data):
+        """Move the retained player and football artists to this frame."""
+        clubs = frame_data['club'].to_numpy()
+
+        football = frame_data[clubs == 'football']
+        for artist in self._football_artists:
+            artist.set_visible(len(football) > 0)
+        if len(football) > 0:
+            ball_x, ball_y = football['x'].iloc[0], football['y'].iloc[0]
+            self._football_artists[0].set_center((ball_x, ball_y))
+            self._football_artists[1].set_offsets([[ball_x, ball_y]])
+
+        for club, team in self._team_artists.items():
+            players = frame_data[clubs == club]
+            idx = np.searchsorted(team['nfl_ids'], players['nfl_id'].to_numpy())
+            x = players['x'].to_numpy()
+            y = players['y'].to_numpy()
+
+            team['bodies'].set_verts(self._player_glyph_vertices(x, y, players['o'].to_numpy(), self._player_radius))
+            team['bodies'].set_facecolor(team['colors'][idx])
+
+            if 'arrows' in team:
+                team['arrows'].set_verts(self._dir_arrow_vertices(x, y, players['dir'].to_numpy()))
+
+            if team['labels']:
+                for label in team['labels']:
+                    label.set_visible(False)
+                for i, x_i, y_i in zip(idx, x, y):
+                    team['labels'][i].set_position((x_i, y_i))
+                    team['labels'][i].set_visible(True)
+
+    def _init_trenches_paths(self):
+        """Precompute the trajectories of the trenches players for the play.
+
+        The points of each club are ordered by frame, so the path up to any
+        frame is a prefix of the array (or a window when 
+        `trenches_path_length` is set).
+        """
+        self._trail_points = {}
+        trenches = self.tracking_data[self.tracking_data['position'].isin(self.trenches_positions)]
+        for club in self._trail_artists:
+            club_paths = trenches[trenches['club'] == club]
+            self._trail_points[club] = (
+                club_paths['frame_id'].to_numpy(),
+                club_paths[['x', 'y']].to_numpy(),
             )
 
-        if self.show_player_legend:
-            self.plot_player_legend()
+    def _update_trenches_paths(self, frame_id):
+        """Update the paths of the linemen up to the current frame."""
+        for club, trail in self._trail_artists.items():
+            frame_ids, points = self._trail_points[club]
+            if frame_id < self.snap_frame_id:
+                trail.set_offsets(points[:0])
+                continue
+            stop = np.searchsorted(frame_ids, frame_id, side='left')
+            start = 0
+            if self.trenches_path_length is not None:
+                start = np.searchsorted(frame_ids, frame_id - self.trenches_path_length, side='left')
+            trail.set_offsets(points[start:stop])
+    
+    def update_frame(self, frame_id):
+        """Update the retained artists for each frame.
+
+        Returns the artists that changed so the animation can be blitted.
+        """
+        with self.timer.stage('camera'):
+            self._update_camera(frame_id)
 
-        return self.ax
+        with self.timer.stage('players'):
+            # Get data for the current frame
+            frame_data = self.tracking_data.iloc[self.frame_slices[frame_id]]
+            self._update_players(frame_data)
+
+        if self.show_trenches_paths:
+            with self.timer.stage('trails'):
+                self._update_trenches_paths(frame_id)
+
+        if self.show_scoreboard: 
+            with self.timer.stage('scoreboard'):
+                self._scoreboard_artists = self.scoreboard.update_scoreboard(
+                    frame_id,
+                    self.y_limit_min
+                )
+
+        return self.dynamic_artists
     
-    def init_animation(self) -> mpl.axes.Axes:
-        """Initialize the animation to first frame of play."""
-        
-        self.plot_field()
+    def init_animation(self) -> list:
+        """Initialize the animation to first frame of play.
 
+        Draws the static layers (field, scoreboard shell and legend) once and
+        creates the retained player artists. Returns the dynamic artists.
+        """
+        with self.timer.stage('field'):
+            self.ax.clear()
+            self.y_limit_min = self.camera_y_limit_mins[self.frame_ids[0]]
+            self.plot_field()
+
+        self._scoreboard_artists = []
         if self.show_scoreboard: 
-            self.scoreboard = Scoreboard(
-                self.ax, 
-                self.play_data, 
-                self.tracking_data['frame_id'].unique().tolist(),
-                self.zorder,
-                self.snap_frame_id, 
-                self.touchdown_frame_id, 
-                self.home_img, 
-                self.away_img,
-                self.clock_rolling,
-                self.scoreboard_height
-            )
-            self.scoreboard.plot_scoreboard(
-                self.x_limit_max,
-                self.y_limit_min,
-                frame_id=self.tracking_data.frame_id.min()
-            )
+            with self.timer.stage('scoreboard'):
+                self.scoreboard = Scoreboard(
+                    self.ax, 
+                    self.play_data, 
+                    self.frame_ids.tolist(),
+                    self.zorder,
+                    self.snap_frame_id, 
+                    self.touchdown_frame_id, 
+                    self.home_img, 
+                    self.away_img,
+                    self.clock_rolling,
+                    self.scoreboard_height,
+                    self.y_delta
+                )
+                self._scoreboard_artists = self.scoreboard.plot_scoreboard(
+                    self.x_limit_max,
+                    self.y_limit_min,
+                    frame_id=self.frame_ids[0]
+                )
         
         if self.show_player_legend: 
-            self.plot_player_legend()
+            with self.timer.stage('legend'):
+                self.plot_player_legend()
+
+        with self.timer.stage('players'):
+            self._init_player_artists()
 
-        return self.ax
+        return self.dynamic_artists
     
     def _filter_data(self, game_id, play_id):
-        # Filter tracking data for the specific game and play
-        play = (self.df_tracking['game_id'] == game_id) & (self.df_tracking['play_id'] == play_id)
-        self.tracking_data = self.df_tracking[play].copy()
+        # Slice tracking data for the specific game and play
+        self.tracking_data = self.play_index.play(game_id, play_id)
+        self.frame_slices = self.play_index.frame_slices(game_id, play_id)
 
-        # Filter play data for the specific game and play
+        # Look up play data for the specific game and play
         play_cols = ['home_team_logo', 'away_team_logo', 'play_clock_at_snap', 'game_clock', 
              'absolute_yardline_number', 'yards_to_go', 'away_team_color', 
              'home_team_color', 'possession_team', 'defensive_team', 'down_and_dist', 
              'quarter_with_suffix', 'pre_snap_home_score', 'pre_snap_visitor_score',
              'possession_team_color', 'defensive_team_color', 'home_team_abbr', 'away_team_abbr',
              'home_team_wordmark', 'possession_team_color2', 'defensive_team_color2']
-        cndtn = (self.df_play['game_id'] == game_id) & (self.df_play['play_id'] == play_id)
-        self.play_data = self.df_play[cndtn][play_cols].to_dict(orient='records')[0]
+        if (game_id, play_id) not in self._play_rows:
+            raise ValueError(f"No play data for game_id={game_id}, play_id={play_id}.")
+        self.play_data = self.df_play.iloc[self._play_rows[(game_id, play_id)]][play_cols].to_dict()
 
     def _reset_flags_and_attributes(self):
         self._set_snap_frame_id = False
@@ -665,6 +824,7 @@ class NFLPlayAnimator:
         self._def_tm_edge_color = None
         self.poss_tm_color = self.play_data['possession_team_color']
         self.poss_tm_edge_color = self.play_data['possession_team_color2']
+        self.frame_ids = np.array(list(self.frame_slices))
 
         # Set y min to be 10 yards behind the ball at snap
         ball_loc_at_snap = self.tracking_data[
@@ -676,55 +836,450 @@ class NFLPlayAnimator:
         if self.show_scoreboard:
             self.y_limit_min -= self.scoreboard_height
 
+        self._compute_camera()
+
+    def _create_figure(self, agg: bool = False) -> None:
+        """Create the figure and axes of the animation.
+
+        Args:
+            agg: Create a standalone figure on an Agg canvas (no pyplot) for
+                rasterizing frames directly. Defaults to False.
+        """
+        figsize = (14, 8) if self.show_player_legend else (12, 8)
+        if agg:
+            self.fig = Figure(figsize=figsize)
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.subplots()
+        else:
+            self.fig, self.ax = plt.subplots(figsize=figsize)
+
+        # Fit the plot to the figure
+        self.fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
+
+    def _stream_to_files(self, filepaths: list, fps: int) -> None:
+        """Rasterize each frame with Agg and stream it straight into ffmpeg.
+
+        The Agg canvas reuses its RGBA buffer between draws, so each frame is
+        rendered once and its raw bytes are written to a single encoder pipe
+        that produces every requested output.
+        """
+        self.blit = False
+        self._create_figure(agg=True)
+        canvas = self.fig.canvas
+        width, height = (int(v) for v in self.fig.bbox.size)
+
+        self.init_animation()
+        # Stages nested in 'encode' are charged to themselves, so it only
+        # counts the ffmpeg process and the pipe writes
+        with self.timer.stage('encode'), FFmpegEncoder(filepaths, width, height, fps, self.ffmpeg_path) as encoder:
+            for frame_id in self.frame_ids:
+                self.update_frame(frame_id)
+                with self.timer.stage('draw'):
+                    canvas.draw()
+                encoder.write(canvas.buffer_rgba())
+
+    def _vector_payload(self, fps: int, scale: float = 16) -> dict:
+        """Data of the current play for the browser player of 'vector' output.
+
+        Instead of rasterizing frames, the positions and orientations (and
+        directions when drawn) of every player in every frame are packed
+        into int16 arrays, in hundredths of a yard (tenths of a degree), 
+        with the camera, labels, colours and scoreboard strings. The page 
+        draws the field and the players on a canvas.
+
+        Args:
+            fps: The frames per second of the player.
+            scale: Pixels per yard of the canvas. Defaults to 16.
+
+        Returns:
+            JSON serializable payload.
+        """
+        data = self.tracking_data
+        frame_ids = self.frame_ids
+        n_frames = len(frame_ids)
+        is_ball = (data['club'] == 'football').to_numpy()
+        frame_idx = np.searchsorted(frame_ids, data['frame_id'].to_numpy())
+
+        # Players in the same order as the matplotlib artists
+        players = {key: [] for key in ['nfl_id', 'club', 'color', 'edge', 'label', 'label_color', 
+                                       'offense', 'trail', 'trail_color']}
+        df_players = data[~is_ball].drop_duplicates('nfl_id').sort_values('nfl_id')
+        for club, team in df_players.groupby('club', observed=True):
+            offense = club == self.play_data['possession_team']
+            color_hex = self.poss_tm_color if offense else self.def_tm_color
+            if self.player_display_type == 'dots-positional':
+                colors = [mcolors.to_hex(self.position_colors[p]) for p in team['position']]
+                edge = 'black' if offense else 'blue'
+            else:
+                colors = [color_hex] * len(team)
+                edge = self.poss_tm_edge_color if offense else self.def_tm_edge_color
+
+            if self.player_display_type == 'jerseys':
+                labels = [str(int(j)) for j in team['jersey_number']]
+                label_color = '#ffffff'
+            elif self.player_display_type in ['positions', 'dots-team']:
+                labels = [self.position_mapping.get(p, p) for p in team['position']]
+                label_color = '#000000' if contrast_ratio(color_hex, '#000000') > contrast_ratio(color_hex, '#ffffff') else '#ffffff'
+            else:
+                labels = [''] * len(team)
+                label_color = '#000000'
+
+            players['nfl_id'] += team['nfl_id'].tolist()
+            players['club'] += [club] * len(team)
+            players['color'] += colors
+            players['edge'] += [edge] * len(team)
+            players['label'] += labels
+            players['label_color'] += [label_color] * len(team)
+            players['offense'] += [bool(offense)] * len(team)
+            players['trail'] += team['position'].isin(self.trenches_positions).tolist()
+            players['trail_color'] += ['grey' if offense else 'black'] * len(team)
+
+        n_players = len(players['nfl_id'])
+        player_idx = pd.Index(players.pop('nfl_id')).get_indexer(data['nfl_id'])
+        on_field = ~is_ball & (player_idx >= 0)
+        rows, cols = frame_idx[on_field], player_idx[on_field]
+
+        xy = np.full((n_frames, n_players, 2), MISSING, dtype=np.int16)
+        xy[rows, cols] = to_centi(data[['x', 'y']].to_numpy()[on_field])
+        ball = np.full((n_frames, 2), MISSING, dtype=np.int16)
+        ball[frame_idx[is_ball]] = to_centi(data[['x', 'y']].to_numpy()[is_ball])
+
+        camera = [self.camera_y_limit_mins[frame_id] for frame_id in frame_ids.tolist()]
+        payload = {
+            'fps': fps,
+            'scale': scale,
+            'field': {
+                'width': self.x_limit_max,
+                'y_delta': self.y_delta,
+                'los': float(self.play_data['absolute_yardline_number']),
+                'first_down': float(self.play_data['absolute_yardline_number'] + self.play_data['yards_to_go']),
+                'scoreboard_height': self.scoreboard_height,
+            },
+            'frame_ids': encode_array(frame_ids),
+            'camera': encode_array(to_centi(camera)),
+            'players': players,
+            'xy': encode_array(xy),
+            'ball': encode_array(ball),
+            'radius': 0.4 if self.player_display_type in ['dots-positional', 'dots-team'] else 0.7,
+            'label_size': {'jerseys': .74, 'positions': .56, 'dots-team': .43}.get(self.player_display_type, 0),
+            'o': None,
+            'dir': None,
+            'snap_index': int(np.searchsorted(frame_ids, self.snap_frame_id)),
+            'trails': {'length': self.trenches_path_length} if self.show_trenches_paths else None,
+            'scoreboard': None,
+            'legend': None,
+        }
+
+        # Every display type draws oriented glyphs
+        o = np.zeros((n_frames, n_players), dtype=np.int16)
+        o[rows, cols] = to_centi(data['o'].to_numpy()[on_field], scale=10)
+        payload['o'] = encode_array(o)
+        if self.plot_dir_arrows:
+            direction = np.zeros((n_frames, n_players), dtype=np.int16)
+            direction[rows, cols] = to_centi(data['dir'].to_numpy()[on_field], scale=10)
+            payload['dir'] = encode_array(direction)
+
+        if self.show_scoreboard:
+            scoreboard = Scoreboard(
+                None, dict(self.play_data), frame_ids.tolist(), self.zorder, self.snap_frame_id, 
+                self.touchdown_frame_id, None, None, self.clock_rolling, self.scoreboard_height, self.y_delta
+            )
+            home_scores, away_scores = [], []
+            for frame_id, y_limit_min in zip(frame_ids.tolist(), camera):
+                scoreboard.update_scores(frame_id, y_limit_min)
+                home_scores.append(int(scoreboard.home_score))
+                away_scores.append(int(scoreboard.visitor_score))
+            payload['scoreboard'] = {
+                'away_abbr': self.play_data['away_team_abbr'],
+                'home_abbr': self.play_data['home_team_abbr'],
+                'away_color': self.play_data['away_team_color'],
+                'home_color': self.play_data['home_team_color'],
+                'possession_color': self.play_data['possession_team_color'],
+                'down_and_dist': self.play_data['down_and_dist'],
+                'quarter': self.play_data['quarter_with_suffix'],
+                'game_clock': [scoreboard.game_clocks[f] for f in frame_ids.tolist()],
+                'play_clock': [int(scoreboard.play_clocks[f]) for f in frame_ids.tolist()],
+                'home_score': home_scores,
+                'away_score': away_scores,
+            }
+
+        if self.show_player_legend:
+            # Same display types as the matplotlib legend
+            identifier = self._legend_identifier()
+            df_legend = data[~is_ball].groupby(
+                ['club', 'nfl_id', 'jersey_number', 'position', 'display_name'], observed=True
+            ).size().reset_index().sort_values(['club', 'jersey_number'])
+            payload['legend'] = [
+                {
+                    'club': club,
+                    'players': [
+                        f'{p.position}: {p.display_name}' if identifier == 'position'
+                        else f'{int(p.jersey_number)}: {p.display_name} ({p.position})'
+                        for p in team.itertuples()
+                    ],
+                }
+                for club, team in df_legend.groupby('club', observed=True, sort=False)
+            ]
+        return payload
+
+    def _frame_scrubber(self, fps: int, cache_size: int, prefetch: int) -> FrameScrubber:
+        """Player of the current play which renders its frames lazily.
+
+        The player draws with a shallow copy of the animator, which keeps
+        its own figure and artists, so animating other plays does not
+        disturb it. Only the static layers are drawn up front.
+        """
+        view = copy.copy(self)
+        view.timer = StageTimer(False)
+        view.blit = False
+        view._create_figure(agg=True)
+        view.init_animation()
+
+        def render_frame(frame_id):
+            view.update_frame(frame_id)
+            view.fig.canvas.draw()
+            return view.fig.canvas.buffer_rgba()
+
+        return FrameScrubber(render_frame, self.frame_ids.tolist(), fps, cache_size, prefetch)
+
+    @property
+    def preview(self) -> PreviewRenderer:
+        """Renderer of 'preview' output, which keeps its field and sprites between plays."""
+        if self._preview is None:
+            self._preview = PreviewRenderer(self)
+        return self._preview
+
     def animate_play(
         self, 
         game_id, 
         play_id, 
         output='console', 
         filepath=None,
-        fps=10
+        fps=10,
+        blit=False,
+        cache_size=64,
+        prefetch=5
     ) -> None:
         """Create the animation of the play.
         
         Args:
             game_id: The game id.
             play_id: The play id.
-            output: The output of the animation. Options are 'console' or 'file'. Defaults to 'console'.
-            filepath: The filepath to save the animation if output is 'file'. Defaults to None.
+            output: The output of the animation. Options are 'console', 'interactive', 'vector' 
+                or 'file'. 'interactive' returns a `FrameScrubber` which renders frames on demand 
+                as the player asks for them. 'vector' writes the play's data to a self-contained 
+                HTML page drawn by the browser (to filepath, or displayed when filepath is None),
+                see `_vector_payload`. 'preview' writes a fast 'dots-team' sketch of the play without 
+                scoreboard, legend or trails to filepath, see `PreviewRenderer`. Defaults to 'console'.
+            filepath: The filepath to save the animation if output is 'file' or 'preview', or a list of
+                filepaths (e.g. an .mp4 and a .gif) rendered from the same pass. Defaults to None.
             fps: The frames per second of the animation. Defaults to 10.
+            blit: Blit the dynamic artists over a cached background when the
+                animation is displayed interactively. Defaults to False.
+            cache_size: Number of rendered frames kept by the 'interactive' 
+                player. Defaults to 64.
+            prefetch: Number of frames the 'interactive' player renders ahead
+                in the background. Defaults to 5.
         """
 
-        if output == 'file' and filepath is None: 
-            raise ValueError("If output is 'file', a filepath must be provided.")
-
-        self._filter_data(game_id, play_id)
-
-        self._reset_flags_and_attributes()
+        if output in ['file', 'preview'] and filepath is None: 
+            raise ValueError(f"If output is '{output}', a filepath must be provided.")
+
+        self.timer.reset()
+        start = time.perf_counter()
+        try:
+            return self._animate_play(game_id, play_id, output, filepath, fps, blit, cache_size, prefetch)
+        finally:
+            if self.timer.enabled:
+                self._log_timings(game_id, play_id, time.perf_counter() - start)
+
+    def _animate_play(self, game_id, play_id, output, filepath, fps, blit, cache_size, prefetch):
+        with self.timer.stage('filter_data'):
+            self._filter_data(game_id, play_id)
+            self._reset_flags_and_attributes()
+
+        if output == 'interactive':
+            return self._frame_scrubber(fps, cache_size, prefetch)
+
+        if output == 'vector':
+            with self.timer.stage('encode'):
+                page = render_player_html(self._vector_payload(fps), f'{game_id}_{play_id}')
+                if filepath is None:
+                    with warnings.catch_warnings():
+                        # IPython suggests IFrame, which needs a URL rather than a page
+                        warnings.simplefilter('ignore', UserWarning)
+                        return HTML(iframe_html(page))
+                for path in [filepath] if isinstance(filepath, str) else filepath:
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(page)
+            return None
+
+        if output == 'preview':
+            if not ffmpeg_available(self.ffmpeg_path):
+                raise ValueError(f"{self.ffmpeg_path} not found, which is required for 'preview' output.")
+            self.preview.render([filepath] if isinstance(filepath, str) else list(filepath), fps)
+            return None
+
+        if output == 'file':
+            filepaths = [filepath] if isinstance(filepath, str) else list(filepath)
+            if ffmpeg_available(self.ffmpeg_path):
+                self._stream_to_files(filepaths, fps)
+                return None
+            warnings.warn(f"{self.ffmpeg_path} not found, falling back to matplotlib's animation writers.")
+
+        self.blit = blit
 
         # Create a new figure
-        if self.show_player_legend:
-            self.fig, self.ax = plt.subplots(figsize=(14, 8))
-        else:
-            self.fig, self.ax = plt.subplots(figsize=(12, 8))
-
-        frame_ids = self.tracking_data['frame_id'].unique()
+        self._create_figure()
 
         ani = animation.FuncAnimation(
             self.fig, 
             self.update_frame,
-            frames=frame_ids, 
+            frames=self.frame_ids, 
             init_func=self.init_animation, 
-            blit=False, 
+            blit=blit, 
             repeat=False
         )
 
-        # Fit the plot to the figure
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-
         plt.close(self.fig)
 
-        if output == 'console':
-            return HTML(ani.to_jshtml(fps=fps))
-        elif output == 'file':
-            ani.save(filepath, writer='ffmpeg', fps=fps)
-            return None
\ No newline at end of file
+        # matplotlib draws and encodes the frames together, so 'encode' also
+        # includes the canvas draws here
+        with self.timer.stage('encode'):
+            if output == 'console':
+                return HTML(ani.to_jshtml(fps=fps))
+            elif output == 'file':
+                for filepath in filepaths:
+                    ani.save(filepath, writer='ffmpeg', fps=fps)
+                return None
+
+    def _log_timings(self, game_id, play_id, seconds: float) -> None:
+        """Keep the stage timings of the last play and log them as JSON."""
+        self.last_timings = self.timer.summary()
+        logger.info(json.dumps({
+            'event': 'play_timings',
+            'game_id': int(game_id),
+            'play_id': int(play_id),
+            'n_frames': len(getattr(self, 'frame_ids', [])),
+            'total_s': round(seconds, 6),
+            'stages': self.last_timings,
+        }))
+
+    def profile_play(
+        self,
+        game_id,
+        play_id,
+        profile_path: str = None,
+        sort: str = 'cumulative',
+        limit: int = 30,
+        **kwargs
+    ):
+        """Render a single play under cProfile and print the hottest functions.
+
+        The play is rendered by a single `animate_play` call, so sampling
+        profilers (e.g. `py-spy record --function`) also see it as one
+        subtree.
+
+        Args:
+            game_id: The game id.
+            play_id: The play id.
+            profile_path: Dump the raw stats here (e.g. for snakeviz). 
+                Defaults to None.
+            sort: Sort key of the printed stats. Defaults to 'cumulative'.
+            limit: Number of functions printed. Defaults to 30.
+            **kwargs: Passed to `animate_play`, e.g. output and filepath.
+
+        Returns:
+            The pstats.Stats of the render.
+        """
+        return profile_call(
+            self.animate_play, game_id, play_id, 
+            profile_path=profile_path, sort=sort, limit=limit, **kwargs
+        )
+
+    def render_many(
+        self,
+        plays: pd.DataFrame,
+        out_dir: str = None,
+        workers: int = 1,
+        fps: int = 10,
+        file_ext: str = 'mp4',
+        manifest_path: str = None,
+        output: str = 'file'
+    ) -> pd.DataFrame:
+        """Render many plays to file, optionally across a pool of processes.
+
+        Workers are forked from the current process, so they share the indexed
+        tracking data copy-on-write instead of each receiving a pickled copy.
+        A failing play is recorded in the manifest and does not stop the batch.
+
+        Args:
+            plays: DataFrame with game_id and play_id columns, and optionally a
+                filepath column with the output file of each play.
+            out_dir: Directory for plays without a filepath, written as 
+                {game_id}_{play_id}.{file_ext}. Defaults to None.
+            workers: Number of worker processes. Defaults to 1 (in process).
+            fps: The frames per second of the animations. Defaults to 10.
+            file_ext: File extension used with out_dir. Defaults to 'mp4'.
+            manifest_path: Path of the JSON manifest. Defaults to 
+                {out_dir}/manifest.json when out_dir is given.
+            output: 'file', or 'preview' for fast sketches of the plays (e.g. 
+                to triage a large batch). Defaults to 'file'.
+
+        Returns:
+            The manifest, one row per play with its filepath, status, error,
+            render time in seconds and worker pid. When profiling, the stage
+            timings of each play are in a timings column and their summary
+            over the batch is kept in `batch_timings`.
+        """
+        global _BATCH_ANIMATOR
+
+        tasks = []
+        for play in plays.to_dict(orient='records'):
+            filepath = play.get('filepath')
+            if filepath is None or filepath != filepath:
+                if out_dir is None:
+                    raise ValueError("Either an out_dir or a filepath column must be provided.")
+                filepath = os.path.join(out_dir, f"{play['game_id']}_{play['play_id']}.{file_ext}")
+            os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+            tasks.append({
+                'game_id': play['game_id'],
+                'play_id': play['play_id'],
+                'filepath': filepath,
+                'fps': fps,
+                'output': output,
+            })
+
+        if workers > 1 and 'fork' not in mp.get_all_start_methods():
+            warnings.warn("Forked workers are not available on this platform, rendering in process.")
+            workers = 1
+
+        _BATCH_ANIMATOR = self
+        try:
+            if workers > 1:
+                with mp.get_context('fork').Pool(workers, initializer=_init_batch_worker) as pool:
+                    results = list(tqdm(
+                        pool.imap_unordered(_render_batch_play, tasks),
+                        total=len(tasks),
+                        desc='Rendering plays'
+                    ))
+            else:
+                results = [_render_batch_play(task) for task in tqdm(tasks, desc='Rendering plays')]
+        finally:
+            _BATCH_ANIMATOR = None
+
+        columns = ['game_id', 'play_id', 'filepath', 'fps', 'status', 'error', 'seconds', 'pid']
+        if self.timer.enabled:
+            columns.append('timings')
+        manifest = pd.DataFrame(results, columns=columns)
+
+        if self.timer.enabled:
+            self.batch_timings = timings_table(manifest['timings'].tolist())
+            logger.info('Batch stage timings:\n' + self.batch_timings.to_string())
+
+        if manifest_path is None and out_dir is not None:
+            manifest_path = os.path.join(out_dir, 'manifest.json')
+        if manifest_path is not None:
+            manifest.to_json(manifest_path, orient='records', indent=2)
+
+        return manifest
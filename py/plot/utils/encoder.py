@@ -0,0 +1,125 @@
+import os
+import shutil
+import subprocess
+
+VIDEO_CODECS = {
+    '.mp4': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p'],
+    '.mov': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p'],
+    '.mkv': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p'],
+    '.webm': ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuv420p'],
+}
+
+def ffmpeg_available(ffmpeg_path: str = 'ffmpeg') -> bool:
+    return shutil.which(ffmpeg_path) is not None
+
+class FFmpegEncoder:
+    def __init__(
+            self,
+            filepaths: list,
+            width: int,
+            height: int,
+            fps: int = 10,
+            ffmpeg_path: str = 'ffmpeg',
+            pix_fmt: str = 'rgba'
+        ) -> None:
+        """Long-lived ffmpeg pipe which encodes raw RGBA frames.
+
+        Frames are written as raw bytes (e.g. the Agg canvas `buffer_rgba`)
+        straight into ffmpeg's stdin. Several outputs, e.g. an .mp4 and a
+        .gif, are encoded from the same stream of frames in one process.
+
+        Args:
+            filepaths: Output files. Supported extensions are .mp4, .mov,
+                .mkv, .webm and .gif.
+            width: Frame width in pixels.
+            height: Frame height in pixels.
+            fps: The frames per second of the outputs. Defaults to 10.
+            ffmpeg_path: The ffmpeg executable. Defaults to 'ffmpeg'.
+            pix_fmt: Pixel format of the raw frames, 'rgba' or 'rgb24'. 
+                Defaults to 'rgba'.
+        """
+        if isinstance(filepaths, str):
+            filepaths = [filepaths]
+        for filepath in filepaths:
+            ext = os.path.splitext(filepath)[1].lower()
+            if ext not in VIDEO_CODECS and ext != '.gif':
+                raise ValueError(f"Unsupported output format '{ext}'. Must be one of " +
+                                 f"{list(VIDEO_CODECS) + ['.gif']}.")
+        self.filepaths = list(filepaths)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.ffmpeg_path = ffmpeg_path
+        self.pix_fmt = pix_fmt
+        self._proc = None
+
+    def build_command(self) -> list:
+        """Build the ffmpeg command reading raw frames from stdin."""
+        cmd = [
+            self.ffmpeg_path, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', self.pix_fmt,
+            '-s', f'{self.width}x{self.height}',
+            '-r', str(self.fps),
+            '-i', 'pipe:0',
+        ]
+
+        # Split the input once per output, video outputs are padded to even
+        # dimensions for yuv420p and gifs get their own palette
+        n_outputs = len(self.filepaths)
+        filters = [f'[0:v]split={n_outputs}' + ''.join(f'[in{i}]' for i in range(n_outputs))]
+        for i, filepath in enumerate(self.filepaths):
+            if filepath.lower().endswith('.gif'):
+                filters.append(f'[in{i}]split[g{i}a][g{i}b]')
+                filters.append(f'[g{i}a]palettegen[p{i}]')
+                filters.append(f'[g{i}b][p{i}]paletteuse[out{i}]')
+            else:
+                filters.append(f'[in{i}]pad=ceil(iw/2)*2:ceil(ih/2)*2[out{i}]')
+        cmd += ['-filter_complex', ';'.join(filters)]
+
+        for i, filepath in enumerate(self.filepaths):
+            ext = os.path.splitext(filepath)[1].lower()
+            cmd += ['-map', f'[out{i}]', '-r', str(self.fps)]
+            if ext != '.gif':
+                cmd += VIDEO_CODECS[ext]
+            cmd.append(filepath)
+        return cmd
+
+    def open(self) -> 'FFmpegEncoder':
+        self._proc = subprocess.Popen(
+            self.build_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        return self
+
+    def write(self, frame) -> None:
+        """Write one frame of raw bytes (width * height * 4 for RGBA)."""
+        try:
+            self._proc.stdin.write(frame)
+        except BrokenPipeError:
+            self._proc.wait()
+            raise RuntimeError(f'ffmpeg exited early: {self._proc.stderr.read().decode()}') from None
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = proc.stderr.read().decode()
+        if proc.wait() != 0:
+            raise RuntimeError(f'ffmpeg failed with exit code {proc.returncode}: {stderr}')
+
+    def __enter__(self) -> 'FFmpegEncoder':
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None and self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+            return
+        self.close()
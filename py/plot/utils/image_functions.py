@@ -34,6 +34,7 @@ def plot_image(
     imagebox:OffsetImage, 
     ord:int, 
     alignment='center',
+    xycoords='data',
 ) -> mpl.axes.Axes:
     """Helper function to add team logo to the plot."""
     if alignment == 'center':
@@ -44,7 +45,7 @@ def plot_image(
         offsetbox=imagebox, 
         xy=(x, y),
         xybox=(0, 0),
-        xycoords='data',
+        xycoords=xycoords,
         boxcoords='offset points', 
         box_alignment=box_alignment,
         frameon=False,
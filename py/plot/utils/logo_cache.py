@@ -0,0 +1,147 @@
+import os
+import hashlib
+import argparse
+import urllib.request
+from collections import OrderedDict
+
+import numpy as np
+import PIL.Image
+
+DEFAULT_CACHE_DIR = '../../data/logo_cache'
+
+def process_logo(img: PIL.Image.Image) -> PIL.Image.Image:
+    """Resize a team logo to fit the scoreboard (98 x 47 pixels)."""
+    img = img.convert('RGBA')
+
+    # Resize the image to have a width of 98 pixels, keeping the aspect ratio
+    width, height = img.size
+    new_width = 98
+    new_height = int((new_width / width) * height)
+    img_resized = img.resize((new_width, new_height), PIL.Image.Resampling.LANCZOS)
+
+    # crop height to be 47 pixels
+    height_extra = new_height - 47
+    if height_extra > 0:
+        y = height_extra // 2
+        height_delta = height_extra - y
+        img_resized = img_resized.crop((10, y, new_width, new_height - height_delta))
+
+    return img_resized
+
+def process_wordmark(img: PIL.Image.Image) -> PIL.Image.Image:
+    return img.convert('RGBA')
+
+def process_wordmark_rotated(img: PIL.Image.Image) -> PIL.Image.Image:
+    return img.convert('RGBA').rotate(180)
+
+PROCESSORS = {
+    'logo': process_logo,
+    'wordmark': process_wordmark,
+    'wordmark_rotated': process_wordmark_rotated,
+}
+
+class LogoCache:
+    def __init__(
+            self,
+            cache_dir: str = DEFAULT_CACHE_DIR,
+            maxsize: int = 128
+        ) -> None:
+        """Cache of processed team logos and wordmarks.
+
+        Images are keyed by URL and variant ('logo', 'wordmark' or
+        'wordmark_rotated'). Processed RGBA arrays are kept in an in-process
+        LRU and stored on disk as .npy files, so the network is only used the
+        first time a URL is seen.
+
+        Args:
+            cache_dir: Directory of the on-disk store. Defaults to
+                '../../data/logo_cache'.
+            maxsize: Number of images kept in memory. Defaults to 128.
+        """
+        self.cache_dir = cache_dir
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+
+    def _path(self, url: str, variant: str) -> str:
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}_{variant}.npy')
+
+    def _fetch(self, url: str, variant: str) -> np.ndarray:
+        try:
+            img = PIL.Image.open(urllib.request.urlopen(url))
+        except OSError as e:
+            raise OSError(f"Could not fetch {url} and it is not in the logo cache " +
+                          f"({self.cache_dir}). Run logo_cache.py to prefetch it.") from e
+        return np.asarray(PROCESSORS[variant](img))
+
+    def get(self, url: str, variant: str = 'logo') -> np.ndarray:
+        """Get the processed RGBA array of an image.
+
+        Args:
+            url: URL of the image.
+            variant: How the image is processed. One of 'logo', 'wordmark'
+                or 'wordmark_rotated'. Defaults to 'logo'.
+
+        Returns:
+            The processed image as a (height, width, 4) uint8 array.
+        """
+        if variant not in PROCESSORS:
+            raise ValueError(f"Invalid variant. Must be one of {list(PROCESSORS)}.")
+
+        key = (url, variant)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        path = self._path(url, variant)
+        if os.path.exists(path):
+            arr = np.load(path)
+        else:
+            arr = self._fetch(url, variant)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, arr)
+            os.replace(tmp_path, path)
+
+        self._memory[key] = arr
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+        return arr
+
+    def prefetch(self, logo_urls: list, wordmark_urls: list) -> int:
+        """Warm the cache with logos and wordmarks.
+
+        Returns:
+            The number of images which could not be fetched.
+        """
+        n_failed = 0
+        requests = [(url, 'logo') for url in logo_urls]
+        requests += [(url, variant) for url in wordmark_urls for variant in ['wordmark', 'wordmark_rotated']]
+        for url, variant in requests:
+            if url is None or url != url:
+                continue
+            try:
+                self.get(url, variant)
+            except OSError as e:
+                print(f'WARNING: {e}')
+                n_failed += 1
+        return n_failed
+
+def prefetch_team_assets(cache_dir: str = DEFAULT_CACHE_DIR) -> int:
+    """Warm the logo cache with every team from nfl_data_py."""
+    import nfl_data_py as nfl
+
+    df_teams = nfl.import_team_desc()
+    cache = LogoCache(cache_dir)
+    return cache.prefetch(
+        df_teams['team_logo_wikipedia'].dropna().unique().tolist(),
+        df_teams['team_wordmark'].dropna().unique().tolist()
+    )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prefetch team logos and wordmarks into the logo cache.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory of the logo cache.')
+    args = parser.parse_args()
+    n_failed = prefetch_team_assets(args.cache_dir)
+    print(f'Logo cache at {args.cache_dir} is warm ({n_failed} failures).')
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+class PlayIndex:
+    def __init__(
+            self,
+            df_tracking: pd.DataFrame,
+        ) -> None:
+        """Index of tracking data by play and frame.
+
+        The tracking data is sorted once by game, play, frame and player so
+        each play is a contiguous block of rows and each frame is a contiguous
+        block within the play. Selecting a play is then a dictionary lookup
+        plus a row slice, and selecting a frame is a slice of that play.
+        Data which is already sorted (with the football's missing nfl_id
+        last) is used as is, without a sort or a copy. Rows are only
+        accessed by position, so its index is kept.
+
+        Args:
+            df_tracking: DataFrame containing tracking data with at least
+                game_id, play_id, frame_id and nfl_id columns.
+        """
+        sort_cols = ['game_id', 'play_id', 'frame_id', 'nfl_id']
+        if not self._is_sorted(df_tracking, sort_cols):
+            df_tracking = (
+                df_tracking
+                .sort_values(sort_cols, kind='mergesort', na_position='last')
+                .reset_index(drop=True)
+            )
+        self.df = df_tracking
+
+        game_ids = self.df['game_id'].to_numpy()
+        play_ids = self.df['play_id'].to_numpy()
+        frame_ids = self.df['frame_id'].to_numpy()
+        n_rows = len(self.df)
+
+        # Rows where a new play starts
+        new_play = np.ones(n_rows, dtype=bool)
+        new_play[1:] = (game_ids[1:] != game_ids[:-1]) | (play_ids[1:] != play_ids[:-1])
+        play_starts = np.flatnonzero(new_play)
+        play_stops = np.append(play_starts[1:], n_rows)
+
+        # Rows where a new frame starts (a new play always starts a new frame)
+        new_frame = new_play.copy()
+        new_frame[1:] |= frame_ids[1:] != frame_ids[:-1]
+        self.frame_starts = np.flatnonzero(new_frame)
+        self.frame_ids = frame_ids[self.frame_starts]
+
+        # First and last (exclusive) frame number of each play
+        frame_start_idx = np.searchsorted(self.frame_starts, play_starts)
+        frame_stop_idx = np.append(frame_start_idx[1:], len(self.frame_starts))
+
+        self.plays = {
+            (game_id, play_id): (start, stop, frame_start, frame_stop)
+            for game_id, play_id, start, stop, frame_start, frame_stop in zip(
+                game_ids[play_starts].tolist(),
+                play_ids[play_starts].tolist(),
+                play_starts.tolist(),
+                play_stops.tolist(),
+                frame_start_idx.tolist(),
+                frame_stop_idx.tolist(),
+            )
+        }
+
+    @staticmethod
+    def _is_sorted(df: pd.DataFrame, cols: list) -> bool:
+        """Whether the rows are sorted by cols, with missing values last."""
+        if len(df) < 2:
+            return True
+        # Pairs of consecutive rows equal on all the columns compared so far
+        tied = np.ones(len(df) - 1, dtype=bool)
+        for col in cols:
+            key = df[col].to_numpy()
+            missing = pd.isna(key)
+            prev, curr = key[:-1], key[1:]
+            prev_missing, curr_missing = missing[:-1], missing[1:]
+            with np.errstate(invalid='ignore'):
+                descending = (prev > curr) | (prev_missing & ~curr_missing)
+                equal = (prev == curr) | (prev_missing & curr_missing)
+            if (tied & descending).any():
+                return False
+            tied &= equal
+            if not tied.any():
+                break
+        return True
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.plays
+
+    def __len__(self) -> int:
+        return len(self.plays)
+
+    def _lookup(self, game_id, play_id) -> tuple:
+        try:
+            return self.plays[(game_id, play_id)]
+        except KeyError:
+            raise ValueError(f"No tracking data for game_id={game_id}, play_id={play_id}.") from None
+
+    def play_slice(self, game_id, play_id) -> slice:
+        """Row slice of the play in the sorted tracking data."""
+        start, stop, _, _ = self._lookup(game_id, play_id)
+        return slice(start, stop)
+
+    def play(self, game_id, play_id) -> pd.DataFrame:
+        """Tracking data for a single play, sorted by frame and player."""
+        return self.df.iloc[self.play_slice(game_id, play_id)].reset_index(drop=True)
+
+    def frame_slices(self, game_id, play_id) -> dict:
+        """Row slices of each frame, relative to the start of the play.
+
+        Returns:
+            Dictionary mapping frame_id to the slice of rows of that frame
+            within the DataFrame returned by `play`.
+        """
+        start, stop, frame_start, frame_stop = self._lookup(game_id, play_id)
+        starts = self.frame_starts[frame_start:frame_stop] - start
+        stops = np.append(starts[1:], stop - start)
+        return {
+            frame_id: slice(frame_row_start, frame_row_stop)
+            for frame_id, frame_row_start, frame_row_stop in zip(
+                self.frame_ids[frame_start:frame_stop].tolist(),
+                starts.tolist(),
+                stops.tolist(),
+            )
+        }
@@ -0,0 +1,213 @@
+import copy
+import math
+
+import numpy as np
+import PIL.Image
+import PIL.ImageDraw
+import PIL.ImageFont
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.font_manager import FontProperties, findfont
+
+from utils.image_functions import contrast_ratio
+from utils.encoder import FFmpegEncoder
+
+# Pixels per yard of the matplotlib animation (12 inch wide figure at 100
+# dpi showing the field width), used to scale font sizes and line widths
+REFERENCE_PX_PER_YARD = 100 * 12 / 53.3
+FIELD_LENGTH = 120
+
+class Sprite:
+    def __init__(self, image: PIL.Image.Image) -> None:
+        """Pre-rendered RGBA image pasted centered on a position."""
+        self.image = image
+        self.cx = image.width // 2
+        self.cy = image.height // 2
+
+class PreviewRenderer:
+    def __init__(
+            self,
+            animator,
+            scale: float = 12,
+            supersample: int = 4
+        ) -> None:
+        """Fast 'dots-team' preview of plays drawn without matplotlib artists.
+
+        The field (yard lines, hash marks, numbers and end zones) is
+        rasterized once with the animator's own `plot_field` over the whole
+        length of the field and cached per home team. Each play adds its line
+        of scrimmage and first down line to a copy, and each frame is a crop
+        of that background at the animator's camera position onto which
+        pre-rendered sprites of the player dots (with their position labels)
+        and the ball are pasted with Pillow.
+
+        The preview has the look of `player_display_type='dots-team'`
+        without scoreboard, legend, trails or arrows, at a fraction of the
+        cost per frame. It is meant for triage, not for publishing.
+
+        Args:
+            animator: The NFLPlayAnimator whose current play is rendered.
+            scale: Pixels per yard. Defaults to 12.
+            supersample: Oversampling of the sprites for anti-aliasing.
+                Defaults to 4.
+        """
+        self.animator = animator
+        self.scale = scale
+        self.supersample = supersample
+        # Points to pixels, so texts and lines keep their size relative to the field
+        self.dpi = 100 * scale / REFERENCE_PX_PER_YARD
+        self.width = int(round(animator.x_limit_max * scale))
+        self.height = int(round(animator.y_delta * scale))
+        self.font_path = findfont(FontProperties(family='DejaVu Sans', weight='bold'))
+        self._fields = {}
+        self._sprites = {}
+
+    def _points(self, points: float) -> float:
+        return points * self.dpi / 72
+
+    def _field(self) -> PIL.Image.Image:
+        """Field of the current play's home team over its whole length."""
+        a = self.animator
+        key = a.play_data['home_team_wordmark']
+        if key not in self._fields:
+            # Draw with a copy of the animator: lines of scrimmage out of view
+            # and a camera reaching both end zones
+            view = copy.copy(a)
+            view.play_data = dict(a.play_data, absolute_yardline_number=-10, yards_to_go=0)
+            view.show_player_legend = False
+            view.camera_y_limit_mins = {0: 0, 1: FIELD_LENGTH - a.y_delta}
+            view.y_limit_min = 0
+
+            height = int(round(FIELD_LENGTH * self.scale))
+            view.fig = Figure(figsize=(self.width / self.dpi, height / self.dpi), dpi=self.dpi)
+            FigureCanvasAgg(view.fig)
+            view.ax = view.fig.add_axes([0, 0, 1, 1])
+            view.plot_field()
+            view.ax.set_ylim(0, FIELD_LENGTH)
+            view.fig.canvas.draw()
+            self._fields[key] = PIL.Image.frombuffer(
+                'RGBA', view.fig.canvas.get_width_height(), view.fig.canvas.buffer_rgba()
+            ).convert('RGB')
+        return self._fields[key]
+
+    def _row(self, y):
+        """Pixel row of yards y on the full length field."""
+        return (FIELD_LENGTH - y) * self.scale
+
+    def background(self) -> PIL.Image.Image:
+        """Field of the current play with its line of scrimmage and first down line."""
+        a = self.animator
+        img = self._field().copy()
+        draw = PIL.ImageDraw.Draw(img)
+        width = max(1, int(round(self._points(2))))
+        los = a.play_data['absolute_yardline_number']
+        for y, color in [(los, 'blue'), (los + a.play_data['yards_to_go'], 'yellow')]:
+            row = self._row(y)
+            draw.line([(0, row), (img.width, row)], fill=color, width=width)
+        return img
+
+    def _render_sprite(self, size, draw_func) -> Sprite:
+        ss = self.supersample
+        big = PIL.Image.new('RGBA', (size * ss, size * ss), (0, 0, 0, 0))
+        draw_func(PIL.ImageDraw.Draw(big), size * ss / 2, ss)
+        return Sprite(big.resize((size, size), PIL.Image.Resampling.LANCZOS))
+
+    def player_sprite(self, color: str, edge_color: str, label: str) -> Sprite:
+        """Dot of a player with its position label, from the sprite atlas."""
+        key = (color, edge_color, label)
+        if key not in self._sprites:
+            radius = 0.4 * self.scale
+            line_width = self._points(1)
+            font_size = self._points(7)
+            font_color = '#000000' if contrast_ratio(color, '#000000') > contrast_ratio(color, '#ffffff') else '#ffffff'
+            size = int(math.ceil(2 * (radius + line_width))) + 2
+            size = max(size, int(math.ceil(font_size * max(len(label), 1) * 0.8)) + 2)
+
+            def draw(d, c, ss):
+                r = radius * ss
+                d.ellipse([c - r, c - r, c + r, c + r], fill=color, outline=edge_color,
+                          width=max(1, int(round(line_width * ss))))
+                if label:
+                    font = PIL.ImageFont.truetype(self.font_path, size=max(1, int(round(font_size * ss))))
+                    d.text((c, c), label, fill=font_color, font=font, anchor='mm')
+            self._sprites[key] = self._render_sprite(size, draw)
+        return self._sprites[key]
+
+    def ball_sprite(self) -> Sprite:
+        """Football with its laces, from the sprite atlas."""
+        if 'football' not in self._sprites:
+            half_width, half_height = 0.25 * self.scale, 0.4 * self.scale
+            size = int(math.ceil(2 * half_height + self._points(1))) + 2
+
+            def draw(d, c, ss):
+                w, h = half_width * ss, half_height * ss
+                d.ellipse([c - w, c - h, c + w, c + h], fill='brown', outline='black',
+                          width=max(1, int(round(self._points(1) * ss))))
+                d.line([(c, c - 0.4 * h), (c, c + 0.4 * h)], fill='white', width=max(1, int(round(self._points(1) * ss))))
+            self._sprites['football'] = self._render_sprite(size, draw)
+        return self._sprites['football']
+
+    def _play_sprites(self) -> tuple:
+        """Sprite and drawing order of every row of the current play."""
+        a = self.animator
+        data = a.tracking_data
+        clubs = data['club'].to_numpy()
+        offense = (clubs == a.play_data['possession_team'])
+        sprites = np.empty(len(data), dtype=object)
+
+        ball = clubs == 'football'
+        sprites[ball] = self.ball_sprite()
+        for rows, color, edge_color in [
+            (offense, a.poss_tm_color, a.poss_tm_edge_color),
+            (~offense & ~ball, a.def_tm_color, a.def_tm_edge_color),
+        ]:
+            positions = data['position'].to_numpy()[rows]
+            sprites[rows] = [
+                self.player_sprite(color, edge_color, a.position_mapping.get(p, p) if isinstance(p, str) else '')
+                for p in positions
+            ]
+        # Defense below the offense below the ball, as with the animator's zorder
+        layer = np.where(ball, 2, np.where(offense, 1, 0))
+        return sprites, layer
+
+    def frames(self):
+        """Render the frames of the animator's current play.
+
+        Yields:
+            (frame_id, RGB image) of each frame.
+        """
+        a = self.animator
+        with a.timer.stage('field'):
+            background = self.background()
+        with a.timer.stage('players'):
+            sprites, layer = self._play_sprites()
+            data = a.tracking_data
+            xs = data['x'].to_numpy(dtype=float) * self.scale
+            rows = self._row(data['y'].to_numpy(dtype=float))
+            valid = ~np.isnan(xs) & ~np.isnan(rows)
+            xs = np.round(np.nan_to_num(xs)).astype(int)
+            max_top = background.height - self.height
+
+        for frame_id, frame_slice in a.frame_slices.items():
+            with a.timer.stage('draw'):
+                # Camera of the animator, kept on the field
+                top = int(round(self._row(a.camera_y_limit_mins[frame_id] + a.y_delta)))
+                top = min(max(top, 0), max_top)
+                img = background.crop((0, top, self.width, top + self.height))
+
+                idx = np.arange(frame_slice.start, frame_slice.stop)
+                idx = idx[valid[idx]]
+                for i in idx[np.argsort(layer[idx], kind='stable')]:
+                    sprite = sprites[i]
+                    y = int(round(rows[i])) - top
+                    img.paste(sprite.image, (xs[i] - sprite.cx, y - sprite.cy), sprite.image)
+            yield frame_id, img
+
+    def render(self, filepaths: list, fps: int = 10) -> None:
+        """Render the current play to files, see `FFmpegEncoder`."""
+        a = self.animator
+        with a.timer.stage('encode'), FFmpegEncoder(
+            filepaths, self.width, self.height, fps, a.ffmpeg_path, pix_fmt='rgb24'
+        ) as encoder:
+            for _, img in self.frames():
+                encoder.write(img.tobytes())
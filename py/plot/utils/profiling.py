@@ -0,0 +1,113 @@
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+STAGES = [
+    'filter_data', 'field', 'scoreboard', 'legend', 'players', 'camera',
+    'trails', 'draw', 'encode',
+]
+
+class StageTimer:
+    def __init__(self, enabled: bool = False) -> None:
+        """Accumulates wall time per rendering stage.
+
+        Stages can be nested, e.g. `update_frame` calls made by matplotlib
+        while an animation is encoded. Each stage is charged its exclusive
+        time (minus the time of the stages nested in it), so the stages of a
+        play add up to its total render time. When disabled, `stage` returns
+        a shared no-op context manager.
+
+        Args:
+            enabled: Record timings. Defaults to False.
+        """
+        self.enabled = enabled
+        self._null = nullcontext()
+        self.reset()
+
+    def reset(self) -> None:
+        self.seconds = {}
+        self.calls = {}
+        self._stack = []
+
+    def stage(self, name: str):
+        """Context manager timing a stage."""
+        return self._stage(name) if self.enabled else self._null
+
+    @contextmanager
+    def _stage(self, name: str):
+        frame = [time.perf_counter(), 0.]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.seconds[name] = self.seconds.get(name, 0.) + elapsed - frame[1]
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def summary(self) -> dict:
+        """Seconds spent in each stage (rounded to microseconds)."""
+        return {name: round(seconds, 6) for name, seconds in self.seconds.items()}
+
+def timings_table(records: list) -> pd.DataFrame:
+    """Aggregate per play stage timings into a summary table.
+
+    Args:
+        records: Dictionaries of stage name to seconds, one per play (e.g.
+            the timings column of a `render_many` manifest).
+
+    Returns:
+        DataFrame indexed by stage with the total seconds, mean and max
+        seconds per play, and the share of the total render time.
+    """
+    df = pd.DataFrame([r for r in records if isinstance(r, dict)])
+    if df.empty:
+        return pd.DataFrame(columns=['total_s', 'mean_s', 'max_s', 'share'])
+    stages = [s for s in STAGES if s in df.columns] + [s for s in df.columns if s not in STAGES]
+    df = df[stages].fillna(0.)
+    table = pd.DataFrame({
+        'total_s': df.sum(),
+        'mean_s': df.mean(),
+        'max_s': df.max(),
+    })
+    table['share'] = table['total_s'] / table['total_s'].sum()
+    return table.sort_values('total_s', ascending=False)
+
+def profile_call(
+        func: callable,
+        *args,
+        profile_path: str | None = None,
+        sort: str = 'cumulative',
+        limit: int = 30,
+        **kwargs
+    ) -> pstats.Stats:
+    """Run a function under cProfile and print its hottest functions.
+
+    Args:
+        func: The function to profile.
+        *args: Positional arguments of func.
+        profile_path: Dump the raw stats here (e.g. for snakeviz). Defaults
+            to None.
+        sort: Sort key of the printed stats. Defaults to 'cumulative'.
+        limit: Number of functions printed. Defaults to 30.
+        **kwargs: Keyword arguments of func.
+
+    Returns:
+        The profile statistics.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    if profile_path is not None:
+        profiler.dump_stats(profile_path)
+    stats = pstats.Stats(profiler).sort_stats(sort)
+    stats.print_stats(limit)
+    return stats
@@ -0,0 +1,139 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import PIL.Image
+
+try:
+    import ipywidgets as widgets
+except ImportError:
+    widgets = None
+
+def encode_frame(rgba, image_format: str = 'png') -> bytes:
+    """Encode an RGBA buffer (e.g. the Agg canvas `buffer_rgba`) as an image."""
+    img = PIL.Image.fromarray(np.asarray(rgba))
+    buffer = io.BytesIO()
+    if image_format == 'png':
+        # Fast compression, frames are only kept in memory
+        img.save(buffer, format='png', compress_level=1)
+    else:
+        img.convert('RGB').save(buffer, format=image_format, quality=90)
+    return buffer.getvalue()
+
+class FrameScrubber:
+    def __init__(
+            self,
+            render_frame: callable,
+            frame_ids: list,
+            fps: int = 10,
+            cache_size: int = 64,
+            prefetch: int = 5,
+            image_format: str = 'png'
+        ) -> None:
+        """Notebook player which renders frames on demand.
+
+        Instead of rendering every frame up front (as `to_jshtml` does), a
+        frame is rendered when the slider or the play button asks for it.
+        Encoded frames are kept in an LRU cache, and the frames after (and
+        just before) the requested one are rendered in a background thread
+        while the notebook is idle. The first frame costs a single render.
+
+        Rendering is serialized by a lock since the figure is shared, and
+        prefetches queued for a position the user has scrubbed away from are
+        dropped.
+
+        Args:
+            render_frame: Draws a frame and returns its RGBA buffer.
+            frame_ids: The frames of the play, in order.
+            fps: Frames per second of the play button. Defaults to 10.
+            cache_size: Number of encoded frames kept. Defaults to 64.
+            prefetch: Number of frames rendered ahead. Defaults to 5.
+            image_format: 'png' or 'jpeg'. Defaults to 'png'.
+        """
+        self.render_frame = render_frame
+        self.frame_ids = list(frame_ids)
+        self.fps = fps
+        self.cache_size = cache_size
+        self.prefetch = prefetch
+        self.image_format = image_format
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=1) if prefetch > 0 else None
+        self._widget = None
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+    def _cached(self, frame_id):
+        with self._lock:
+            if frame_id in self._cache:
+                self._cache.move_to_end(frame_id)
+                return self._cache[frame_id]
+        return None
+
+    def _render(self, frame_id, generation: int | None = None) -> bytes | None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return None
+            if frame_id in self._cache:
+                self._cache.move_to_end(frame_id)
+                return self._cache[frame_id]
+            image = encode_frame(self.render_frame(frame_id), self.image_format)
+            self._cache[frame_id] = image
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return image
+
+    def _schedule_prefetch(self, idx: int) -> None:
+        if self._executor is None:
+            return
+        self._generation += 1
+        # Look ahead first (playback), then one frame back (scrubbing)
+        neighbours = list(range(idx + 1, idx + 1 + self.prefetch)) + [idx - 1]
+        for i in neighbours:
+            if 0 <= i < len(self.frame_ids) and self.frame_ids[i] not in self._cache:
+                self._executor.submit(self._render, self.frame_ids[i], self._generation)
+
+    def frame(self, idx: int) -> bytes:
+        """Encoded image of the frame at position idx, rendering it if needed."""
+        frame_id = self.frame_ids[idx]
+        image = self._cached(frame_id)
+        if image is None:
+            image = self._render(frame_id)
+        self._schedule_prefetch(idx)
+        return image
+
+    def widget(self):
+        """Player widget with play button, frame slider and the frame image."""
+        if widgets is None:
+            raise ImportError("ipywidgets is required for interactive output.")
+        if self._widget is not None:
+            return self._widget
+
+        image = widgets.Image(value=self.frame(0), format=self.image_format)
+        play = widgets.Play(min=0, max=len(self) - 1, interval=int(1000 / self.fps))
+        slider = widgets.IntSlider(min=0, max=len(self) - 1, readout=False, continuous_update=True)
+        label = widgets.Label(f'frame {self.frame_ids[0]}')
+        widgets.jslink((play, 'value'), (slider, 'value'))
+
+        def on_change(change):
+            image.value = self.frame(change['new'])
+            label.value = f"frame {self.frame_ids[change['new']]}"
+        slider.observe(on_change, names='value')
+
+        self._widget = widgets.VBox([image, widgets.HBox([play, slider, label])])
+        return self._widget
+
+    def close(self) -> None:
+        """Stop prefetching and free the cached frames."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._cache.clear()
+
+    def _ipython_display_(self):
+        from IPython.display import display
+        display(self.widget())
@@ -0,0 +1,39 @@
+import os
+import json
+import html
+import base64
+
+import numpy as np
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vector_player.html')
+MISSING = np.iinfo(np.int16).min
+
+def encode_array(arr: np.ndarray, dtype: str = 'int16') -> dict:
+    """Encode an array as base64 little-endian bytes for a JS typed array."""
+    arr = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {
+        'dtype': dtype,
+        'shape': list(arr.shape),
+        'data': base64.b64encode(arr.tobytes()).decode('ascii'),
+    }
+
+def to_centi(values: np.ndarray, scale: int = 100) -> np.ndarray:
+    """Quantize yards (or degrees with scale=10) to int16, NaN as MISSING."""
+    values = np.asarray(values, dtype=float)
+    quantized = np.round(np.nan_to_num(values, nan=0.) * scale)
+    quantized = np.clip(quantized, MISSING + 1, np.iinfo(np.int16).max).astype(np.int16)
+    quantized[np.isnan(values)] = MISSING
+    return quantized
+
+def render_player_html(payload: dict, title: str = 'play') -> str:
+    """Self-contained HTML page which plays the payload on a canvas."""
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        template = f.read()
+    # '</' would end the script element early
+    data = json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+    return template.replace('__TITLE__', html.escape(title)).replace('__PAYLOAD__', data)
+
+def iframe_html(page: str, width: int = 1100, height: int = 700) -> str:
+    """Embed a page in an iframe, so notebooks run its script in isolation."""
+    return (f'<iframe srcdoc="{html.escape(page, quote=True)}" width="{width}" height="{height}" ' +
+            'style="border: none;"></iframe>')
@@ -1,5 +1,8 @@
+import numpy as np
 import matplotlib as mpl
+import matplotlib.transforms as mtransforms
 from matplotlib.patches import Rectangle
+from matplotlib.text import Text
 from utils.image_functions import plot_image
 
 class Scoreboard:
@@ -14,7 +17,8 @@ class Scoreboard:
             home_img: str,
             away_img: str,
             clock_rolling: bool = True,
-            scoreboard_height: int = 3
+            scoreboard_height: int = 3,
+            y_delta: int = 35
         ) -> None:
         
         self.ax = ax
@@ -27,107 +31,127 @@ class Scoreboard:
         self.away_img = away_img
         self.clock_rolling = clock_rolling
         self.scoreboard_height = scoreboard_height
-        self._play_clocks = {}
-        self._game_clocks = {}
+        self.y_delta = y_delta
+        self._transform = None
+        self._play_clocks = None
+        self._game_clocks = None
+        self._play_clock_color = None
+        self._pre_snap_scores = (play_data['pre_snap_home_score'], play_data['pre_snap_visitor_score'])
+        self._touchdown_scores = None
+        self.home_score, self.visitor_score = self._pre_snap_scores
+
+    @property
+    def transform(self) -> mtransforms.Transform:
+        """x in data coordinates, y in axes coordinates."""
+        if self._transform is None:
+            self._transform = mtransforms.blended_transform_factory(self.ax.transData, self.ax.transAxes)
+        return self._transform
 
     @property
     def play_clocks(self) -> dict:
-        if self._play_clocks == {}:
-            for fid in self.frame_ids:
-                if fid <= self.snap_frame_id:
-                    self._play_clocks[fid] = int(self.play_data['play_clock_at_snap'] + \
-                                                 (self.snap_frame_id - fid) / 10 - .1)
-                else:
-                    self._play_clocks[fid] = 40
+        if self._play_clocks is None:
+            self._compute_clocks()
         return self._play_clocks
 
     @property
     def game_clocks(self) -> dict:
-        if self._game_clocks == {}:
-            game_clock_min = int(self.play_data['game_clock'].split(':')[0])
-            game_clock_sec = int(self.play_data['game_clock'].split(':')[1])
-            if self.clock_rolling:
-                game_clock_sec = game_clock_sec + ((self.snap_frame_id % 10) / 10) + (self.snap_frame_id // 10)
-                if game_clock_sec >= 60:
-                    game_clock_min += game_clock_sec // 60
-                    game_clock_sec = game_clock_sec % 60
-            for fid in self.frame_ids:
-                if fid < self.snap_frame_id:
-                    if self.clock_rolling:
-                        if game_clock_sec < 0:
-                            if game_clock_min == 0:
-                                game_clock_sec = 0
-                                game_clock_min = 0
-                            else:
-                                game_clock_min -= 1
-                                game_clock_sec = 59.9
-                        else:
-                            game_clock_sec -= 0.1
-                        self._game_clocks[fid] = f'{int(game_clock_min):02}:{int(game_clock_sec):02}'
-                    else:
-                        self._game_clocks[fid] = self.play_data['game_clock']
-                else:
-                    if game_clock_sec < 0:
-                        if game_clock_min == 0:
-                            game_clock_sec = 0
-                            game_clock_min = 0
-                        else:
-                            game_clock_min -= 1
-                            game_clock_sec = 59.9
-                    else:
-                        game_clock_sec -= 0.1
-                    self._game_clocks[fid] = f'{int(game_clock_min):02}:{int(game_clock_sec):02}'
+        if self._game_clocks is None:
+            self._compute_clocks()
         return self._game_clocks
 
+    def _compute_clocks(self) -> None:
+        """Compute the play and game clock of every frame in one step.
+
+        Clocks are counted in integer tenths of a second, one tenth per 
+        frame, so there is no floating point drift and each clock string is
+        formatted once per play.
+        """
+        frame_ids = np.asarray(self.frame_ids)
+
+        # Play clock counts down to the snap and resets to 40 after it
+        play_clock_tenths = self.play_data['play_clock_at_snap'] * 10 + (self.snap_frame_id - frame_ids) - 1
+        play_clocks = np.where(
+            frame_ids <= self.snap_frame_id,
+            (play_clock_tenths / 10).astype(int),
+            40
+        )
+
+        # Game clock runs every frame when rolling, otherwise from the snap
+        game_clock_min, game_clock_sec = map(int, self.play_data['game_clock'].split(':'))
+        start_tenths = (game_clock_min * 60 + game_clock_sec) * 10
+        running = frame_ids >= self.snap_frame_id
+        if self.clock_rolling:
+            start_tenths += self.snap_frame_id
+            steps = np.arange(1, len(frame_ids) + 1)
+        else:
+            steps = np.cumsum(running)
+        game_clock_tenths = np.maximum(start_tenths - steps, 0)
+        game_clocks = np.char.add(
+            np.char.add(np.char.zfill((game_clock_tenths // 600).astype(str), 2), ':'),
+            np.char.zfill((game_clock_tenths % 600 // 10).astype(str), 2)
+        )
+        if not self.clock_rolling:
+            game_clocks = np.where(running, game_clocks, self.play_data['game_clock'])
+
+        frame_ids = frame_ids.tolist()
+        self._play_clocks = dict(zip(frame_ids, play_clocks.tolist()))
+        self._game_clocks = dict(zip(frame_ids, game_clocks.tolist()))
+
     def update_scores(
             self, 
             frame_id: int,
             y_limit_min: int
         ) -> None:
+        """Set the scores shown at a frame.
 
-        if self.touchdown_frameid and frame_id and frame_id > self.touchdown_frameid:
-            if y_limit_min < 10:
-                if self.play_data['possession_team'] == self.play_data['home_team_abbr']:
-                    self.play_data['pre_snap_visitor_score'] += 6
-                else:
-                    self.play_data['pre_snap_home_score'] += 6
+        The scores only depend on whether the frame is after the touchdown,
+        so frames can be drawn in any order (e.g. when scrubbing).
+        """
+        self.home_score, self.visitor_score = self._pre_snap_scores
+        if not (self.touchdown_frameid and frame_id and frame_id > self.touchdown_frameid):
+            return
+
+        # The side which scored is decided at the first frame after the touchdown
+        if self._touchdown_scores is None:
+            home_score, visitor_score = self._pre_snap_scores
+            home_has_ball = self.play_data['possession_team'] == self.play_data['home_team_abbr']
+            if (y_limit_min < 10) == home_has_ball:
+                visitor_score += 6
             else:
-                if self.play_data['possession_team'] == self.play_data['home_team_abbr']:
-                    self.play_data['pre_snap_home_score'] += 6
-                else:
-                    self.play_data['pre_snap_visitor_score'] += 6
-            self.touchdown_frameid = None
+                home_score += 6
+            self._touchdown_scores = (home_score, visitor_score)
+        self.home_score, self.visitor_score = self._touchdown_scores
 
     def draw_rectangle(
             self, 
             x_start: int,
             width: int,
-            y_limit_min: int,
             facecolor: str,
-        ) -> None:
+        ) -> Rectangle:
         
         rect = Rectangle(
-            (x_start, y_limit_min),
+            (x_start, 0),
             width,
-            self.scoreboard_height,
+            self.scoreboard_height / self.y_delta,
             facecolor=facecolor,
             edgecolor='black',
             linewidth=3,
+            transform=self.transform,
             zorder=self.zorder['scoreboard_background']
         )
         self.ax.add_patch(rect)
+        return rect
 
     def add_text(
             self, 
             x_position: int,
-            y_limit_min: int,
             text: str,
             fontsize: int = 20,
             color: str = 'white'
-        ) -> None:
+        ) -> Text:
         
-        txt_height = y_limit_min + self.scoreboard_height / 2
-        self.ax.text(
+        txt_height = (self.scoreboard_height / 2) / self.y_delta
+        return self.ax.text(
             x_position,
             txt_height,
             text,
@@ -135,6 +159,7 @@ class Scoreboard:
             fontsize=fontsize,
             fontweight='bold',
             color=color,
+            transform=self.transform,
             zorder=self.zorder['scoreboard_foreground']
         )
 
@@ -143,63 +168,84 @@ class Scoreboard:
             x_limit_max: int,
             y_limit_min: int,
             frame_id: int,
-        ) -> None:
+        ) -> list:
+        """Draw the scoreboard once per play.
+
+        The scoreboard is pinned to the bottom of the axes (x in data 
+        coordinates, y in axes coordinates) so it stays in place as the 
+        camera follows the ball. Only the texts and the play clock colour
+        change afterwards, see `update_scoreboard`.
+        """
         
         x_interval = x_limit_max / 4
 
-        self.update_scores(frame_id, y_limit_min)
-
         # Draw background rectangles for scoreboard sections
-        self.draw_rectangle(0, x_interval, y_limit_min, self.play_data['away_team_color'])
-        self.draw_rectangle(x_interval, x_interval * 2, y_limit_min, self.play_data['home_team_color'])
-        self.draw_rectangle(x_interval * 2, x_interval, y_limit_min, '#1a1817')
-
-        play_clock_color = 'red' if self.play_clocks[frame_id] <= 5 else 'grey'
-        self.draw_rectangle(x_interval * 3 - 4, x_interval * 3, y_limit_min, play_clock_color)
-        self.draw_rectangle(x_interval * 3, x_limit_max, y_limit_min, self.play_data['possession_team_color'])
+        self.draw_rectangle(0, x_interval, self.play_data['away_team_color'])
+        self.draw_rectangle(x_interval, x_interval * 2, self.play_data['home_team_color'])
+        self.draw_rectangle(x_interval * 2, x_interval, '#1a1817')
+        self._play_clock_rect = self.draw_rectangle(x_interval * 3 - 4, x_interval * 3, 'grey')
+        self._play_clock_color = None
+        self.draw_rectangle(x_interval * 3, x_limit_max, self.play_data['possession_team_color'])
 
         # Add text for away team score, home team score, time, play clock, and down and distance
-        self.add_text(
-            x_interval / 2 + 2.5, 
-            y_limit_min, 
-            f'{self.play_data["away_team_abbr"]} {self.play_data["pre_snap_visitor_score"]}'
-        )
-        self.add_text(
-            x_interval * 1.5 + 2.5, 
-            y_limit_min, 
-            f'{self.play_data["home_team_abbr"]} {self.play_data["pre_snap_home_score"]}', 
-        )
-        self.add_text(
-            x_interval * 2 + (x_interval / 2 - 2), 
-            y_limit_min, 
-            f'{self.play_data["quarter_with_suffix"]} {self.game_clocks[frame_id]}'
-        )
-        self.add_text(
-            x_interval * 3 - 2, 
-            y_limit_min, 
-            f'{self.play_clocks[frame_id]:02}'
-        )
-        self.add_text(
-            x_interval * 3.5, 
-            y_limit_min, 
-            self.play_data['down_and_dist']
-        )
+        self._away_score_text = self.add_text(x_interval / 2 + 2.5, '')
+        self._home_score_text = self.add_text(x_interval * 1.5 + 2.5, '')
+        self._game_clock_text = self.add_text(x_interval * 2 + (x_interval / 2 - 2), '')
+        self._play_clock_text = self.add_text(x_interval * 3 - 2, '')
+        self.add_text(x_interval * 3.5, self.play_data['down_and_dist'])
 
         # Add logos next to scores
         plot_image(
             ax = self.ax, 
             x = 5.5, 
-            y = y_limit_min + self.scoreboard_height / 2,
+            y = (self.scoreboard_height / 2) / self.y_delta,
             imagebox = self.away_img, 
             ord = self.zorder['scoreboard_foreground'],
             alignment = 'right-center',
+            xycoords = self.transform,
         )
 
         plot_image(
             ax = self.ax, 
             x = x_interval + 5.5, 
-            y = y_limit_min + self.scoreboard_height / 2, 
+            y = (self.scoreboard_height / 2) / self.y_delta, 
             imagebox = self.home_img, 
             ord = self.zorder['scoreboard_foreground'],
             alignment = 'right-center',
-        )
\ No newline at end of file
+            xycoords = self.transform,
+        )
+
+        return self.update_scoreboard(frame_id, y_limit_min)
+
+    def update_scoreboard(
+            self,
+            frame_id: int,
+            y_limit_min: int,
+        ) -> list:
+        """Update the dynamic scoreboard artists and return them."""
+
+        self.update_scores(frame_id, y_limit_min)
+
+        play_clock_color = 'red' if self.play_clocks[frame_id] <= 5 else 'grey'
+        if play_clock_color != self._play_clock_color:
+            self._play_clock_rect.set_facecolor(play_clock_color)
+            self._play_clock_color = play_clock_color
+
+        self._away_score_text.set_text(
+            f'{self.play_data["away_team_abbr"]} {self.visitor_score}'
+        )
+        self._home_score_text.set_text(
+            f'{self.play_data["home_team_abbr"]} {self.home_score}'
+        )
+        self._game_clock_text.set_text(
+            f'{self.play_data["quarter_with_suffix"]} {self.game_clocks[frame_id]}'
+        )
+        self._play_clock_text.set_text(f'{self.play_clocks[frame_id]:02}')
+
+        return [
+            self._play_clock_rect,
+            self._away_score_text,
+            self._home_score_text,
+            self._game_clock_text,
+            self._play_clock_text,
+        ]
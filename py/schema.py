@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+FLOAT_DTYPE = np.float32
+GAME_PLAY_KEY_FACTOR = 10_000
+
+FLOAT32_COLUMNS = [
+    'x', 'y', 's', 'a', 'dis', 'o', 'dir', 'nfl_id', 'jersey_number',
+    'ball_x', 'ball_y', 'euclidean_dist_to_ball', 'lateral_dist_to_ball', 'vertical_dist_to_ball',
+    'dx_to_ball', 'dy_to_ball', 'absolute_yardline_number',
+]
+INT32_COLUMNS = ['play_id', 'frame_id', 'week', 'yards_to_go']
+INT64_COLUMNS = ['game_id']
+CATEGORICAL_COLUMNS = [
+    'club', 'event', 'event_new', 'position', 'position_by_loc', 'display_name',
+    'frame_type', 'play_direction', 'time',
+]
+
+# dtypes of the raw tracking_week_{wk}.csv columns (uncamelcased)
+RAW_TRACKING_DTYPES = {
+    'game_id': 'int64', 'play_id': 'int32', 'nfl_id': 'float32', 'display_name': 'object',
+    'frame_id': 'int32', 'frame_type': 'object', 'time': 'object', 'jersey_number': 'float32',
+    'club': 'object', 'play_direction': 'object', 'x': 'float32', 'y': 'float32', 's': 'float32',
+    'a': 'float32', 'dis': 'float32', 'o': 'float32', 'dir': 'float32', 'event': 'object',
+}
+
+def game_play_key(game_id, play_id=None):
+    """Pack a play into a single int64 key, `game_id * 10,000 + play_id`.
+
+    Args:
+        game_id: Game ids, or 'game_id_play_id' strings (e.g. the
+            game_play_id column built in notebook 01) when play_id is None.
+        play_id: Play ids. Defaults to None.
+
+    Returns:
+        The packed key(s).
+    """
+    if play_id is None:
+        if isinstance(game_id, str):
+            game_id, play_id = game_id.split('_')
+        else:
+            parts = pd.Series(game_id).astype(str).str.split('_', n=1, expand=True)
+            game_id, play_id = parts[0].to_numpy(), parts[1].to_numpy()
+    return (
+        np.asarray(game_id).astype(np.int64) * GAME_PLAY_KEY_FACTOR
+        + np.asarray(play_id).astype(np.int64)
+    )
+
+def split_game_play_key(key) -> tuple:
+    """Unpack game_play_key(s) into (game_id, play_id)."""
+    key = np.asarray(key, dtype=np.int64)
+    return key // GAME_PLAY_KEY_FACTOR, key % GAME_PLAY_KEY_FACTOR
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Memory used by a DataFrame in bytes, including Python strings."""
+    return int(df.memory_usage(deep=True).sum())
+
+def apply_schema(
+        df: pd.DataFrame,
+        pack_game_play_id: bool = False,
+        report: bool = False
+    ) -> pd.DataFrame:
+    """Convert tracking (or play) data to compact dtypes.
+
+    Coordinates and other measurements are downcast to float32, ids to
+    int32 (game_id stays int64) and repeated strings become categoricals.
+    Columns which are not in the schema, or are already compact, are left
+    as they are.
+
+    Args:
+        df: The data.
+        pack_game_play_id: Replace the 'game_id_play_id' string game_play_id
+            by its int64 `game_play_key`. Defaults to False.
+        report: Print the memory used before and after. Defaults to False.
+
+    Returns:
+        The data with compact dtypes.
+    """
+    before = memory_usage(df) if report else None
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype != FLOAT_DTYPE and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(FLOAT_DTYPE)
+    for col in INT32_COLUMNS:
+        if col in df.columns and df[col].dtype != np.int32 and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(np.int32)
+    for col in INT64_COLUMNS:
+        if col in df.columns and df[col].dtype != np.int64 and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(np.int64)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    if pack_game_play_id and 'game_play_id' in df.columns and not pd.api.types.is_integer_dtype(df['game_play_id']):
+        if 'game_id' in df.columns and 'play_id' in df.columns:
+            df['game_play_id'] = game_play_key(df['game_id'].to_numpy(), df['play_id'].to_numpy())
+        else:
+            df['game_play_id'] = game_play_key(df['game_play_id'])
+
+    if report:
+        print(memory_report(before, memory_usage(df)))
+    return df
+
+def memory_report(before: int, after: int) -> str:
+    """Summary of the memory saved by `apply_schema`."""
+    saved = 1 - after / before if before else 0.
+    return f'Memory: {before / 1e6:,.1f} MB -> {after / 1e6:,.1f} MB ({saved:.0%} smaller)'
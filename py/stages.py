@@ -0,0 +1,2173 @@
+import os
+import logging
+from os.path import join
+
+import numpy as np
+import pandas as pd
+
+import util
+import events
+import motion
+import storage
+import features
+
+logger = logging.getLogger(__name__)
+
+# Run plays of nfl_data_py's play-by-play data (notebook 01)
+SEASON = 2022
+PBP_COLUMNS = [
+    'old_game_id_x', 'play_id', 'run_location', 'rusher_player_id', 'offense_personnel',
+    'defenders_in_box', 'defense_personnel', 'desc'
+]
+RUSHER_POSITIONS = ['RB', 'TE', 'WR', 'FB', 'HB']
+RUN_LOCATIONS = [
+    ('left guard', 'left_guard'),
+    ('left tackle', 'left_tackle'),
+    ('right guard', 'right_guard'),
+    ('right tackle', 'right_tackle'),
+    ('up the middle', 'middle'),
+    ('right end', 'right_end'),
+    ('left end', 'left_end'),
+]
+DROP_PLAYS = {
+    1: {
+        'game_ids': [
+            '2022091101',
+            '2022091112'
+        ],
+        'game_play_ids': [
+            '2022091101_1826',
+            '2022091112_112',  # ball snap timing off
+        ]
+    },
+}
+
+# Per-week tables written by the notebooks (and the pipeline stages)
+TRACKING_TABLES = ['tracking.pkl', 'play.pkl', 'games.pkl', 'player_play.pkl']
+TRACKING_FINAL_TABLES = ['tracking_final.pkl', 'play_final.pkl', 'games_final.pkl', 'player_play_final.pkl']
+
+# Offensive line (notebook 02)
+OLINE_POSITIONS = ['T', 'G', 'C']
+OLINE_LOCATIONS = ['LT', 'LG', 'C', 'RG', 'RT']
+
+# Motion player (notebook 02)
+MOTION_SPEED_THRESHOLD = 1.0
+MOTION_THRESHOLD = 3
+X_LAST_FRAMES_MOVING = 2
+MOTION_ELIGIBLE_POSITIONS = ['WR', 'TE', 'RB', 'FB']
+
+# Off-Line Y alignment (notebook 03)
+OFF_LINE_Y_MAX_YARDS_BEHIND_OLINE = 2
+OFF_LINE_Y_MAX_YARDS_NEXT_TO_OLINE = 2.5
+
+# Run concept features (notebook 04)
+PRIMARY_RB_POSITION_WEIGHTS = {'RB': 1, 'FB': 2, 'WR': 3, 'TE': 4}
+RB_DIR_OFFSETS = range(10, 21)
+MAX_YARDS_BEHIND_OLINE = 1
+MAX_YARDS_NEXT_TO_OLINE = 2
+MOVING_S_THRESHOLD = 1
+VIABLE_RUN_CONCEPTS = [
+    'MAN', 'OUTSIDE ZONE', 'TRAP', 'COUNTER', 'POWER', 'PULL LEAD', 'INSIDE ZONE', 'TRICK', 'DRAW'
+]
+OFFENSE_FORMATIONS = {
+    'shotgun': 'SHOTGUN',
+    'singleback': 'SINGLEBACK',
+    'i_form': 'I_FORM',
+    'pistol': 'PISTOL',
+    'jumbo': 'JUMBO',
+}
+TRACKING_COLUMNS = [
+    'game_id', 'play_id', 'game_play_id', 'nfl_id', 'week', 'display_name',
+    'frame_id', 'frame_type', 'time', 'jersey_number', 'club',
+    'play_direction', 'x', 'y', 's', 'a', 'dis', 'o', 'dir', 'event',
+    'position', 'absolute_yardline_number', 'yards_to_go', 'offense',
+    'defense', 'ball_x', 'ball_y', 'event_new', 'position_by_loc', 'motion_player',
+    'ball_snap_fid', 'last_line_set_fid', 'primary_rb', 'rb_pos'
+]
+
+def _game_play_id(df: pd.DataFrame) -> pd.Series:
+    return df['game_id'].astype(str) + '_' + df['play_id'].astype(str)
+
+def _drop_plays(
+        week: int,
+        tables: tuple,
+        game_play_ids: list,
+        reason: str
+    ) -> tuple:
+    """Drop plays from the tracking, play, game and player play data.
+
+    Games are kept while they have plays left.
+    """
+    df_tracking, df_play, df_game, df_player_play = tables
+    if len(game_play_ids) == 0:
+        return tables
+    logger.info(f'Wk {week}: Dropping {len(game_play_ids)} {reason}.')
+    df_tracking = df_tracking[~df_tracking['game_play_id'].isin(game_play_ids)]
+    df_play = df_play[~df_play['game_play_id'].isin(game_play_ids)]
+    df_player_play = df_player_play[~df_player_play['game_play_id'].isin(game_play_ids)]
+    df_game = df_game[df_game['game_id'].isin(df_play['game_id'].unique())]
+    return df_tracking, df_play, df_game, df_player_play
+
+def read_tables(processed_data_path: str, week: int, names: list) -> tuple:
+    """Read the `names` pickles of a week, e.g. `TRACKING_FINAL_TABLES`."""
+    return tuple(pd.read_pickle(join(processed_data_path, f'wk{week}', name)) for name in names)
+
+def write_tables(processed_data_path: str, week: int, names: list, tables: tuple) -> None:
+    """Write the tables of a week to the `names` pickles."""
+    os.makedirs(join(processed_data_path, f'wk{week}'), exist_ok=True)
+    for name, df in zip(names, tables):
+        df.to_pickle(join(processed_data_path, f'wk{week}', name))
+
+def load_season_tables(raw_data_path: str) -> tuple:
+    """Load the games, plays, player plays and players of the season.
+
+    Returns:
+        df_game, df_play, df_player_play and df_player with uncamelcased
+        columns, and a game_play_id column on the play data.
+    """
+    df_game = util.uncamelcase_columns(pd.read_csv(join(raw_data_path, 'games.csv')))
+    df_play = util.uncamelcase_columns(pd.read_csv(join(raw_data_path, 'plays.csv')))
+    df_player_play = util.uncamelcase_columns(pd.read_csv(join(raw_data_path, 'player_play.csv')))
+    df_player = util.uncamelcase_columns(pd.read_csv(join(raw_data_path, 'players.csv')))
+    df_play.insert(loc=2, column='game_play_id', value=_game_play_id(df_play))
+    df_player_play.insert(loc=2, column='game_play_id', value=_game_play_id(df_player_play))
+    return df_game, df_play, df_player_play, df_player
+
+def load_run_plays(season: int = SEASON) -> pd.DataFrame:
+    """Designed run plays of a season from nfl_data_py's play-by-play data.
+
+    Plays with penalties, fumbles, scrambles, kneels, spikes, two point
+    attempts, punts or QB rushers are removed.
+    """
+    import nfl_data_py as nfl
+
+    df_pbp = (
+        nfl.import_pbp_data([season])
+        .query(
+            'penalty == 0 and ' +
+            'fumble == 0 and ' +
+            'play_type == "run" and ' +
+            'qb_scramble == 0 and ' +
+            'qb_dropback == 0 and ' +
+            'qb_kneel == 0 and ' +
+            'qb_spike == 0 and ' +
+            '~play_type.isna() and ' +
+            'n_offense == 11 and ' +
+            'n_defense == 11 and ' +
+            'two_point_attempt == 0'
+        )[PBP_COLUMNS]
+        .rename(columns={'old_game_id_x': 'game_id'})
+        .assign(
+            game_id=lambda x: x.game_id.astype(int),
+            play_id=lambda x: x.play_id.astype(int)
+        )
+        .merge(
+            nfl.import_seasonal_rosters(years=[season], columns=['player_id', 'position']),
+            left_on='rusher_player_id',
+            right_on='player_id',
+            how='left'
+        )
+        .query('position.isin(@RUSHER_POSITIONS)')
+        .drop(columns=['player_id', 'position', 'rusher_player_id'])
+    )
+    desc = df_pbp['desc'].str.lower()
+    return df_pbp[
+        ~desc.str.contains('punt') &
+        ~desc.str.contains('penalty') &
+        df_pbp['offense_personnel'].notna() &
+        df_pbp['defenders_in_box'].notna()
+    ].drop(columns=['desc'])
+
+def write_season_data(
+        raw_data_path: str,
+        processed_data_path: str,
+        season: int = SEASON,
+        force: bool = False
+    ) -> None:
+    """Write the week independent data: run_plays.pkl, players.pkl and teams.pkl.
+
+    run_plays.pkl is a raw source of `filter_run_plays`, the others are read
+    by `finalize_tracking`, `run_concept_features` and the notebooks.
+    Existing files are kept unless `force`.
+    """
+    def load_teams():
+        import nfl_data_py as nfl
+        return nfl.import_team_desc()
+
+    os.makedirs(processed_data_path, exist_ok=True)
+    outputs = {
+        'run_plays.pkl': lambda: load_run_plays(season),
+        'players.pkl': lambda: load_season_tables(raw_data_path)[3],
+        'teams.pkl': load_teams,
+    }
+    for name, load in outputs.items():
+        path = join(processed_data_path, name)
+        if force or not os.path.exists(path):
+            load().to_pickle(path)
+
+def filter_run_plays(
+        week: int,
+        raw_data_path: str,
+        store_path: str,
+        run_plays_path: str
+    ) -> tuple:
+    """Filter a week of tracking data to the run plays (notebook 01).
+
+    The raw tracking CSV is streamed into the columnar store, filtered to the
+    run plays and standardized so the offense moves right. Play information,
+    offense / defense flags and distances to the ball are added, and the
+    plays of `DROP_PLAYS` are dropped.
+
+    Args:
+        week: Week of the tracking data.
+        raw_data_path: Directory of the raw competition CSVs.
+        store_path: Root directory of the columnar tracking store.
+        run_plays_path: Pickle of `load_run_plays`.
+
+    Returns:
+        The tracking, play, game and player play data of the week, see
+        `TRACKING_TABLES`.
+    """
+    df_game, df_play, df_player_play, df_player = load_season_tables(raw_data_path)
+    df_pbp = pd.read_pickle(run_plays_path)
+
+    # stream tracking data into the store, filtering down to run plays which are not a qb run
+    # and standardizing direction to be offense moving right
+    df_play_direction = storage.ingest_tracking_csv(
+        join(raw_data_path, f'tracking_week_{week}.csv'),
+        store_path,
+        week=week,
+        plays=df_pbp.dropna(subset=['run_location']),
+        standardize=True
+    )
+    df_tracking = storage.load_tracking(store_path, weeks=[week])
+    df_play = util.standardize_play_direction(df_play, df_play_direction)
+    df_tracking.insert(loc=2, column='game_play_id', value=_game_play_id(df_tracking))
+
+    if df_play.query('~((play_nullified_by_penalty == "N") and (penalty_yards != 0))').shape[0] > 0:
+        raise ValueError(f'Week {week} has plays that were nullified by penalty or had penalty yards.')
+
+    df_tracking = df_tracking.merge(df_player[['nfl_id', 'position']], on='nfl_id', how='left')
+    df_tracking = df_tracking.merge(
+        df_play[['game_play_id', 'possession_team', 'absolute_yardline_number', 'yards_to_go']],
+        on='game_play_id',
+        how='left'
+    )
+    df_tracking['offense'] = df_tracking['club'] == df_tracking['possession_team']
+    df_tracking['defense'] = ~df_tracking['offense'] & (df_tracking['club'] != 'football')
+    df_tracking.drop(columns=['possession_team'], inplace=True)
+
+    # Distance of the players to the ball
+    ball = (
+        df_tracking.loc[df_tracking['club'] == 'football', ['game_play_id', 'frame_id', 'x', 'y']]
+        .rename(columns={'x': 'ball_x', 'y': 'ball_y'})
+    )
+    df_tracking = df_tracking.merge(ball, on=['game_play_id', 'frame_id'], how='left')
+    df_tracking['euclidean_dist_to_ball'] = np.sqrt(
+        (df_tracking['x'] - df_tracking['ball_x'])**2 + (df_tracking['y'] - df_tracking['ball_y'])**2
+    )
+    df_tracking['lateral_dist_to_ball'] = df_tracking['x'] - df_tracking['ball_x']
+    df_tracking['vertical_dist_to_ball'] = df_tracking['y'] - df_tracking['ball_y']
+
+    df_play = df_play.merge(df_pbp, on=['game_id', 'play_id'], how='left')
+    df_play['run_location_desc'] = np.select(
+        [df_play['play_description'].str.contains(text, na=False) for text, _ in RUN_LOCATIONS],
+        [location for _, location in RUN_LOCATIONS],
+        default='non_run'
+    )
+    if (df_play['run_location_desc'] == 'non_run').any():
+        raise ValueError(f'There are plays that are not run plays for week {week}')
+
+    # Games and player plays of the tracked plays
+    df_game = df_game[(df_game['week'] == week) & df_game['game_id'].isin(df_tracking['game_id'].unique())]
+    df_player_play = df_player_play[
+        df_player_play['game_play_id'].isin(df_tracking['game_play_id'].unique()) &
+        df_player_play['game_id'].isin(df_game['game_id'].unique())
+    ]
+
+    drop_plays = DROP_PLAYS.get(week, {'game_ids': [], 'game_play_ids': []})
+    df_game = df_game[~df_game['game_id'].isin(drop_plays['game_ids'])]
+    drop_game_play_ids = drop_plays['game_play_ids']
+    df_tracking = df_tracking[~df_tracking['game_play_id'].isin(drop_game_play_ids)]
+    df_play = df_play[~df_play['game_play_id'].isin(drop_game_play_ids)]
+    df_player_play = df_player_play[~df_player_play['game_play_id'].isin(drop_game_play_ids)]
+    return df_tracking, df_play, df_game, df_player_play
+
+def _last_line_set_fid(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Frame of the last line_set event of each play, as line_set_fid."""
+    return (
+        df_tracking[df_tracking['event_new'] == 'line_set']
+        .groupby('game_play_id')['frame_id']
+        .max()
+        .reset_index()
+        .rename(columns={'frame_id': 'line_set_fid'})
+    )
+
+def _multiple_qb_plays(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """game_play_id and game_id of the plays with more than one QB of a team at the snap."""
+    return (
+        df_tracking.query('position=="QB" and frame_type=="SNAP"')
+        [['game_play_id', 'game_id', 'club']]
+        .value_counts()
+        .reset_index(name='count')
+        .query('count > 1')
+    )
+
+def _incomplete_oline_plays(df_tracking: pd.DataFrame) -> list:
+    """Plays without exactly 5 offensive linemen at the snap."""
+    o_line = df_tracking[
+        df_tracking['position'].isin(OLINE_POSITIONS) &
+        (df_tracking['frame_type'] == 'SNAP')
+    ]
+    o_line = o_line.groupby('game_play_id').size().reset_index(name='count')
+    return o_line[o_line['count'] != 5]['game_play_id'].unique().tolist()
+
+def _wildcat_plays(df_tracking: pd.DataFrame, df_play: pd.DataFrame) -> list:
+    """WILDCAT plays, and plays with the QB outside the linemen at the last line_set."""
+    wildcat_plays = df_play[df_play['offense_formation'] == 'WILDCAT']['game_play_id'].unique().tolist()
+
+    # Taysom Hill Wildcat plays
+    lineman_and_qb = df_tracking[df_tracking['position'].isin(OLINE_POSITIONS + ['QB'])]
+    lineman_and_qb = lineman_and_qb.merge(_last_line_set_fid(df_tracking), on='game_play_id')
+    lineman_and_qb = lineman_and_qb[lineman_and_qb['frame_id'] == lineman_and_qb['line_set_fid']]
+    lineman = lineman_and_qb[lineman_and_qb['position'].isin(OLINE_POSITIONS)].groupby('game_play_id')
+    lineman_and_qb = (
+        lineman_and_qb[lineman_and_qb['position'] == 'QB']
+        [['game_play_id', 'frame_id', 'club', 'display_name', 'x']]
+        .merge(lineman['x'].min().rename('min_x').reset_index(), on='game_play_id')
+        .merge(lineman['x'].max().rename('max_x').reset_index(), on='game_play_id')
+    )
+    wildcat_plays += lineman_and_qb.query('x < min_x or x > max_x')['game_play_id'].unique().tolist()
+    return wildcat_plays
+
+def _oline_positions(df_tracking: pd.DataFrame) -> tuple:
+    """Label the offensive linemen LT, LG, C, RG and RT by x at the last line_set.
+
+    Returns:
+        The linemen and QBs at the last line_set (game_play_id, nfl_id and
+        position_by_loc), and the plays where the center is not the lineman
+        closest to the QB.
+    """
+    lineman_and_qb = df_tracking[
+        (df_tracking['frame_type'] == 'BEFORE_SNAP') &
+        df_tracking['offense'] &
+        df_tracking['position'].isin(OLINE_POSITIONS + ['QB'])
+    ][['game_play_id', 'frame_id', 'nfl_id', 'position', 'x', 'y']]
+    last_line_set_event = _last_line_set_fid(df_tracking)
+    lineman_and_qb = (
+        lineman_and_qb
+        .merge(last_line_set_event, on='game_play_id')
+        .query('frame_id == line_set_fid')
+    )
+    is_qb = lineman_and_qb['position'] == 'QB'
+
+    x_qb = lineman_and_qb[is_qb][['game_play_id', 'x']].rename(columns={'x': 'x_qb'})
+    lineman_and_qb = lineman_and_qb.merge(x_qb, on='game_play_id')
+    lineman_and_qb['dx'] = np.abs(lineman_and_qb['x'] - lineman_and_qb['x_qb'])
+    is_qb = lineman_and_qb['position'] == 'QB'
+    lineman_and_qb['closest_to_qb'] = lineman_and_qb[~is_qb].groupby('game_play_id')['dx'].transform('min')
+    lineman_and_qb['closest_to_qb'] = lineman_and_qb['closest_to_qb'] == lineman_and_qb['dx']
+
+    # Only plays with the ball at the last line_set are labelled
+    ball = (
+        df_tracking[df_tracking['club'] == 'football']
+        [['game_play_id', 'frame_id']]
+        .merge(last_line_set_event, on='game_play_id')
+        .query('frame_id == line_set_fid')
+        [['game_play_id']]
+    )
+    lineman_and_qb = lineman_and_qb.merge(ball, on='game_play_id')
+
+    # number the lineman from left to right by x position
+    lineman_and_qb = lineman_and_qb.sort_values(['game_play_id', 'x'])
+    is_lineman = lineman_and_qb['position'].isin(OLINE_POSITIONS)
+    lineman_and_qb.loc[is_lineman, 'position_by_loc'] = (
+        lineman_and_qb[lineman_and_qb['position'] != 'QB']
+        .groupby('game_play_id')
+        .cumcount()
+        .replace(dict(enumerate(OLINE_LOCATIONS)))
+    )
+    lineman_and_qb['is_center'] = lineman_and_qb['closest_to_qb'] & (lineman_and_qb['position_by_loc'] == 'C')
+
+    n_centers = lineman_and_qb.groupby('game_play_id')['is_center'].sum()
+    unbalanced = n_centers.index[n_centers != 1].tolist()
+    return lineman_and_qb[['game_play_id', 'nfl_id', 'position_by_loc']].drop_duplicates(), unbalanced
+
+def _motion_players(
+        df_tracking: pd.DataFrame,
+        df_player: pd.DataFrame,
+        speed_threshold: float = MOTION_SPEED_THRESHOLD,
+        motion_threshold: int = MOTION_THRESHOLD,
+        x_last_frames_moving: int = X_LAST_FRAMES_MOVING
+    ) -> pd.DataFrame:
+    """Player in motion of each play, from the speeds in the second before the snap.
+
+    A player is in motion when moving in at least `motion_threshold` frames
+    (plain or weighted towards the snap), or in the last
+    `x_last_frames_moving` frames, and in more than one frame. Only WRs, TEs,
+    RBs and FBs (and Taysom Hill) are eligible, and of several players in
+    motion the one with the highest mean speed is kept.
+
+    Returns:
+        DataFrame with the game_play_id and nfl_id of the motion players.
+    """
+    df_snap_frames = (
+        df_tracking[df_tracking['frame_type'] == 'SNAP']
+        .groupby('game_play_id')['frame_id']
+        .first()
+        .rename('frame_id_ball_snap')
+        .reset_index()
+    )
+    df_motion = df_tracking[['game_play_id', 'nfl_id', 'frame_id', 'offense', 's']].merge(df_snap_frames, on='game_play_id')
+    df_motion = df_motion[
+        (df_motion['frame_id_ball_snap'] - 10 <= df_motion['frame_id']) &
+        (df_motion['frame_id'] <= df_motion['frame_id_ball_snap']) &
+        df_motion['offense']
+    ]
+    frame_weight = np.where(
+        df_motion['frame_id'] == df_motion['frame_id_ball_snap'],
+        10,
+        (df_motion['frame_id'] - df_motion['frame_id_ball_snap']) % 10
+    )
+
+    # count the frames each player's s is above speed_threshold
+    moving = df_motion['s'] >= speed_threshold
+    df_motion = df_motion.assign(
+        moving=moving,
+        weighted_moving=df_motion['s'] * (1 + frame_weight * 0.1) >= speed_threshold,
+        moving_and_last_x_frames=(frame_weight > 10 - x_last_frames_moving) & moving
+    )
+    df_player_in_motion = df_motion.groupby(['game_play_id', 'nfl_id']).agg(
+        num_frames_moving=('moving', 'sum'),
+        num_frames_moving_weighted=('weighted_moving', 'sum'),
+        num_frames_moving_and_last_x_frames=('moving_and_last_x_frames', 'sum'),
+        avg_speed=('s', 'mean')
+    ).reset_index()
+    df_player_in_motion['in_motion'] = (
+        (
+            (df_player_in_motion['num_frames_moving'] >= motion_threshold) |
+            (df_player_in_motion['num_frames_moving_weighted'] >= motion_threshold) |
+            (df_player_in_motion['num_frames_moving_and_last_x_frames'] >= x_last_frames_moving)
+        ) &
+        (df_player_in_motion['num_frames_moving'] > 1)
+    )
+
+    # Filter by eligible positions
+    df_player_in_motion = df_player_in_motion.merge(df_player[['nfl_id', 'position', 'display_name']], on='nfl_id')
+    df_player_in_motion = df_player_in_motion[
+        df_player_in_motion['in_motion'] &
+        (
+            df_player_in_motion['position'].isin(MOTION_ELIGIBLE_POSITIONS) |
+            (df_player_in_motion['display_name'] == 'Taysom Hill')
+        )
+    ]
+
+    # If a play has multiple players in motion, keep the player with the highest speed
+    max_speed = df_player_in_motion.groupby('game_play_id')['avg_speed'].transform('max')
+    return df_player_in_motion[df_player_in_motion['avg_speed'] == max_speed][['game_play_id', 'nfl_id']]
+
+def _extra_oline_box(extra_on_oline: pd.DataFrame, box_left: str, box_right: str) -> pd.DataFrame:
+    """Flag the extra players, and widen the box to the x of each of them."""
+    extra_on_oline = extra_on_oline.assign(extra_on_oline=True)
+    extra_on_oline['extra_oline_box_left'] = np.where(
+        extra_on_oline['x'] < extra_on_oline[box_left],
+        extra_on_oline['x'],
+        None
+    )
+    extra_on_oline['extra_oline_box_right'] = np.where(
+        extra_on_oline['x'] > extra_on_oline[box_right],
+        extra_on_oline['x'],
+        None
+    )
+    return extra_on_oline
+
+def _add_line_set_features(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Add the snap and line_set frames and the offensive line box of each play.
+
+    Adds ball_snap_fid, last_line_set_fid, first_line_set_fid, the x of the
+    tackles (oline_box_left / oline_box_right) and of the center at the last
+    line_set, and the box widened to the players lined up next to the tackles
+    (extra_on_oline, extra_oline_box_left / extra_oline_box_right).
+    """
+    last_line_set_event = _last_line_set_fid(df_tracking).rename(columns={'line_set_fid': 'last_line_set_fid'})
+    oline_box = (
+        df_tracking[df_tracking['position_by_loc'].isin(['LT', 'RT'])]
+        .merge(last_line_set_event, on='game_play_id')
+        .query('frame_id == last_line_set_fid')
+        [['game_play_id', 'last_line_set_fid', 'position_by_loc', 'x']]
+    )
+    ball_snap_fid = (
+        df_tracking[df_tracking['event_new'] == 'ball_snap']
+        [['game_play_id', 'frame_id']]
+        .rename(columns={'frame_id': 'ball_snap_fid'})
+        .drop_duplicates()
+    )
+    df_tracking = df_tracking.merge(ball_snap_fid, on='game_play_id', how='left')
+    df_tracking = df_tracking.merge(
+        (
+            oline_box[oline_box['position_by_loc'] == 'LT']
+            [['game_play_id', 'last_line_set_fid', 'x']]
+            .rename(columns={'x': 'oline_box_left'})
+        ),
+        on='game_play_id',
+        how='left'
+    )
+    df_tracking = df_tracking.merge(
+        (
+            oline_box[oline_box['position_by_loc'] == 'RT']
+            [['game_play_id', 'x']]
+            .rename(columns={'x': 'oline_box_right'})
+        ),
+        on='game_play_id',
+        how='left'
+    )
+    df_tracking = df_tracking.merge(
+        (
+            df_tracking.query('frame_id == last_line_set_fid and position_by_loc == "C"')
+            .rename(columns={'x': 'center_x_at_line_set'})
+            [['game_play_id', 'center_x_at_line_set']]
+            .drop_duplicates()
+        ),
+        on='game_play_id',
+        how='left'
+    )
+    first_line_set_event = (
+        df_tracking[df_tracking['event_new'] == 'line_set']
+        .groupby('game_play_id')['frame_id']
+        .min()
+        .reset_index()
+        .rename(columns={'frame_id': 'first_line_set_fid'})
+    )
+    df_tracking = df_tracking.merge(first_line_set_event, on='game_play_id', how='left')
+
+    # Players lined up next to the tackles, not behind the line
+    extra_on_oline = df_tracking.query('last_line_set_fid == frame_id')
+    y_min_oline_left = extra_on_oline.query('position_by_loc.isin(["LT","LG","C"])').groupby('game_play_id')['y'].min().reset_index()
+    y_min_oline_right = extra_on_oline.query('position_by_loc.isin(["RT","RG","C"])').groupby('game_play_id')['y'].min().reset_index()
+    extra_on_oline = extra_on_oline.merge(y_min_oline_left, on='game_play_id', suffixes=('', '_min_oline_left'))
+    extra_on_oline = extra_on_oline.merge(y_min_oline_right, on='game_play_id', suffixes=('', '_min_oline_right'))
+    extra_on_oline = extra_on_oline.query(
+        'offense and ' +
+        '((x < oline_box_left and x > oline_box_left - 2 and y_min_oline_left - 0.1 < y) or ' +
+        ' (x > oline_box_right and x < oline_box_right + 2 and y_min_oline_right - 0.1 < y))'
+    ).drop_duplicates()[['game_play_id', 'nfl_id', 'x', 'y_min_oline_left', 'y_min_oline_right', 'oline_box_left', 'oline_box_right']]
+    extra_on_oline = _extra_oline_box(extra_on_oline, 'oline_box_left', 'oline_box_right')
+
+    df_tracking = df_tracking.merge(
+        extra_on_oline[['game_play_id', 'nfl_id', 'y_min_oline_left', 'y_min_oline_right',
+                        'extra_on_oline', 'extra_oline_box_left', 'extra_oline_box_right']],
+        on=['game_play_id', 'nfl_id'],
+        how='left'
+    )
+    for side in ['left', 'right']:
+        extra_box = df_tracking.groupby('game_play_id')[f'extra_oline_box_{side}'].transform('max')
+        df_tracking[f'extra_oline_box_{side}'] = extra_box.fillna(df_tracking[f'oline_box_{side}'])
+    df_tracking['extra_on_oline'] = df_tracking['extra_on_oline'].notna()
+
+    # Repeat the process for extra oline outside of the additional oline box
+    extra_on_oline = df_tracking.query('extra_on_oline and (last_line_set_fid == frame_id)')
+    extra_on_oline = extra_on_oline.query(
+        'offense and ' +
+        '((~extra_oline_box_left.isna() and x < extra_oline_box_left and x > extra_oline_box_left - 2 and y > y_min_oline_left - 0.1) or ' +
+        ' (~extra_oline_box_right.isna() and x > extra_oline_box_right and x < extra_oline_box_right + 2 and y > y_min_oline_right - 0.1))'
+    ).drop_duplicates()[['game_play_id', 'nfl_id', 'x', 'y_min_oline_left', 'y_min_oline_right', 'extra_oline_box_left', 'extra_oline_box_right']]
+    extra_on_oline = _extra_oline_box(extra_on_oline, 'extra_oline_box_left', 'extra_oline_box_right')
+
+    if not extra_on_oline.empty:
+        df_tracking = df_tracking.merge(
+            extra_on_oline[['game_play_id', 'nfl_id', 'extra_on_oline', 'extra_oline_box_left', 'extra_oline_box_right']],
+            on=['game_play_id', 'nfl_id'],
+            how='left',
+            suffixes=('', '_x')
+        )
+        for side in ['left', 'right']:
+            extra_box = df_tracking.groupby('game_play_id')[f'extra_oline_box_{side}_x'].transform('max')
+            df_tracking[f'extra_oline_box_{side}'] = df_tracking[f'extra_oline_box_{side}'].fillna(extra_box)
+        df_tracking['extra_on_oline'] = df_tracking['extra_on_oline'] | df_tracking['extra_on_oline_x'].notna()
+        df_tracking.drop(columns=['extra_on_oline_x', 'extra_oline_box_left_x', 'extra_oline_box_right_x'], inplace=True)
+    return df_tracking
+
+def finalize_tracking(
+        week: int,
+        tracking: tuple,
+        players_path: str,
+        line_set_speed_threshold: float = events.LINE_SET_MEAN_SPEED_THRESHOLD,
+        motion_speed_threshold: float = MOTION_SPEED_THRESHOLD
+    ) -> tuple:
+    """Add events, offensive line positions and the motion player (notebook 02).
+
+    Plays with multiple QBs (and their games), plays without exactly 5
+    offensive linemen, WILDCAT plays and plays without a center next to the
+    QB are dropped.
+
+    Args:
+        week: Week of the data.
+        tracking: Output of `filter_run_plays`.
+        players_path: players.pkl of `write_season_data`.
+        line_set_speed_threshold: Mean team speed below which the line is
+            set, see `events.line_set_frames`. Defaults to 0.3.
+        motion_speed_threshold: Speed from which a player is moving when
+            finding the motion player. Defaults to 1.0.
+
+    Returns:
+        The final tracking, play, game and player play data of the week, see
+        `TRACKING_FINAL_TABLES`.
+    """
+    df_tracking, df_play, df_game, df_player_play = tracking
+    df_player = pd.read_pickle(players_path)
+    df_tracking = df_tracking.assign(
+        position=np.where(df_tracking['display_name'] == 'Taysom Hill', 'TE', df_tracking['position'])
+    )
+
+    # Drop all other plays with multiple QBS, and their games
+    plays_with_multiple_qbs = _multiple_qb_plays(df_tracking)
+    if len(plays_with_multiple_qbs) > 0:
+        drop_game_play_ids = plays_with_multiple_qbs['game_play_id'].unique().tolist()
+        drop_game_ids = plays_with_multiple_qbs['game_id'].unique().tolist()
+        logger.info(f'Wk {week}: Dropping {len(drop_game_play_ids)} plays with multiple QBs.')
+        df_tracking = df_tracking[~df_tracking['game_play_id'].isin(drop_game_play_ids)]
+        df_game = df_game[~df_game['game_id'].isin(drop_game_ids)]
+        df_play = df_play[~df_play['game_play_id'].isin(drop_game_play_ids)]
+        df_player_play = df_player_play[~df_player_play['game_play_id'].isin(drop_game_play_ids)]
+    df_tracking = df_tracking.rename(columns={
+        'lateral_dist_to_ball': 'dx_to_ball',
+        'vertical_dist_to_ball': 'dy_to_ball'
+    })
+
+    # create 'event_new' column with line_set and ball_snap events
+    df_tracking = events.create_events(df_tracking, speed_threshold=line_set_speed_threshold)
+    tables = (df_tracking, df_play, df_game, df_player_play)
+
+    tables = _drop_plays(week, tables, _incomplete_oline_plays(tables[0]), 'plays without exactly 5 offensive linemen')
+    tables = _drop_plays(week, tables, _wildcat_plays(tables[0], tables[1]), 'WILDCAT plays')
+
+    lineman_and_qb, unbalanced = _oline_positions(tables[0])
+    df_tracking, df_play, df_game, df_player_play = _drop_plays(
+        week, tables, unbalanced, 'plays without a balanced offensive line'
+    )
+    df_tracking = df_tracking.merge(lineman_and_qb, on=['game_play_id', 'nfl_id'], how='left')
+    df_tracking['position_by_loc'] = df_tracking['position_by_loc'].fillna(df_tracking['position'])
+
+    motion_players = _motion_players(df_tracking, df_player, motion_speed_threshold)
+    df_tracking = df_tracking.merge(motion_players.assign(motion_player=True), on=['game_play_id', 'nfl_id'], how='left')
+    df_tracking['motion_player'] = df_tracking['motion_player'].notna()
+    if len(df_play) > 0:
+        pct_motion = len(motion_players) / df_play['game_play_id'].nunique()
+        logger.info(f'Week {week}: {pct_motion:.2%} of run plays have a player in motion.')
+
+    df_tracking = _add_line_set_features(df_tracking)
+    return df_tracking, df_play, df_game, df_player_play
+
+def _direction_groups(moving_left: np.ndarray) -> np.ndarray:
+    """Number the changes of direction of a motion.
+
+    The direction changes when a streak of three frames moving the same way
+    differs from the current direction.
+    """
+    streak = np.zeros(len(moving_left), dtype=bool)
+    streak[2:] = (moving_left[2:] == moving_left[1:-1]) & (moving_left[1:-1] == moving_left[:-2])
+    group_ids = np.empty(len(moving_left), dtype=int)
+    current_group, direction = 0, moving_left[0]
+    for i in range(len(moving_left)):
+        if streak[i] and moving_left[i] != direction:
+            current_group += 1
+            direction = moving_left[i]
+        group_ids[i] = current_group
+    return group_ids
+
+def _path_distance(df: pd.DataFrame) -> pd.Series:
+    """Distance traveled by each play's rows, in order."""
+    step = np.sqrt(df.groupby('game_play_id')['x'].diff()**2 + df.groupby('game_play_id')['y'].diff()**2)
+    return step.groupby(df['game_play_id']).sum()
+
+def _oline_side(df_motion: pd.DataFrame) -> np.ndarray:
+    """Side of the (widened) offensive line box each row is on."""
+    x, box_left, box_right = df_motion['x'], df_motion['extra_oline_box_left'], df_motion['extra_oline_box_right']
+    # left side negative, right side positive
+    dx_outside = np.where(x < box_left, x - box_left, np.where(x > box_right, x - box_right, np.nan))
+    # negative if closer to left sideline, positive if closer to right sideline
+    dx_inside = np.where(
+        (box_left < x) & (x < box_right),
+        np.where(x < df_motion['center_x_at_line_set'], box_left - x, box_right - x),
+        np.nan
+    )
+    return np.select(
+        [
+            dx_outside < 0,
+            dx_outside > 0,
+            (dx_inside < 0) & (dx_inside > -1),
+            (dx_inside > 0) & (dx_inside < 1),
+            dx_inside >= 1,
+            dx_inside <= -1,
+        ],
+        [
+            'outside-left',
+            'outside-right',
+            'inside-oline-left',
+            'inside-oline-right',
+            'within-oline-right',
+            'within-oline-left',
+        ],
+        default=None
+    )
+
+def _motion_frames(
+        df_tracking: pd.DataFrame,
+        moving_threshold: float,
+        n_frames_not_moving: int,
+        speed_window_width: int | None = None
+    ) -> pd.DataFrame:
+    """Frames of the motion players from the first line_set to 1s after the snap.
+
+    Only plays with a QB at the last line_set and with motion frames (see
+    `motion.add_motion_frame`) are kept. With `speed_window_width` the motion
+    frames are found on the s_smoothed of `motion.speed_profiles`.
+    """
+    cols = [
+        'game_play_id', 'frame_id', 'frame_type', 'event_new', 'nfl_id', 'position_by_loc',
+        'extra_oline_box_left', 'oline_box_left', 'center_x_at_line_set', 'oline_box_right',
+        'extra_oline_box_right', 'x', 'y', 's', 'a', 'o', 'dir', 'motion_player'
+    ]
+    df_motion = df_tracking.query(
+        'frame_id >= first_line_set_fid and ' +
+        'frame_id <= ball_snap_fid + 10 and ' +
+        'offense'
+    )[cols]
+
+    # line_set window is each set of frame between line_set events
+    df_motion = df_motion.sort_values(['game_play_id', 'frame_id'], kind='mergesort')
+    line_set_windows = (
+        df_motion
+        .query('event_new == "line_set"')
+        .drop_duplicates(['game_play_id', 'frame_id'])
+        .assign(line_set_window_number=lambda x: x.groupby('game_play_id').cumcount())
+    )
+    df_motion = df_motion.merge(
+        line_set_windows[['game_play_id', 'frame_id', 'line_set_window_number']],
+        on=['game_play_id', 'frame_id'],
+        how='left'
+    )
+    df_motion = df_motion[df_motion['game_play_id'].isin(df_motion.query('motion_player')['game_play_id'].unique())]
+    df_motion['line_set_window_number'] = df_motion['line_set_window_number'].ffill().astype(int)
+
+    qb_x_last_line_set = (
+        df_tracking
+        .query('frame_id==last_line_set_fid and position=="QB"')
+        [['game_play_id', 'x', 'y']]
+        .rename(columns={'x': 'qb_x_last_line_set', 'y': 'qb_y_last_line_set'})
+    )
+    df_motion = df_motion.merge(qb_x_last_line_set, on='game_play_id')
+
+    # Create moving and motion_frame columns
+    df_motion = df_motion.query('motion_player').copy()
+    speed_col = 's'
+    if speed_window_width is not None:
+        profiles = motion.speed_profiles(df_motion, speed_window_width).reset_index()
+        df_motion = df_motion.merge(
+            profiles[['game_play_id', 'nfl_id', 'frame_id', 's_smoothed']],
+            on=['game_play_id', 'nfl_id', 'frame_id'],
+            how='left'
+        )
+        speed_col = 's_smoothed'
+    df_motion = motion.add_motion_frame(df_motion, moving_threshold, n_frames_not_moving, speed_col=speed_col)
+    motion_gids = df_motion.query('motion_frame')['game_play_id'].unique()
+    return df_motion[df_motion['game_play_id'].isin(motion_gids)]
+
+def _motion_features(
+        df_motion: pd.DataFrame,
+        df_tracking: pd.DataFrame,
+        df_play: pd.DataFrame,
+        df_player_play: pd.DataFrame
+    ) -> pd.DataFrame:
+    """Add the side of the line, direction changes, extent and QB crossing of the motions."""
+    cols = [
+        'game_play_id', 'nfl_id', 'frame_id', 'frame_type', 'event_new', 'motion_frame',
+        'position_by_loc', 'extra_oline_box_left', 'oline_box_left', 'center_x_at_line_set',
+        'oline_box_right', 'extra_oline_box_right', 'qb_x_last_line_set', 'qb_y_last_line_set',
+        'x', 'y', 's', 'a', 'o', 'dir', 'line_set_window_number', 'moving'
+    ]
+    df_motion = df_motion.query('motion_player')[cols]
+    df_motion = df_motion.merge(
+        df_player_play[['game_play_id', 'nfl_id', 'had_rush_attempt']],
+        how='left',
+        on=['game_play_id', 'nfl_id']
+    )
+    df_motion = df_motion.merge(
+        df_play[['game_play_id', 'absolute_yardline_number']],
+        on='game_play_id',
+        how='left'
+    )
+
+    df_motion['oline_side'] = _oline_side(df_motion)
+    is_motion_frame = df_motion['motion_frame']
+
+    # cross the line of scrimmage if play with motion_frame has both dx_outside_oline < 0 and dx_outside_oline > 0
+    outside_left_gids = df_motion[is_motion_frame & (df_motion['oline_side'] == 'outside-left')]['game_play_id'].unique()
+    outside_right_gids = df_motion[is_motion_frame & (df_motion['oline_side'] == 'outside-right')]['game_play_id'].unique()
+    crossing_oline_gids = np.concatenate([
+        df_motion[
+            df_motion['game_play_id'].isin(outside_left_gids) &
+            df_motion['oline_side'].isin(['inside-oline-right', 'outside-right'])
+        ]['game_play_id'].unique(),
+        df_motion[
+            df_motion['game_play_id'].isin(outside_right_gids) &
+            df_motion['oline_side'].isin(['inside-oline-left', 'outside-left'])
+        ]['game_play_id'].unique(),
+    ])
+    df_motion['motion_crosses_over_oline'] = df_motion['game_play_id'].isin(crossing_oline_gids)
+
+    first_motion_frame_side = (
+        df_motion[is_motion_frame]
+        .drop_duplicates('game_play_id', keep='first')
+        [['game_play_id', 'oline_side']]
+        .rename(columns={'oline_side': 'oline_side_first'})
+    )
+    df_motion = df_motion.merge(first_motion_frame_side, on='game_play_id', how='left')
+    last_presnap_frame_side = (
+        df_motion[df_motion['frame_type'] == 'BEFORE_SNAP']
+        .drop_duplicates('game_play_id', keep='last')
+        [['game_play_id', 'oline_side']]
+        .rename(columns={'oline_side': 'oline_side_last_presnap'})
+    )
+    df_motion = df_motion.merge(last_presnap_frame_side, on='game_play_id', how='left')
+    motion_enters_oline_gids = df_motion[
+        df_motion['motion_frame'] &
+        df_motion['oline_side'].isin(['inside-oline-left', 'inside-oline-right', 'within-oline-left', 'within-oline-right'])
+    ]['game_play_id'].unique()
+    df_motion['motion_enters_oline'] = df_motion['game_play_id'].isin(motion_enters_oline_gids)
+
+    df_motion['moving_leftish'] = (df_motion['dir'] > 90) & (df_motion['dir'] <= 270)
+    df_motion['moving_rightish'] = (df_motion['dir'] > 270) | (df_motion['dir'] <= 90)
+    df_motion['moving_left'] = np.where(df_motion['moving_leftish'], 1, 0)
+
+    # Count direction changes with the three frame streak in that direction
+    filtered_motion = df_motion.query('motion_frame').sort_values(['game_play_id', 'frame_id'], kind='mergesort')
+    direction_group_id = np.empty(len(filtered_motion), dtype=int)
+    for rows in filtered_motion.groupby('game_play_id').indices.values():
+        direction_group_id[rows] = _direction_groups(filtered_motion['moving_left'].to_numpy()[rows])
+    direction_grouped = filtered_motion[['game_play_id', 'frame_id']].assign(direction_group_id=direction_group_id)
+    direction_grouped['n_direction_changes'] = direction_grouped.groupby('game_play_id')['direction_group_id'].transform('max')
+    df_motion = df_motion.merge(direction_grouped, on=['game_play_id', 'frame_id'], how='left')
+
+    # set all frames of a play to its n_direction_changes
+    n_direction_changes = (
+        df_motion
+        .query('motion_frame')
+        .groupby('game_play_id')
+        .agg(n_direction_changes=('n_direction_changes', 'first'))
+    )
+    df_motion = df_motion.drop(columns='n_direction_changes').merge(n_direction_changes, on='game_play_id', how='left')
+
+    motion_dir = (
+        df_motion
+        .query('frame_type == "BEFORE_SNAP" and motion_frame')
+        .groupby('game_play_id')
+        .agg(
+            motion_leftish_all=('moving_leftish', 'all'),
+            motion_rightish_all=('moving_rightish', 'all')
+        )
+    )
+    df_motion = df_motion.merge(motion_dir, on='game_play_id', how='left')
+    df_motion['same_motion_dir'] = np.select(
+        [
+            df_motion['motion_leftish_all'].fillna(False).astype(bool),
+            df_motion['motion_rightish_all'].fillna(False).astype(bool)
+        ],
+        [
+            'left-all',
+            'right-all'
+        ],
+        default=None
+    )
+    df_motion.drop(columns=['motion_leftish_all', 'motion_rightish_all'], inplace=True)
+
+    motion_dir_by_group = (
+        df_motion
+        .query('motion_frame')
+        .groupby(['game_play_id', 'direction_group_id'])
+        .agg(
+            n_frame_leftish=('moving_leftish', 'sum'),
+            n_frame_rightish=('moving_rightish', 'sum'),
+            contains_motion_frame=('motion_frame', 'any')
+        )
+        .reset_index()
+    )
+    motion_dir_by_group['dir_smoothed'] = np.where(
+        motion_dir_by_group['n_frame_leftish'] >= motion_dir_by_group['n_frame_rightish'],
+        'left',
+        'right'
+    )
+    # motion dir on the first and last direction groups
+    for keep, col in [('first', 'motion_dir_first'), ('last', 'motion_dir_last')]:
+        df_motion = df_motion.merge(
+            (
+                motion_dir_by_group
+                .drop_duplicates('game_play_id', keep=keep)
+                .rename(columns={'dir_smoothed': col})
+                [['game_play_id', col]]
+            ),
+            on='game_play_id',
+            how='left'
+        )
+    df_motion = df_motion.merge(
+        motion_dir_by_group[['game_play_id', 'direction_group_id', 'dir_smoothed', 'contains_motion_frame']],
+        on=['game_play_id', 'direction_group_id'],
+        how='left'
+    )
+    df_motion['contains_motion_frame'] = df_motion['contains_motion_frame'].notna() & (df_motion['contains_motion_frame'] == True)
+
+    # Add QB x,y to df_motion
+    df_motion = df_motion.merge(
+        (
+            df_tracking
+            .query('position_by_loc=="QB"')
+            [['game_play_id', 'frame_id', 'x', 'y']]
+            .rename(columns={'x': 'qb_x', 'y': 'qb_y'})
+        ),
+        on=['game_play_id', 'frame_id'],
+        how='left'
+    )
+
+    # max dx and dy of the motion
+    extent = df_motion.query('motion_frame').groupby('game_play_id').agg(
+        x_min=('x', 'min'),
+        x_max=('x', 'max'),
+        y_min=('y', 'min'),
+        y_max=('y', 'max'),
+    )
+    df_motion = df_motion.merge(
+        pd.DataFrame({'dx': extent['x_max'] - extent['x_min'], 'dy': extent['y_max'] - extent['y_min']}),
+        on='game_play_id',
+        how='left'
+    )
+
+    # behind center at snap
+    frame_at_snap = (
+        df_motion[['game_play_id', 'nfl_id', 'center_x_at_line_set']].drop_duplicates()
+        .merge(
+            (
+                df_tracking.query('frame_type=="SNAP"')
+                [['game_play_id', 'nfl_id', 'x', 'y']]
+                .rename(columns={'x': 'x_at_line_set', 'y': 'y_at_line_set'})
+            ),
+            on=['game_play_id', 'nfl_id'],
+            how='left'
+        )
+    )
+    frame_at_snap['behind_center_at_snap'] = (
+        (frame_at_snap['center_x_at_line_set'] - 0.5 < frame_at_snap['x_at_line_set']) &
+        (frame_at_snap['x_at_line_set'] < frame_at_snap['center_x_at_line_set'] + 0.5)
+    )
+    df_motion = df_motion.merge(frame_at_snap[['game_play_id', 'behind_center_at_snap']], on='game_play_id', how='left')
+
+    # Farthest back player at snap
+    farthest_back = frame_at_snap.merge(
+        (
+            df_tracking
+            .query('frame_type=="SNAP"')
+            .groupby('game_play_id')
+            .agg(farthest_back_y=('y', 'min'))
+            .reset_index()
+        ),
+        on='game_play_id',
+        how='left'
+    )
+    farthest_back['farthest_back_at_snap'] = farthest_back['y_at_line_set'] == farthest_back['farthest_back_y']
+    df_motion = df_motion.merge(farthest_back[['game_play_id', 'farthest_back_at_snap']], on='game_play_id', how='left')
+
+    # set frame of first motion
+    first_motion_frame = df_motion.query('motion_frame').groupby('game_play_id').agg(first_motion_fid=('frame_id', 'min'))
+    df_motion = df_motion.merge(first_motion_frame, on='game_play_id', how='left')
+    ball_snap_frame = (
+        df_tracking
+        .query('frame_type=="SNAP"')
+        [['game_play_id', 'frame_id']]
+        .rename(columns={'frame_id': 'ball_snap_fid'})
+        .drop_duplicates('game_play_id')
+    )
+    df_motion = df_motion.merge(ball_snap_frame, on='game_play_id', how='left')
+
+    # if motion is ahead or behind qb when player crosses qb path
+    motion_crossing_qb = (
+        df_motion
+        .query('frame_id > first_motion_fid and frame_id < ball_snap_fid + 10 and qb_x - 0.5 < x and x < qb_x + 0.5')
+        [['game_play_id', 'direction_group_id', 'y', 'qb_y']]
+        .drop_duplicates(['game_play_id', 'direction_group_id'], keep='first')
+    )
+    # fill na direction_group_id the previous value + 1
+    df_motion.loc[df_motion['direction_group_id'].isna(), 'direction_group_id'] = df_motion['direction_group_id'].shift() + 1
+    motion_crossing_qb['motion_crossing_qb'] = np.where(
+        motion_crossing_qb['y'] > motion_crossing_qb['qb_y'],
+        'in-front-of-qb',
+        'behind-qb'
+    )
+    df_motion = df_motion.merge(
+        motion_crossing_qb[['game_play_id', 'direction_group_id', 'motion_crossing_qb']],
+        on=['game_play_id', 'direction_group_id'],
+        how='left'
+    )
+    df_motion.loc[df_motion['motion_crossing_qb'].isna() & df_motion['motion_frame'], 'motion_crossing_qb'] = 'not-crossing-qb'
+    for keep, col in [('last', 'motion_crossing_qb_last'), ('first', 'motion_crossing_qb_first')]:
+        df_motion = df_motion.merge(
+            (
+                motion_crossing_qb
+                .drop_duplicates('game_play_id', keep=keep)
+                .rename(columns={'motion_crossing_qb': col})
+                [['game_play_id', col]]
+            ),
+            on='game_play_id',
+            how='left'
+        )
+    return df_motion
+
+def _classify_yo_yo(df_motion: pd.DataFrame) -> None:
+    """Yo-Yo motion (and one case of Orbit motion): changes direction after starting towards the QB."""
+    df_motion['motion_group'] = np.where(
+        (df_motion['n_direction_changes'] > 0) &
+        (df_motion['dx'] > 2) &
+        (
+            ((df_motion['oline_side_first'] == 'outside-left') & (df_motion['motion_dir_first'] == 'right')) |
+            ((df_motion['oline_side_first'] == 'outside-right') & (df_motion['motion_dir_first'] == 'left'))
+        ),
+        'Yo-Yo',
+        df_motion['motion_group']
+    )
+    df_motion['motion_sub_group'] = np.where(
+        df_motion['motion_group'] == 'Yo-Yo',
+        np.select(
+            [
+                df_motion['n_direction_changes'] == 3,
+                df_motion['n_direction_changes'] == 2,
+                (df_motion['behind_center_at_snap'] == True) & (df_motion['farthest_back_at_snap'] != True),
+                (df_motion['motion_crossing_qb_first'] == 'in-front-of-qb') &
+                (df_motion['motion_crossing_qb_last'] == 'behind-qb'),
+                df_motion['motion_crosses_over_oline'],
+                df_motion['motion_enters_oline'],
+            ],
+            ['Triple Yo-Yo', 'Double Yo-Yo', 'Yo-Yo Lead', 'Under Orbit', 'Full Yo-Yo', 'Half Yo-Yo'],
+            default=None
+        ),
+        df_motion['motion_sub_group']
+    )
+    df_motion['motion_group'] = np.where(
+        df_motion['motion_sub_group'] == 'Under Orbit',
+        'Orbit',
+        df_motion['motion_group']
+    )
+
+def _classify_over(df_motion: pd.DataFrame, df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Over motion: an Off-Line Y crossing the formation without changing direction."""
+    df_motion['dx_dy_ratio'] = df_motion['dx'] / df_motion['dy']
+    df_motion = df_motion.merge(
+        (
+            df_tracking.query('frame_id == ball_snap_fid + 20')
+            [['game_play_id', 'nfl_id', 'x', 'y']]
+            .rename(columns={'x': 'x_2_sec_after_snap', 'y': 'y_2_sec_after_snap'})
+        ),
+        on=['game_play_id', 'nfl_id'],
+        how='left'
+    )
+
+    # Feature for motion man has not reached center before snap (or not far past center)
+    x_loc_at_ball_snap = (
+        df_motion
+        .query('frame_id == ball_snap_fid')
+        [['game_play_id', 'nfl_id', 'x']]
+        .rename(columns={'x': 'x_loc_at_ball_snap'})
+    )
+    df_motion = df_motion.merge(x_loc_at_ball_snap, on=['game_play_id', 'nfl_id'], how='left')
+
+    # This feature only applies to single direction motions
+    df_motion['ball_snap_before_passing_center'] = (
+        (
+            (df_motion['oline_side_first'] == 'outside-left') &
+            (df_motion['same_motion_dir'] == 'right-all') &
+            (df_motion['x_loc_at_ball_snap'] < df_motion['center_x_at_line_set'] + 0.5)
+        ) |
+        (
+            (df_motion['oline_side_first'] == 'outside-right') &
+            (df_motion['same_motion_dir'] == 'left-all') &
+            (df_motion['x_loc_at_ball_snap'] > df_motion['center_x_at_line_set'] - 0.5)
+        )
+    )
+    df_motion['motion_group'] = np.where(
+        (df_motion['n_direction_changes'] == 0) &
+        (df_motion['y_2_sec_after_snap'] >= df_motion['absolute_yardline_number'] - 3) &
+        (df_motion['dx_dy_ratio'] >= 2) &
+        (df_motion['initial_alignment'] == 'Off-Line Y') &
+        (
+            (
+                (df_motion['oline_side_first'] == 'outside-left') &
+                (df_motion['motion_dir_first'] == 'right') &
+                (df_motion['x_2_sec_after_snap'] >= df_motion['center_x_at_line_set'] + 1)
+            ) |
+            (
+                (df_motion['oline_side_first'] == 'outside-right') &
+                (df_motion['motion_dir_first'] == 'left') &
+                (df_motion['x_2_sec_after_snap'] <= df_motion['center_x_at_line_set'] - 1)
+            )
+        ),
+        'Over',
+        df_motion['motion_group']
+    )
+    df_motion['motion_sub_group'] = np.where(
+        df_motion['motion_group'] == 'Over',
+        np.where(
+            df_motion['ball_snap_before_passing_center'],
+            'Ball Snap Before Passing Center',
+            'Ball Snap After Passing Center'
+        ),
+        df_motion['motion_sub_group']
+    )
+    return df_motion
+
+def _classify_crossing(df_motion: pd.DataFrame, df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Orbit, Fly and Jet motion: crosses to the other side of the line within 3s of the snap."""
+    cols = [
+        'game_play_id', 'nfl_id', 'first_motion_fid', 'ball_snap_fid', 'position_by_loc', 'oline_box_left', 'oline_box_right',
+        'oline_side_first', 'same_motion_dir', 'initial_alignment', 'n_direction_changes', 'dx', 'dy',
+        'dx_dy_ratio', 'qb_x', 'qb_y', 'absolute_yardline_number',
+        'motion_group', 'motion_sub_group'
+    ]
+    qb_y_at_frame = (
+        df_tracking.query('position_by_loc=="QB"')
+        [['game_play_id', 'frame_id', 'y']]
+        .rename(columns={'y': 'qb_y_at_frame'})
+    )
+    df_motion_all_frames = (
+        df_motion.query('motion_frame')[cols].drop_duplicates(['game_play_id'])
+        .merge(
+            df_tracking[['game_play_id', 'nfl_id', 'frame_id', 'event_new', 'frame_type', 'x', 'y', 's', 'a', 'dir']],
+            on=['game_play_id', 'nfl_id'],
+            how='left'
+        )
+        .merge(qb_y_at_frame, on=['game_play_id', 'frame_id'], how='left')
+    )
+
+    # column for if motion crosses to other side of oline
+    within_3_sec_post_snap = (
+        df_motion_all_frames
+        .query('ball_snap_fid <= frame_id <= ball_snap_fid + 30 and y <= absolute_yardline_number')
+        .groupby('game_play_id')['x']
+    )
+    df_motion_all_frames = df_motion_all_frames.merge(
+        within_3_sec_post_snap.max().rename('max_x_within_3_sec_post_snap'), on='game_play_id', how='left'
+    )
+    df_motion_all_frames = df_motion_all_frames.merge(
+        within_3_sec_post_snap.min().rename('min_x_within_3_sec_post_snap'), on='game_play_id', how='left'
+    )
+
+    # Figure out if motion player starts next to or ahead of QB
+    motion_starts_next_to_qb = (
+        df_motion_all_frames
+        .query('first_motion_fid == frame_id')
+        [['game_play_id', 'frame_id', 'y']]
+        .merge(qb_y_at_frame.rename(columns={'qb_y_at_frame': 'qb_y'}), on=['game_play_id', 'frame_id'], how='left')
+    )
+    motion_starts_next_to_qb['motion_player_starts_next_to_or_ahead_of_qb'] = (
+        motion_starts_next_to_qb['qb_y'] - motion_starts_next_to_qb['y'] <= 0.5
+    )
+    df_motion_all_frames = df_motion_all_frames.merge(
+        motion_starts_next_to_qb[['game_play_id', 'motion_player_starts_next_to_or_ahead_of_qb']],
+        on='game_play_id',
+        how='left'
+    )
+    df_motion_all_frames['motion_crosses_to_other_side'] = (
+        (df_motion_all_frames['n_direction_changes'] == 0) &
+        (
+            (
+                df_motion_all_frames['oline_side_first'].isin(['outside-left', 'inside-oline-left', 'within-oline-left']) &
+                (df_motion_all_frames['same_motion_dir'] == 'right-all') &
+                (df_motion_all_frames['oline_box_right'] < df_motion_all_frames['max_x_within_3_sec_post_snap'])
+            ) |
+            (
+                df_motion_all_frames['oline_side_first'].isin(['outside-right', 'inside-oline-right', 'within-oline-right']) &
+                (df_motion_all_frames['same_motion_dir'] == 'left-all') &
+                (df_motion_all_frames['min_x_within_3_sec_post_snap'] < df_motion_all_frames['oline_box_left'])
+            )
+        )
+    )
+    df_motion_crossing_oline = df_motion_all_frames[df_motion_all_frames['motion_crosses_to_other_side']]
+
+    # find the frame crossing the qb (redone as the in front / behind above stops 1s after the snap)
+    motion_crossing_qb = (
+        df_motion_crossing_oline
+        .query('first_motion_fid <= frame_id and frame_id <= ball_snap_fid + 30 and qb_x - 0.5 < x and x < qb_x + 0.5')
+        [['game_play_id', 'frame_id', 'x', 'y', 'qb_x', 'qb_y_at_frame']]
+        .drop_duplicates('game_play_id', keep='first')
+        .rename(columns={'frame_id': 'frame_id_crossing_qb'})
+    )
+    motion_crossing_qb['motion_behind_qb'] = motion_crossing_qb['qb_y_at_frame'] > motion_crossing_qb['y']
+    df_motion_crossing_oline = df_motion_crossing_oline.merge(
+        motion_crossing_qb[['game_play_id', 'motion_behind_qb', 'frame_id_crossing_qb']],
+        on='game_play_id',
+        how='left'
+    )
+
+    # Path of the motion up to crossing the QB, merged per frame of the path
+    df_arc_motion = (
+        df_motion_crossing_oline
+        .query('first_motion_fid <= frame_id and frame_id <= frame_id_crossing_qb')
+        [['game_play_id', 'x', 'y']]
+    )
+    arc_by_play = df_arc_motion.groupby('game_play_id')
+    straight_line_distance = np.sqrt(
+        (arc_by_play['x'].last() - arc_by_play['x'].first())**2 +
+        (arc_by_play['y'].last() - arc_by_play['y'].first())**2
+    )
+    df_arc_motion = df_arc_motion.merge(
+        pd.DataFrame({
+            'path_straight_ratio': _path_distance(df_arc_motion) / straight_line_distance,
+            'dy_motion_to_qb': arc_by_play['y'].last() - arc_by_play['y'].first(),
+        }),
+        on='game_play_id',
+        how='left'
+    )
+    df_motion_crossing_oline = df_motion_crossing_oline.merge(
+        df_arc_motion[['game_play_id', 'path_straight_ratio', 'dy_motion_to_qb']],
+        on='game_play_id',
+        how='left'
+    )
+
+    # Unclassified crossing motions are marked 'nan'
+    df_motion_crossing_oline['motion_group'] = np.where(
+        df_motion_crossing_oline['motion_group'].isna(),
+        np.where(
+            (df_motion_crossing_oline['motion_behind_qb'] == True) &
+            (
+                (df_motion_crossing_oline['dy_motion_to_qb'] <= -2) |
+                (df_motion_crossing_oline['path_straight_ratio'] >= 1.005) |
+                (df_motion_crossing_oline['motion_player_starts_next_to_or_ahead_of_qb'] == True)
+            ),
+            'Orbit',
+            np.where(
+                df_motion_crossing_oline['dx_dy_ratio'] >= 2,
+                np.where(
+                    df_motion_crossing_oline['frame_id_crossing_qb'] <= df_motion_crossing_oline['ball_snap_fid'] - 5,
+                    'Fly',
+                    'Jet'
+                ),
+                'nan'
+            )
+        ),
+        df_motion_crossing_oline['motion_group']
+    )
+    # The sub group is checked at the same row labels of df_motion
+    standard = df_motion_crossing_oline['motion_group'].notna() & df_motion['motion_sub_group'].isna()
+    df_motion_crossing_oline.loc[standard, 'motion_sub_group'] = 'Standard'
+
+    df_motion = df_motion.merge(
+        df_motion_crossing_oline[['game_play_id', 'motion_group', 'motion_sub_group']].drop_duplicates('game_play_id'),
+        on='game_play_id',
+        how='left',
+        suffixes=('', '_x')
+    )
+    for col in ['motion_group', 'motion_sub_group']:
+        df_motion[col] = np.where(df_motion[col].isna(), df_motion[f'{col}_x'], df_motion[col])
+    return df_motion.drop(columns=['motion_group_x', 'motion_sub_group_x'])
+
+def _classify_glide(df_motion: pd.DataFrame, df_tracking: pd.DataFrame) -> None:
+    """Glide motion: moves towards the line without reaching it."""
+    cols = [
+        'game_play_id', 'nfl_id', 'first_motion_fid', 'oline_box_left', 'oline_box_right',
+        'oline_side_first', 'same_motion_dir', 'dx_dy_ratio', 'motion_group', 'motion_sub_group'
+    ]
+    df_motion_all_frames = (
+        df_motion.query('motion_frame')[cols].drop_duplicates(['game_play_id'])
+        .merge(
+            df_tracking[['game_play_id', 'nfl_id', 'frame_id', 'frame_type', 'absolute_yardline_number', 'x', 'y']],
+            on=['game_play_id', 'nfl_id'],
+            how='left'
+        )
+    )
+    towards_line = (
+        df_motion_all_frames
+        .query('y <= absolute_yardline_number - 1 and frame_id >= first_motion_fid')
+        .groupby('game_play_id')['x']
+    )
+    x_at_ball_snap = (
+        df_motion_all_frames
+        .query('frame_type=="SNAP"')
+        [['game_play_id', 'x']]
+        .rename(columns={'x': 'x_at_ball_snap'})
+    )
+    df_motion_all_frames = df_motion_all_frames.merge(towards_line.min().rename('x_motion_min'), on='game_play_id', how='left')
+    df_motion_all_frames = df_motion_all_frames.merge(towards_line.max().rename('x_motion_max'), on='game_play_id', how='left')
+    df_motion_all_frames = df_motion_all_frames.merge(x_at_ball_snap, on='game_play_id', how='left')
+    df_motion_all_frames['x_motion_max'] = df_motion_all_frames['x_motion_max'].fillna(df_motion_all_frames['x_at_ball_snap'])
+
+    qry = df_motion_all_frames
+    glide_gids = qry[
+        qry['motion_group'].isna() &
+        (qry['dx_dy_ratio'] > 3) &
+        (
+            (
+                (qry['oline_side_first'] == 'outside-left') &
+                (qry['same_motion_dir'] == 'right-all') &
+                (qry['x_motion_max'] < qry['oline_box_left'] + 1)
+            ) |
+            (
+                (qry['oline_side_first'] == 'outside-right') &
+                (qry['same_motion_dir'] == 'left-all') &
+                (qry['x_motion_min'] > qry['oline_box_right'] - 1)
+            )
+        )
+    ]['game_play_id'].unique()
+    df_motion.loc[df_motion['game_play_id'].isin(glide_gids), 'motion_group'] = 'Glide'
+    df_motion.loc[df_motion['game_play_id'].isin(glide_gids), 'motion_sub_group'] = 'Standard'
+
+def _off_line_y_alignment(df_tracking: pd.DataFrame, df_motion: pd.DataFrame) -> pd.DataFrame:
+    """Label the Off-Line Y players at the first motion frame.
+
+    The offensive line box at the last line_set is widened, one player at a
+    time, to the players lined up next to it at the first motion frame.
+    Players of the widened line more than half a yard behind the linemen of
+    their side, and the deepest on their side, are Off-Line Ys.
+
+    Returns:
+        `df_tracking` with the initial_alignment, on_oline, the widened box
+        (extra_on_oline_*_at_ls) and center_x_at_ls columns, and
+        last_line_set_fid moved to the first motion frame of the motion plays.
+    """
+    drop_cols = [
+        'ball_x', 'ball_y', 'euclidean_dist_to_ball', 'dx_to_ball', 'dy_to_ball', 'dist_to_ball',
+        'oline_box_left', 'oline_box_right', 'first_line_set_fid',
+        'y_min_oline_left', 'y_min_oline_right', 'extra_on_oline', 'extra_oline_box_left',
+        'extra_oline_box_right', 'center_x_at_line_set'
+    ]
+    df_tracking = df_tracking.drop(columns=[col for col in drop_cols if col in df_tracking.columns])
+
+    # min and max x of the 5 offensive linemen at the last line_set
+    oline_at_ls = df_tracking[
+        (df_tracking['frame_id'] == df_tracking['last_line_set_fid']) &
+        df_tracking['position_by_loc'].isin(OLINE_LOCATIONS)
+    ]
+    df_tracking = (
+        df_tracking
+        .merge(oline_at_ls.groupby('game_play_id')['x'].min().rename('oline_x_left_at_ls'), on='game_play_id', how='left')
+        .merge(oline_at_ls.groupby('game_play_id')['x'].max().rename('oline_x_right_at_ls'), on='game_play_id', how='left')
+        .merge(
+            oline_at_ls[oline_at_ls['position_by_loc'].isin(['LT', 'LG', 'C'])].groupby('game_play_id')['y'].min().rename('oline_y_min_left_at_ls'),
+            on='game_play_id',
+            how='left'
+        )
+        .merge(
+            oline_at_ls[oline_at_ls['position_by_loc'].isin(['C', 'RG', 'RT'])].groupby('game_play_id')['y'].min().rename('oline_y_min_right_at_ls'),
+            on='game_play_id',
+            how='left'
+        )
+    )
+    center_at_ls = (
+        df_tracking
+        .query('frame_id == last_line_set_fid and position_by_loc == "C"')
+        [['game_play_id', 'x']]
+        .rename(columns={'x': 'center_x_at_ls'})
+    )
+    df_tracking = df_tracking.merge(center_at_ls, on='game_play_id', how='left')
+
+    # Set last line set to first motion frame if it is motion play
+    df_tracking = df_tracking.merge(
+        (
+            df_motion[['game_play_id', 'first_motion_fid']]
+            .drop_duplicates('game_play_id')
+            .rename(columns={'first_motion_fid': 'last_line_set_fid'})
+        ),
+        on='game_play_id',
+        how='left',
+        suffixes=('', '_new')
+    )
+    df_tracking['last_line_set_fid'] = np.where(
+        df_tracking['last_line_set_fid_new'].notna(),
+        df_tracking['last_line_set_fid_new'],
+        df_tracking['last_line_set_fid']
+    )
+
+    # Label Extra Players acting as part of the OLine
+    df_tracking['extra_on_oline_x_left_at_ls'] = df_tracking['oline_x_left_at_ls']
+    df_tracking['extra_on_oline_x_right_at_ls'] = df_tracking['oline_x_right_at_ls']
+    df_tracking['extra_on_oline_y_min_left_at_ls'] = df_tracking['oline_y_min_left_at_ls']
+    df_tracking['extra_on_oline_y_min_right_at_ls'] = df_tracking['oline_y_min_right_at_ls']
+    df_tracking['on_oline'] = df_tracking['position_by_loc'].isin(OLINE_LOCATIONS)
+
+    # Loop until no new players are added to the oline
+    extra_on_oline = pd.DataFrame()
+    extra_on_oline_len = 1
+    while extra_on_oline_len != len(extra_on_oline):
+        extra_on_oline = df_tracking.query(
+            '(position_by_loc != "QB") and ~on_oline and offense and frame_id == last_line_set_fid'
+        )[[
+            'game_play_id', 'nfl_id', 'x', 'y', 'center_x_at_ls',
+            'extra_on_oline_y_min_left_at_ls', 'extra_on_oline_y_min_right_at_ls',
+            'extra_on_oline_x_left_at_ls', 'extra_on_oline_x_right_at_ls', 'on_oline'
+        ]].copy()
+        extra_on_oline_len = len(extra_on_oline)
+
+        extra_on_oline['on_oline'] = (
+            (
+                (extra_on_oline['x'] < extra_on_oline['extra_on_oline_x_left_at_ls']) &
+                (extra_on_oline['x'] >= extra_on_oline['extra_on_oline_x_left_at_ls'] - OFF_LINE_Y_MAX_YARDS_NEXT_TO_OLINE) &
+                (extra_on_oline['y'] >= extra_on_oline['extra_on_oline_y_min_left_at_ls'] - OFF_LINE_Y_MAX_YARDS_BEHIND_OLINE)
+            ) |
+            (
+                (extra_on_oline['x'] > extra_on_oline['extra_on_oline_x_right_at_ls']) &
+                (extra_on_oline['x'] <= extra_on_oline['extra_on_oline_x_right_at_ls'] + OFF_LINE_Y_MAX_YARDS_NEXT_TO_OLINE) &
+                (extra_on_oline['y'] >= extra_on_oline['extra_on_oline_y_min_right_at_ls'] - OFF_LINE_Y_MAX_YARDS_BEHIND_OLINE)
+            )
+        )
+        new_on_oline = extra_on_oline[extra_on_oline['on_oline']]
+
+        # Update the oline box for the new players on the oline
+        x_left = df_tracking['game_play_id'].map(
+            new_on_oline[new_on_oline['x'] < new_on_oline['center_x_at_ls']].groupby('game_play_id')['x'].min()
+        )
+        df_tracking['extra_on_oline_x_left_at_ls'] = np.where(
+            x_left.notnull() & (x_left < df_tracking['extra_on_oline_x_left_at_ls']),
+            x_left,
+            df_tracking['extra_on_oline_x_left_at_ls']
+        )
+        x_right = df_tracking['game_play_id'].map(
+            new_on_oline[new_on_oline['x'] > new_on_oline['center_x_at_ls']].groupby('game_play_id')['x'].max()
+        )
+        df_tracking['extra_on_oline_x_right_at_ls'] = np.where(
+            x_right.notnull() & (x_right > df_tracking['extra_on_oline_x_right_at_ls']),
+            x_right,
+            df_tracking['extra_on_oline_x_right_at_ls']
+        )
+
+        # Update on_oline for the new players on the oline
+        df_tracking = df_tracking.merge(
+            new_on_oline[['game_play_id', 'nfl_id', 'on_oline']],
+            on=['game_play_id', 'nfl_id'],
+            how='left',
+            suffixes=('', '_new')
+        )
+        df_tracking['on_oline'] = df_tracking['on_oline_new'].notna() | df_tracking['on_oline']
+        df_tracking.drop(columns='on_oline_new', inplace=True)
+
+        on_oline_at_ls = df_tracking[df_tracking['on_oline'] & (df_tracking['frame_id'] == df_tracking['last_line_set_fid'])]
+        df_tracking['extra_on_oline_y_min_left_at_ls'] = df_tracking['game_play_id'].map(
+            on_oline_at_ls[on_oline_at_ls['x'] < on_oline_at_ls['center_x_at_ls']].groupby('game_play_id')['y'].min()
+        )
+        df_tracking['extra_on_oline_y_min_right_at_ls'] = df_tracking['game_play_id'].map(
+            on_oline_at_ls[on_oline_at_ls['x'] > on_oline_at_ls['center_x_at_ls']].groupby('game_play_id')['y'].min()
+        )
+        extra_on_oline = extra_on_oline[~extra_on_oline['on_oline']]
+
+    # yards behind oline at line set
+    line_set = (
+        df_tracking
+        .query('frame_id == last_line_set_fid')
+        [['game_play_id', 'nfl_id', 'y', 'x', 'center_x_at_ls', 'oline_y_min_left_at_ls', 'oline_y_min_right_at_ls']]
+        .rename(columns={'y': 'y_at_line_set'})
+    )
+    line_set['yards_behind_oline'] = np.where(
+        line_set['x'] < line_set['center_x_at_ls'],
+        np.where(
+            line_set['y_at_line_set'] < line_set['oline_y_min_left_at_ls'],
+            line_set['oline_y_min_left_at_ls'] - line_set['y_at_line_set'],
+            0
+        ),
+        np.where(
+            line_set['y_at_line_set'] < line_set['oline_y_min_right_at_ls'],
+            line_set['oline_y_min_right_at_ls'] - line_set['y_at_line_set'],
+            0
+        )
+    )
+    df_tracking = df_tracking.merge(
+        line_set[['game_play_id', 'nfl_id', 'yards_behind_oline']],
+        on=['game_play_id', 'nfl_id'],
+        how='left'
+    )
+
+    # Classify Off-Line Y Alignment
+    last_line_set = (
+        df_tracking
+        .query('frame_id == last_line_set_fid and ~position_by_loc.isin(@OLINE_LOCATIONS) and on_oline')
+        .query('(y == extra_on_oline_y_min_left_at_ls) or (y == extra_on_oline_y_min_right_at_ls)')
+        .query('yards_behind_oline > .5')
+        [['game_play_id', 'nfl_id']]
+        .assign(initial_alignment='Off-Line Y')
+    )
+    return df_tracking.merge(last_line_set, on=['game_play_id', 'nfl_id'], how='left')
+
+def _classify_in(df_motion: pd.DataFrame, df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """In motion: an Off-Line Y stepping in towards the line before passing the center."""
+    df_motion = df_motion.drop(columns=['initial_alignment']).merge(
+        (
+            df_tracking
+            .query('motion_player')
+            [['game_play_id', 'nfl_id', 'initial_alignment']]
+            .drop_duplicates(['game_play_id', 'nfl_id'])
+        ),
+        on=['game_play_id', 'nfl_id'],
+        how='left'
+    )
+
+    in_motion = df_motion.query('motion_frame').sort_values('frame_id', kind='mergesort')
+    xy_first_motion = (
+        in_motion
+        .drop_duplicates('game_play_id', keep='first')
+        [['game_play_id', 'x', 'y']]
+        .rename(columns={'x': 'x_first_motion', 'y': 'y_first_motion'})
+    )
+    xy_last_motion = (
+        in_motion
+        .drop_duplicates('game_play_id', keep='last')
+        [['game_play_id', 'x', 'y']]
+        .rename(columns={'x': 'x_last_motion', 'y': 'y_last_motion'})
+    )
+    df_motion = df_motion.merge(xy_first_motion, on='game_play_id', how='left')
+    df_motion = df_motion.merge(xy_last_motion, on='game_play_id', how='left')
+    df_motion['dx'] = df_motion['x_first_motion'] - df_motion['x_last_motion']
+    df_motion['dy'] = df_motion['y_first_motion'] - df_motion['y_last_motion']
+
+    df_motion = df_motion.merge(
+        df_tracking.drop_duplicates('game_play_id', keep='last')[['game_play_id', 'last_line_set_fid']],
+        on='game_play_id',
+        how='left'
+    )
+    side_pre_motion = (
+        df_motion
+        .query('frame_id == last_line_set_fid')
+        [['game_play_id', 'oline_side']]
+        .rename(columns={'oline_side': 'oline_side_pre_motion'})
+    )
+    df_motion = df_motion.merge(side_pre_motion, on='game_play_id', how='left')
+
+    in_type_motion_gids = (
+        df_motion
+        .drop_duplicates('game_play_id')
+        .query(
+            '(motion_group.isna() or motion_group=="nan") and ' +
+            'initial_alignment == "Off-Line Y" and ' +
+            'ball_snap_before_passing_center and ' +
+            '0.75 <= dx_dy_ratio <= 3 and ' +
+            '1 <= dy <= 3 and ' +
+            '((oline_side_pre_motion == "outside-left" and -3 <= dx <= -1) or ' +
+            ' (oline_side_pre_motion == "outside-right" and 1 <= dx <= 3))'
+        )
+        ['game_play_id']
+        .unique()
+    )
+    df_motion.loc[df_motion['game_play_id'].isin(in_type_motion_gids), 'motion_group'] = 'In'
+    df_motion.loc[df_motion['game_play_id'].isin(in_type_motion_gids), 'motion_sub_group'] = 'Off-Line Y'
+    return df_motion
+
+def _classify_shuffle(df_motion: pd.DataFrame, df_tracking: pd.DataFrame, df_play: pd.DataFrame) -> pd.DataFrame:
+    """FB Shuffle motion: a late lateral motion of the I formation FB behind the center."""
+    at_ls = df_tracking.query('frame_id == last_line_set_fid')
+    df_motion = (
+        df_motion
+        .merge(df_play[['game_play_id', 'offense_formation']], on='game_play_id', how='left')
+        .merge(df_tracking[['game_play_id', 'center_x_at_ls']].drop_duplicates('game_play_id'), on='game_play_id', how='left')
+        .merge(
+            at_ls[at_ls['position_by_loc'] == 'QB'][['game_play_id', 'y']].rename(columns={'y': 'qb_y_at_ls'}),
+            on='game_play_id',
+            how='left'
+        )
+        .merge(
+            at_ls[at_ls['position_by_loc'] == 'RB'][['game_play_id', 'y']].rename(columns={'y': 'rb_y_at_ls'}),
+            on='game_play_id',
+            how='left'
+        )
+        .merge(
+            at_ls[['game_play_id', 'nfl_id', 'y']].rename(columns={'y': 'y_at_ls'}),
+            on=['game_play_id', 'nfl_id'],
+            how='left'
+        )
+    )
+    df_motion['motion_starts_n_frames_before_snap'] = df_motion['ball_snap_fid'] - df_motion['first_motion_fid']
+    df_motion['abs_dx_center_at_ls'] = (df_motion['center_x_at_ls'] - df_motion['x_first_motion']).abs()
+
+    fb_shuffle_gids = (
+        df_motion
+        .drop_duplicates('game_play_id')
+        .query(
+            'position_by_loc == "FB" and ' +
+            'offense_formation == "I_FORM" and ' +
+            'motion_starts_n_frames_before_snap <= 10 and ' +
+            'dx_dy_ratio >= 10 and ' +
+            'abs_dx_center_at_ls <= .5 and ' +
+            'rb_y_at_ls < y_at_ls < qb_y_at_ls'
+        )
+        ['game_play_id']
+        .unique()
+    )
+    df_motion.loc[df_motion['game_play_id'].isin(fb_shuffle_gids), 'motion_group'] = 'Shuffle'
+    df_motion.loc[df_motion['game_play_id'].isin(fb_shuffle_gids), 'motion_sub_group'] = 'FB'
+    return df_motion
+
+def classify_motion_frames(
+        tracking_final: tuple,
+        moving_threshold: float = motion.MOVING_THRESHOLD,
+        n_frames_not_moving: int = motion.N_FRAMES_NOT_MOVING,
+        speed_window_width: int | None = None
+    ) -> pd.DataFrame:
+    """Classify the motion of the motion player of each play (notebook 03).
+
+    The motion frames of the motion player are found with
+    `motion.add_motion_frame`, and the motion is classified as Yo-Yo, Over,
+    Orbit, Fly, Jet, Glide, In or (FB) Shuffle from its path relative to the
+    offensive line, the QB and the line of scrimmage. The sub group of the
+    classified motions is 'Standard'.
+
+    Args:
+        tracking_final: Output of `finalize_tracking`.
+        moving_threshold: Speed from which a player is moving. Defaults to 1.0.
+        n_frames_not_moving: Number of frames a player can stop without
+            ending the motion. Defaults to 15.
+        speed_window_width: Width of the rolling mean of the speed the
+            motion frames are found on, see `motion.speed_profiles`.
+            Defaults to None (the raw speed s, as in notebook 03).
+
+    Returns:
+        The frames of the motion players from the first line_set to 1s after
+        the snap, with the motion features, motion_group and motion_sub_group.
+    """
+    df_tracking, df_play, _, df_player_play = tracking_final
+
+    df_motion = _motion_frames(df_tracking, moving_threshold, n_frames_not_moving, speed_window_width)
+    df_motion = _motion_features(df_motion, df_tracking, df_play, df_player_play)
+
+    # Off-Line Y at the first frame
+    df_motion_first_frame = df_motion.drop_duplicates('game_play_id', keep='first')
+    df_motion = df_motion.merge(
+        df_motion_first_frame[['game_play_id']].assign(initial_alignment=np.where(
+            df_motion_first_frame['position_by_loc'].isin(['TE', 'RB', 'FB', 'WR']) &
+            (df_motion_first_frame['y'] < df_motion_first_frame['absolute_yardline_number'] - 1) &
+            (df_motion_first_frame['y'] > df_motion_first_frame['absolute_yardline_number'] - 4) &
+            (
+                (
+                    (df_motion_first_frame['x'] < df_motion_first_frame['extra_oline_box_left']) &
+                    (df_motion_first_frame['x'] > df_motion_first_frame['extra_oline_box_left'] - 3)
+                ) |
+                (
+                    (df_motion_first_frame['x'] > df_motion_first_frame['extra_oline_box_right']) &
+                    (df_motion_first_frame['x'] < df_motion_first_frame['extra_oline_box_right'] + 3)
+                )
+            ),
+            'Off-Line Y',
+            None
+        )),
+        on='game_play_id',
+        how='left'
+    )
+
+    df_motion['motion_group'] = None
+    df_motion['motion_sub_group'] = None
+    _classify_yo_yo(df_motion)
+    df_motion = _classify_over(df_motion, df_tracking)
+    df_motion = _classify_crossing(df_motion, df_tracking)
+    _classify_glide(df_motion, df_tracking)
+    df_tracking = _off_line_y_alignment(df_tracking, df_motion)
+    df_motion = _classify_in(df_motion, df_tracking)
+    df_motion = _classify_shuffle(df_motion, df_tracking, df_play)
+
+    df_motion.loc[df_motion['motion_group'] == 'nan', 'motion_group'] = None
+    df_motion.loc[df_motion['motion_group'].notna(), 'motion_sub_group'] = 'Standard'
+    return df_motion
+
+def motion_plays(df_motion: pd.DataFrame) -> pd.DataFrame:
+    """One row per play of `classify_motion_frames`, with the distance traveled in motion pre-snap."""
+    motion_distances = _path_distance(df_motion.query('motion_frame')).rename('pre_snap_motion_dist_traveled')
+    return (
+        df_motion
+        .merge(motion_distances, on='game_play_id', how='left')
+        .drop_duplicates('game_play_id')
+        [[
+            'game_play_id', 'nfl_id', 'position_by_loc', 'had_rush_attempt', 'initial_alignment',
+            'n_direction_changes', 'same_motion_dir', 'motion_dir_first', 'motion_dir_last',
+            'pre_snap_motion_dist_traveled', 'motion_group', 'motion_sub_group'
+        ]]
+        .rename(columns={
+            'nfl_id': 'motion_nfl_id',
+            'position_by_loc': 'motion_position',
+            'had_rush_attempt': 'motion_had_rush_attempt'
+        })
+        .reset_index(drop=True)
+    )
+
+def classify_motion(
+        week: int,
+        tracking_final: tuple,
+        moving_threshold: float = motion.MOVING_THRESHOLD,
+        n_frames_not_moving: int = motion.N_FRAMES_NOT_MOVING,
+        speed_window_width: int | None = None
+    ) -> pd.DataFrame:
+    """The motion_plays.pkl table of a week, see `classify_motion_frames` and `motion_plays`."""
+    return motion_plays(classify_motion_frames(tracking_final, moving_threshold, n_frames_not_moving, speed_window_width))
+
+def drop_qb_rusher_plays(
+        week: int,
+        tables: tuple,
+        df_player: pd.DataFrame
+    ) -> tuple:
+    """Drop the plays where the QB is the ball carrier.
+
+    Args:
+        week: Week of the data.
+        tables: The tracking, play and player play data.
+        df_player: players.pkl of `write_season_data`.
+
+    Returns:
+        The tracking, play and player play data without the plays.
+    """
+    df_tracking, df_play, df_player_play = tables
+    gpids_with_qb_rusher = (
+        df_player_play
+        [['game_play_id', 'had_rush_attempt', 'nfl_id']]
+        .query('had_rush_attempt == 1')
+        .merge(df_player[['nfl_id', 'position']], on='nfl_id', how='left')
+        .query('position == "QB"')
+        ['game_play_id']
+        .unique()
+        .tolist()
+    )
+    if len(gpids_with_qb_rusher) != 0:
+        logger.info(f'Wk {week}: Dropping {len(gpids_with_qb_rusher)} plays with QB rusher')
+        df_tracking = df_tracking[~df_tracking['game_play_id'].isin(gpids_with_qb_rusher)]
+        df_play = df_play[~df_play['game_play_id'].isin(gpids_with_qb_rusher)]
+        df_player_play = df_player_play[~df_player_play['game_play_id'].isin(gpids_with_qb_rusher)]
+    return df_tracking, df_play, df_player_play
+
+def label_primary_rb(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Add the primary ball carrier candidate of each play (primary_rb and rb_pos).
+
+    The RB (then FB, WR, TE) closest to the QB in the 2s after the snap,
+    within a yard of the tackles and not ahead of the QB at the snap. The y
+    at the snap of the later frames is forward filled over the rows of the
+    play.
+    """
+    qb_xy = (
+        df_tracking
+        .query('position_by_loc == "QB"')
+        [['game_play_id', 'frame_id', 'x', 'y']]
+        .rename(columns={'x': 'qb_x', 'y': 'qb_y'})
+    )
+    oline_left_right = (
+        df_tracking
+        .query('position_by_loc.isin(["LT","RT"]) and frame_id == ball_snap_fid')
+        [['game_play_id', 'position_by_loc', 'x']]
+        .assign(oline_box_left=lambda x: np.where(x.position_by_loc == 'LT', x.x, np.nan))
+        .assign(oline_box_right=lambda x: np.where(x.position_by_loc == 'RT', x.x, np.nan))
+        .drop(columns=['position_by_loc', 'x'])
+    )
+    primary_rb_positions = list(PRIMARY_RB_POSITION_WEIGHTS)
+    primary_rb = (
+        df_tracking
+        .query('position_by_loc.isin(@primary_rb_positions) and ball_snap_fid <= frame_id <= ball_snap_fid + 20')
+        [['game_play_id', 'frame_id', 'ball_snap_fid', 'nfl_id', 'x', 'y', 'position_by_loc']]
+        .merge(qb_xy, on=['game_play_id', 'frame_id'], how='left')
+        .merge(oline_left_right[['game_play_id', 'oline_box_left']].query('oline_box_left.notnull()'), on='game_play_id', how='left')
+        .merge(oline_left_right[['game_play_id', 'oline_box_right']].query('oline_box_right.notnull()'), on='game_play_id', how='left')
+        .query('oline_box_left - 1 <= x <= oline_box_right + 1')
+        .assign(qb_y_at_snap=lambda x: np.where(x.frame_id == x.ball_snap_fid, x.qb_y, np.nan))
+        .assign(rb_y_at_snap=lambda x: np.where(x.frame_id == x.ball_snap_fid, x.y, np.nan))
+    )
+    filled = primary_rb.groupby('game_play_id').ffill()
+    primary_rb = (
+        filled
+        .assign(game_play_id=primary_rb['game_play_id'])
+        .query('rb_y_at_snap < qb_y_at_snap + 1')
+        .rename(columns={'position_by_loc': 'rb_pos'})
+    )
+    primary_rb['dist_to_qb'] = np.sqrt((primary_rb['x'] - primary_rb['qb_x'])**2 + (primary_rb['y'] - primary_rb['qb_y'])**2)
+    primary_rb['pos_weight'] = primary_rb['rb_pos'].map(PRIMARY_RB_POSITION_WEIGHTS)
+    primary_rb = (
+        primary_rb
+        .query('dist_to_qb <= 10')
+        .sort_values(['pos_weight', 'dist_to_qb'], kind='mergesort')
+        .drop_duplicates('game_play_id', keep='first')
+        .assign(primary_rb=True)
+    )
+    df_tracking = df_tracking.drop(columns=[col for col in ['primary_rb', 'rb_pos'] if col in df_tracking.columns])
+    df_tracking = df_tracking.merge(primary_rb[['game_play_id', 'nfl_id', 'primary_rb']], on=['game_play_id', 'nfl_id'], how='left')
+    df_tracking['primary_rb'] = df_tracking['primary_rb'].notna()
+    return df_tracking.merge(primary_rb[['game_play_id', 'rb_pos']], on='game_play_id', how='left')
+
+def drop_plays_without_primary_rb(week: int, tables: tuple) -> tuple:
+    """Drop the plays without a primary RB from the tracking, play and player play data."""
+    df_tracking, df_play, df_player_play = tables
+    drop_plays = (
+        df_tracking
+        .sort_values('primary_rb', ascending=False, kind='mergesort')
+        .drop_duplicates('game_play_id', keep='first')
+        .query('~primary_rb')
+        ['game_play_id']
+        .unique()
+        .tolist()
+    )
+    if len(drop_plays) != 0:
+        logger.info(f'Wk {week}: Dropping {len(drop_plays)} plays w/o a primary rb')
+        df_tracking = df_tracking[~df_tracking['game_play_id'].isin(drop_plays)]
+        df_play = df_play[~df_play['game_play_id'].isin(drop_plays)]
+        df_player_play = df_player_play[~df_player_play['game_play_id'].isin(drop_plays)]
+    return df_tracking, df_play, df_player_play
+
+def rb_direction(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Direction of the primary RB 1s to 2s after the snap, and the play direction.
+
+    Returns:
+        DataFrame with game_play_id, rb_dir_post_snap, play_dir ('right' below
+        90 degrees) and play_dir_location. Plays whose primary RB has no
+        frames 1s to 2s after the snap are left out.
+    """
+    # dir of the primary rb 1s to 2s after the snap, one snapshot per frame offset
+    rb_dir = features.SnapIndex(df_tracking, role_col='primary_rb').gather(
+        {f'dir_{offset}': ('dir', offset) for offset in RB_DIR_OFFSETS},
+        anchor='ball_snap_fid',
+        roles=[True]
+    )
+    rb_dirs = rb_dir[[f'dir_{offset}' for offset in RB_DIR_OFFSETS]].to_numpy()
+    # a primary rb without frames 1s to 2s after the snap has no direction, and its play is not mirrored
+    has_dir = ~np.isnan(rb_dirs).all(axis=1)
+    rb_dirs = rb_dirs[has_dir]
+    rb_dir = (
+        rb_dir.loc[has_dir, ['game_play_id']]
+        .assign(rb_dir_post_snap=np.nanmean(np.where(rb_dirs > 270, 0, rb_dirs), axis=1))
+        .groupby('game_play_id')
+        .mean()
+        .reset_index()
+    )
+    rb_dir['play_dir'] = np.where(rb_dir['rb_dir_post_snap'] < 90, 'right', 'left')
+    rb_dir['play_dir_location'] = np.select(
+        [
+            rb_dir['rb_dir_post_snap'] <= 45,
+            rb_dir['rb_dir_post_snap'] <= 85,
+            rb_dir['rb_dir_post_snap'] <= 95,
+            rb_dir['rb_dir_post_snap'] <= 135,
+        ],
+        ['outside-right', 'inside-right', 'middle', 'inside-left'],
+        default='outside-left'
+    )
+    return rb_dir
+
+def add_play_direction(
+        df_tracking: pd.DataFrame,
+        rb_dir: pd.DataFrame,
+        df_player_play: pd.DataFrame
+    ) -> pd.DataFrame:
+    """Keep the `TRACKING_COLUMNS`, and add play_dir, rb_dir_post_snap and had_rush_attempt."""
+    return (
+        df_tracking[TRACKING_COLUMNS]
+        .merge(rb_dir[['game_play_id', 'play_dir', 'rb_dir_post_snap']], on='game_play_id', how='left')
+        .merge(df_player_play[['game_play_id', 'nfl_id', 'had_rush_attempt']], on=['game_play_id', 'nfl_id'], how='left')
+    )
+
+def mirror_left_plays(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Mirror the plays run to the left across the field, so every play is run to the right."""
+    left = df_tracking['play_dir'] == 'left'
+    df_tracking['x'] = np.where(left, 160/3 - df_tracking['x'], df_tracking['x'])
+    df_tracking['ball_x'] = np.where(left, 160/3 - df_tracking['ball_x'], df_tracking['ball_x'])
+    for col in ['dir', 'rb_dir_post_snap', 'o']:
+        df_tracking[col] = np.where(left, (df_tracking[col] + 180) % 360, df_tracking[col])
+    df_tracking['position_by_loc'] = np.where(
+        left,
+        np.select(
+            [
+                df_tracking['position_by_loc'] == 'LT',
+                df_tracking['position_by_loc'] == 'LG',
+                df_tracking['position_by_loc'] == 'RG',
+                df_tracking['position_by_loc'] == 'RT'
+            ],
+            ['RT', 'RG', 'LG', 'LT'],
+            df_tracking['position_by_loc']
+        ),
+        df_tracking['position_by_loc']
+    )
+    return df_tracking
+
+def label_oline_at_snap(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Add the offensive line box at the snap, and the players on the line (on_oline).
+
+    The box of the 5 linemen at the snap is widened, one player at a time,
+    to the standing players lined up within `MAX_YARDS_NEXT_TO_OLINE` yards
+    of it, and at most `MAX_YARDS_BEHIND_OLINE` behind the deepest player of
+    the line on that side.
+    """
+    oline_at_snap = df_tracking[
+        (df_tracking['frame_id'] == df_tracking['ball_snap_fid']) &
+        df_tracking['position_by_loc'].isin(OLINE_LOCATIONS)
+    ]
+    df_tracking = (
+        df_tracking
+        .merge(oline_at_snap.groupby('game_play_id')['x'].min().rename('oline_x_left_at_snap'), on='game_play_id', how='left')
+        .merge(oline_at_snap.groupby('game_play_id')['x'].max().rename('oline_x_right_at_snap'), on='game_play_id', how='left')
+        .merge(
+            oline_at_snap[oline_at_snap['position_by_loc'].isin(['LT', 'LG', 'C'])].groupby('game_play_id')['y'].min().rename('oline_y_min_left_at_snap'),
+            on='game_play_id',
+            how='left'
+        )
+        .merge(
+            oline_at_snap[oline_at_snap['position_by_loc'].isin(['C', 'RG', 'RT'])].groupby('game_play_id')['y'].min().rename('oline_y_min_right_at_snap'),
+            on='game_play_id',
+            how='left'
+        )
+    )
+    center_at_snap = (
+        df_tracking
+        .query('frame_id == ball_snap_fid and position_by_loc == "C"')
+        [['game_play_id', 'x']]
+        .rename(columns={'x': 'center_x_at_snap'})
+    )
+    df_tracking = df_tracking.merge(center_at_snap, on='game_play_id', how='left')
+
+    # Label Extra Players acting as part of the OLine
+    df_tracking['extra_on_oline_x_left_at_snap'] = df_tracking['oline_x_left_at_snap']
+    df_tracking['extra_on_oline_x_right_at_snap'] = df_tracking['oline_x_right_at_snap']
+    df_tracking['extra_on_oline_y_min_left_at_snap'] = df_tracking['oline_y_min_left_at_snap']
+    df_tracking['extra_on_oline_y_min_right_at_snap'] = df_tracking['oline_y_min_right_at_snap']
+    df_tracking['on_oline'] = df_tracking['position_by_loc'].isin(OLINE_LOCATIONS)
+
+    # Loop until no new players are added to the oline
+    extra_on_oline = pd.DataFrame()
+    extra_on_oline_len = 1
+    while extra_on_oline_len != len(extra_on_oline):
+        extra_on_oline = df_tracking.query(
+            '(position_by_loc != "QB") and ~on_oline and offense and frame_id == ball_snap_fid'
+        )[[
+            'game_play_id', 'nfl_id', 'x', 'y', 's',
+            'extra_on_oline_y_min_left_at_snap', 'extra_on_oline_y_min_right_at_snap',
+            'extra_on_oline_x_left_at_snap', 'extra_on_oline_x_right_at_snap', 'on_oline'
+        ]].copy()
+        extra_on_oline_len = len(extra_on_oline)
+
+        extra_on_oline['on_oline'] = (extra_on_oline['s'] < MOVING_S_THRESHOLD) & (
+            (
+                (extra_on_oline['x'] < extra_on_oline['extra_on_oline_x_left_at_snap']) &
+                (extra_on_oline['x'] >= extra_on_oline['extra_on_oline_x_left_at_snap'] - MAX_YARDS_NEXT_TO_OLINE) &
+                (extra_on_oline['y'] >= extra_on_oline['extra_on_oline_y_min_left_at_snap'] - MAX_YARDS_BEHIND_OLINE)
+            ) |
+            (
+                (extra_on_oline['x'] > extra_on_oline['extra_on_oline_x_right_at_snap']) &
+                (extra_on_oline['x'] <= extra_on_oline['extra_on_oline_x_right_at_snap'] + MAX_YARDS_NEXT_TO_OLINE) &
+                (extra_on_oline['y'] >= extra_on_oline['extra_on_oline_y_min_right_at_snap'] - MAX_YARDS_BEHIND_OLINE)
+            )
+        )
+        new_on_oline = extra_on_oline[extra_on_oline['on_oline']]
+
+        # Update the oline box for the new players on the oline
+        x_left = df_tracking['game_play_id'].map(new_on_oline.groupby('game_play_id')['x'].min())
+        df_tracking['extra_on_oline_x_left_at_snap'] = np.where(
+            x_left.notnull() & (x_left < df_tracking['extra_on_oline_x_left_at_snap']),
+            x_left,
+            df_tracking['extra_on_oline_x_left_at_snap']
+        )
+        x_right = df_tracking['game_play_id'].map(new_on_oline.groupby('game_play_id')['x'].max())
+        df_tracking['extra_on_oline_x_right_at_snap'] = np.where(
+            x_right.notnull() & (x_right > df_tracking['extra_on_oline_x_right_at_snap']),
+            x_right,
+            df_tracking['extra_on_oline_x_right_at_snap']
+        )
+
+        # Update on_oline for the new players on the oline
+        df_tracking = df_tracking.merge(
+            new_on_oline[['game_play_id', 'nfl_id', 'on_oline']],
+            on=['game_play_id', 'nfl_id'],
+            how='left',
+            suffixes=('', '_new')
+        )
+        df_tracking['on_oline'] = df_tracking['on_oline_new'].notna() | df_tracking['on_oline']
+        df_tracking.drop(columns='on_oline_new', inplace=True)
+
+        # Deepest player of the line on each side, over the whole play
+        on_oline = df_tracking[df_tracking['on_oline']]
+        df_tracking['extra_on_oline_y_min_left_at_snap'] = df_tracking['game_play_id'].map(
+            on_oline[on_oline['x'] < on_oline['center_x_at_snap']].groupby('game_play_id')['y'].min()
+        )
+        df_tracking['extra_on_oline_y_min_right_at_snap'] = df_tracking['game_play_id'].map(
+            on_oline[on_oline['x'] > on_oline['center_x_at_snap']].groupby('game_play_id')['y'].min()
+        )
+        extra_on_oline = extra_on_oline[~extra_on_oline['on_oline']]
+    return df_tracking
+
+def add_oline_angles(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Add the movement of the offensive linemen in the first second after the snap."""
+    oline_cols = ['oline_x_at_snap', 'oline_y_at_snap', 'oline_x_1s_after_snap', 'oline_y_1s_after_snap']
+    oline_xy = features.SnapIndex(df_tracking).gather(
+        {
+            'oline_x_at_snap': ('x', 0),
+            'oline_y_at_snap': ('y', 0),
+            'oline_x_1s_after_snap': ('x', 10),
+            'oline_y_1s_after_snap': ('y', 10),
+        },
+        anchor='ball_snap_fid',
+        roles=OLINE_LOCATIONS
+    )
+    df_tracking = df_tracking.drop(columns=[col for col in oline_cols if col in df_tracking.columns])
+    df_tracking = df_tracking.merge(oline_xy[['game_play_id', 'nfl_id'] + oline_cols], on=['game_play_id', 'nfl_id'], how='left')
+
+    df_tracking['dy_oline_1s_after_snap'] = df_tracking['oline_y_1s_after_snap'] - df_tracking['oline_y_at_snap']
+    df_tracking['dx_oline_1s_after_snap'] = df_tracking['oline_x_1s_after_snap'] - df_tracking['oline_x_at_snap']
+    angle = np.degrees(np.arctan2(df_tracking['dy_oline_1s_after_snap'], df_tracking['dx_oline_1s_after_snap']))
+    df_tracking['oline_angle_1s_after_snap'] = np.where(angle < 0, 360 + angle, angle)
+    return df_tracking
+
+def label_pullers(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Flag the pulling players: they come from the backside and cross behind the center (or RT) behind the los.
+
+    Adds puller_left_of_center, puller_left_of_rt and puller_is_right_gaurd.
+    """
+    center_xy = (
+        df_tracking
+        .query('position_by_loc == "C" and ball_snap_fid <= frame_id <= ball_snap_fid + 20')
+        [['game_play_id', 'frame_id', 'x', 'y']]
+        .rename(columns={'x': 'center_x', 'y': 'center_y'})
+    )
+    rt_xy = (
+        df_tracking
+        .query('position_by_loc == "RT" and ball_snap_fid <= frame_id <= ball_snap_fid + 20')
+        [['game_play_id', 'frame_id', 'x', 'y']]
+        .rename(columns={'x': 'rt_x', 'y': 'rt_y'})
+    )
+    # x of every player at the snap and 2s after it
+    x_snap = features.SnapIndex(df_tracking).gather(
+        {'x_at_snap': ('x', 0), 'x_2s_after_snap': ('x', 20)},
+        anchor='ball_snap_fid'
+    )
+    rt_x_at_snap = (
+        x_snap
+        .query('position_by_loc == "RT"')
+        [['game_play_id', 'x_at_snap']]
+        .rename(columns={'x_at_snap': 'rt_x_at_snap'})
+    )
+    x_snap = x_snap[['game_play_id', 'nfl_id', 'x_at_snap', 'x_2s_after_snap']]
+    cols = [
+        'game_play_id', 'frame_id', 'nfl_id', 'x', 'y', 'position_by_loc', 'ball_snap_fid', 'on_oline',
+        'center_x_at_snap', 'absolute_yardline_number'
+    ]
+    players = (
+        df_tracking[cols]
+        .merge(x_snap, on=['game_play_id', 'nfl_id'], how='left')
+        .assign(dx=lambda x: x.x_2s_after_snap - x.x_at_snap)
+    )
+    pullers = {
+        'puller_left_of_center': (
+            players
+            .query('on_oline and x_at_snap < center_x_at_snap and ball_snap_fid <= frame_id <= ball_snap_fid + 20 ' +
+                   'and ~position_by_loc.isin(["C","RG","RT"]) and y < absolute_yardline_number')
+            .merge(center_xy, on=['game_play_id', 'frame_id'], how='left')
+            .query('x > center_x and y < center_y and dx > 1')
+        ),
+        'puller_left_of_rt': (
+            players
+            .merge(rt_x_at_snap, on='game_play_id', how='left')
+            .query('on_oline and x_at_snap < rt_x_at_snap and ball_snap_fid <= frame_id <= ball_snap_fid + 30 ' +
+                   'and ~position_by_loc.isin(["RT"]) and y < absolute_yardline_number')
+            .merge(rt_xy, on=['game_play_id', 'frame_id'], how='left')
+            .query('x > rt_x and y < rt_y and dx > 1')
+        ),
+        'puller_is_right_gaurd': (
+            players
+            .query('ball_snap_fid <= frame_id <= ball_snap_fid + 20 ' +
+                   'and position_by_loc.isin(["RG"]) and y < absolute_yardline_number')
+            .merge(rt_xy, on=['game_play_id', 'frame_id'], how='left')
+            .query('x > rt_x and y < rt_y and dx > 1')
+        ),
+    }
+    for col, puller in pullers.items():
+        puller = puller.drop_duplicates(['game_play_id', 'nfl_id'], keep='first')[['game_play_id', 'nfl_id']].assign(**{col: True})
+        df_tracking = df_tracking.drop(columns=[col], errors='ignore').merge(puller, on=['game_play_id', 'nfl_id'], how='left')
+        df_tracking[col] = df_tracking[col].notna()
+    return df_tracking
+
+def run_concept_table(
+        df_tracking: pd.DataFrame,
+        df_play: pd.DataFrame,
+        rb_dir: pd.DataFrame
+    ) -> pd.DataFrame:
+    """Features to classify the run concept, one row per play with a viable run concept.
+
+    Args:
+        df_tracking: Tracking data of `label_pullers`.
+        df_play: Play data.
+        rb_dir: Output of `rb_direction`.
+    """
+    df_run_concept = (
+        df_play[['game_play_id', 'offense_formation', 'pff_run_concept_primary']]
+        .rename(columns={'pff_run_concept_primary': 'run_concept'})
+        .merge(df_tracking[['game_play_id', 'rb_dir_post_snap']].drop_duplicates('game_play_id'), on='game_play_id', how='left')
+    )
+    df_run_concept = df_run_concept[df_run_concept['run_concept'].isin(VIABLE_RUN_CONCEPTS)]
+
+    # Offensive line movement, over the rows of the linemen
+    all_oline = df_tracking[df_tracking['position_by_loc'].isin(OLINE_LOCATIONS)].groupby('game_play_id')
+    rightmost_oline = df_tracking[df_tracking['position_by_loc'].isin(['LG', 'C', 'RG', 'RT'])].groupby('game_play_id')
+    oline_features = [
+        all_oline['oline_angle_1s_after_snap'].mean().rename('avg_oline_angle_1s_after_snap'),
+        all_oline['oline_angle_1s_after_snap'].var().rename('var_oline_angle_1s_after_snap'),
+        rightmost_oline['oline_angle_1s_after_snap'].mean().rename('avg_oline_angle_1s_after_snap_4_rightmost_oline'),
+        rightmost_oline['oline_angle_1s_after_snap'].var().rename('var_oline_angle_1s_after_snap_4_rightmost_oline'),
+        all_oline['dx_oline_1s_after_snap'].mean().rename('avg_oline_dx_1s_after_snap'),
+    ]
+    for feature in oline_features:
+        df_run_concept = df_run_concept.merge(feature, on='game_play_id', how='left')
+
+    # Pullers
+    n_pullers = lambda col: (
+        df_tracking[df_tracking[col]]
+        .drop_duplicates(['game_play_id', 'nfl_id'])
+        .groupby('game_play_id')[col]
+        .sum()
+    )
+    puller_behind_los_3s_after_snap = (
+        df_tracking
+        .query('frame_id == ball_snap_fid + 30 and ' +
+               '(puller_left_of_rt or puller_left_of_center or puller_is_right_gaurd) and ' +
+               'y < absolute_yardline_number')
+        .groupby('game_play_id')['nfl_id']
+        .count()
+    )
+    puller_counts = {
+        'n_pullers_left_of_center': n_pullers('puller_left_of_center'),
+        'right_gaurd_pulls': n_pullers('puller_is_right_gaurd'),
+        'n_puller_behind_los_3s_after_snap': puller_behind_los_3s_after_snap,
+    }
+    for col, counts in puller_counts.items():
+        df_run_concept = df_run_concept.merge(counts.rename(col), on='game_play_id', how='left')
+        df_run_concept[col] = df_run_concept[col].fillna(0)
+
+    # One hot encode offense formation
+    for col, formation in OFFENSE_FORMATIONS.items():
+        df_run_concept[col] = np.where(df_run_concept['offense_formation'] == formation, 1, 0)
+    df_run_concept = df_run_concept.drop(columns=['offense_formation'])
+
+    # move run_concept to the end
+    cols = df_run_concept.columns.tolist()
+    cols.remove('run_concept')
+    return df_run_concept[cols + ['run_concept']].merge(
+        rb_dir[['game_play_id', 'play_dir', 'play_dir_location']], on='game_play_id', how='left'
+    )
+
+def run_concept_features(
+        week: int,
+        tracking_final: tuple,
+        players_path: str
+    ) -> pd.DataFrame:
+    """Features to classify the run concept of each play (notebook 04).
+
+    Plays with a QB ball carrier or without a primary RB are dropped. Plays
+    are mirrored so the primary RB runs to the right, and the movement of
+    the offensive line and the pullers after the snap are summarized.
+
+    Args:
+        week: Week of the data.
+        tracking_final: Output of `finalize_tracking`.
+        players_path: players.pkl of `write_season_data`.
+
+    Returns:
+        The run_concept.pkl table of the week, see `run_concept_table`.
+    """
+    df_tracking, df_play, _, df_player_play = tracking_final
+    df_player = pd.read_pickle(players_path)
+
+    tables = drop_qb_rusher_plays(week, (df_tracking, df_play, df_player_play), df_player)
+    tables = (label_primary_rb(tables[0]), *tables[1:])
+    df_tracking, df_play, df_player_play = drop_plays_without_primary_rb(week, tables)
+
+    rb_dir = rb_direction(df_tracking)
+    df_tracking = mirror_left_plays(add_play_direction(df_tracking, rb_dir, df_player_play))
+    df_tracking = label_oline_at_snap(df_tracking)
+    df_tracking = add_oline_angles(df_tracking)
+    df_tracking = label_pullers(df_tracking)
+    return run_concept_table(df_tracking, df_play, rb_dir)
@@ -0,0 +1,269 @@
+import os
+import shutil
+from os.path import join
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+import util
+import schema
+
+CATEGORICAL_COLUMNS = schema.CATEGORICAL_COLUMNS
+PARTITION_SCHEMA = pa.schema([('week', pa.int64()), ('game_id', pa.int64())])
+TRACKING_DTYPES = schema.RAW_TRACKING_DTYPES
+
+def _partitioning() -> ds.Partitioning:
+    return ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+
+def _filesystem() -> pafs.LocalFileSystem:
+    # Memory-map files so uncompressed Arrow IPC columns are read zero-copy
+    return pafs.LocalFileSystem(use_mmap=True)
+
+def _write_dataset(
+        df_tracking: pd.DataFrame,
+        store_path: str,
+        file_format: str,
+        existing_data_behavior: str,
+        basename: str = 'part'
+    ) -> None:
+    if file_format not in ['ipc', 'parquet']:
+        raise ValueError("Invalid file_format. Must be one of 'ipc' or 'parquet'.")
+
+    df_tracking = df_tracking.sort_values(['game_id', 'play_id', 'frame_id'], kind='mergesort')
+    for col in CATEGORICAL_COLUMNS:
+        if col in df_tracking.columns and not isinstance(df_tracking[col].dtype, pd.CategoricalDtype):
+            df_tracking[col] = df_tracking[col].astype('category')
+
+    table = pa.Table.from_pandas(df_tracking, preserve_index=False)
+    ds.write_dataset(
+        table,
+        store_path,
+        format=file_format,
+        partitioning=_partitioning(),
+        existing_data_behavior=existing_data_behavior,
+        basename_template=basename + '-{i}.' + ('arrow' if file_format == 'ipc' else 'parquet'),
+        filesystem=_filesystem()
+    )
+
+def write_tracking_store(
+        df_tracking: pd.DataFrame,
+        store_path: str,
+        file_format: str = 'ipc'
+    ) -> None:
+    """Write tracking data to a columnar store partitioned by week and game.
+
+    Each game is written to its own file under `week=<wk>/game_id=<id>/`,
+    sorted by play and frame. String columns in `CATEGORICAL_COLUMNS` are
+    stored dictionary encoded and read back as categoricals.
+
+    Args:
+        df_tracking: The tracking data. Must have week and game_id columns.
+        store_path: Root directory of the store.
+        file_format: 'ipc' (uncompressed Arrow IPC, memory-mappable) or
+            'parquet'. Defaults to 'ipc'.
+    """
+    _write_dataset(df_tracking, store_path, file_format, existing_data_behavior='delete_matching')
+
+def _complete_games(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Re-chunk tracking data so a game is not split across chunks.
+
+    Rows of the last game of each chunk are held back and prepended to the
+    next chunk, which assumes the file is grouped by game (as the raw files
+    are). A game that is not contiguous is written in several pieces.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            carry = None
+            continue
+        is_last_game = (chunk['game_id'] == chunk['game_id'].iat[-1]).to_numpy()
+        carry = chunk[is_last_game]
+        if not is_last_game.all():
+            yield chunk[~is_last_game]
+    if carry is not None and not carry.empty:
+        yield carry
+
+def ingest_tracking_csv(
+        csv_path: str,
+        store_path: str,
+        week: int,
+        plays: Optional[pd.DataFrame] = None,
+        standardize: bool = False,
+        chunksize: int = 1_000_000,
+        file_format: str = 'ipc'
+    ) -> pd.DataFrame:
+    """Stream a raw tracking CSV into the columnar store.
+
+    The file is read `chunksize` rows at a time with explicit dtypes and the
+    column names uncamelcased once from the header. Each chunk is filtered
+    to the wanted plays with a hash lookup of packed (game_id, play_id) keys,
+    optionally standardized, and written to the store, so peak memory is
+    bounded by the chunk size rather than the size of the week. Existing
+    data of the week is replaced.
+
+    Args:
+        csv_path: Path of a raw tracking_week_{wk}.csv file.
+        store_path: Root directory of the store.
+        week: Week of the file.
+        plays: Plays to keep, with game_id and play_id columns. Defaults to
+            None (all plays).
+        standardize: Standardize the direction of the tracking data, see
+            `util.standardize_direction_chunks`. Defaults to False.
+        chunksize: Number of rows read at a time. Defaults to 1,000,000.
+        file_format: Format of the store. Defaults to 'ipc'.
+
+    Returns:
+        The direction of each ingested play (game_id, play_id and
+        play_direction), to standardize the play data with
+        `util.standardize_play_direction`.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    names = util.uncamelcase_columns(pd.DataFrame(columns=header)).columns.tolist()
+    reader = pd.read_csv(
+        csv_path,
+        header=0,
+        names=names,
+        dtype={col: dtype for col, dtype in TRACKING_DTYPES.items() if col in names},
+        chunksize=chunksize
+    )
+
+    wanted = None
+    if plays is not None:
+        wanted = pd.Index(np.unique(schema.game_play_key(plays['game_id'], plays['play_id'])))
+
+    def filtered_chunks():
+        for chunk in reader:
+            if wanted is not None:
+                keep = wanted.get_indexer(schema.game_play_key(chunk['game_id'], chunk['play_id'])) >= 0
+                chunk = chunk[keep]
+            if 'week' not in chunk.columns:
+                chunk.insert(3, 'week', week)
+            yield chunk
+
+    week_path = join(store_path, f'week={week}')
+    if os.path.isdir(week_path):
+        shutil.rmtree(week_path)
+
+    play_directions = []
+    for i, chunk in enumerate(_complete_games(filtered_chunks())):
+        if standardize:
+            chunk, df_play_direction = next(util.standardize_direction_chunks([chunk]))
+        else:
+            df_play_direction = util.play_direction_table(chunk)
+        play_directions.append(df_play_direction)
+        _write_dataset(chunk, store_path, file_format,
+                       existing_data_behavior='overwrite_or_ignore', basename=f'part-{i:05d}')
+
+    if not play_directions:
+        return pd.DataFrame(columns=['game_id', 'play_id', 'play_direction'])
+    return pd.concat(play_directions, ignore_index=True)
+
+def convert_raw_tracking(
+        raw_data_path: str,
+        store_path: str,
+        weeks: List[int] = range(1, 10),
+        file_format: str = 'ipc',
+        plays: Optional[pd.DataFrame] = None,
+        standardize: bool = False,
+        chunksize: int = 1_000_000
+    ) -> None:
+    """Convert the raw tracking_week_{wk}.csv files to the columnar store.
+
+    Columns are uncamelcased once here, so loads from the store do not need
+    `util.uncamelcase_columns`. Files are streamed in chunks, see
+    `ingest_tracking_csv`.
+    """
+    for wk in weeks:
+        ingest_tracking_csv(
+            join(raw_data_path, f'tracking_week_{wk}.csv'),
+            store_path,
+            week=wk,
+            plays=plays,
+            standardize=standardize,
+            chunksize=chunksize,
+            file_format=file_format
+        )
+
+def tracking_dataset(
+        store_path: str,
+        file_format: str = 'ipc'
+    ) -> ds.Dataset:
+    """Open the columnar store as a (lazy) pyarrow dataset."""
+    return ds.dataset(
+        store_path,
+        format=file_format,
+        partitioning=_partitioning(),
+        filesystem=_filesystem()
+    )
+
+def load_tracking(
+        store_path: str,
+        weeks: Optional[List[int]] = None,
+        game_ids: Optional[List[int]] = None,
+        play_ids: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+        file_format: str = 'ipc',
+        compact: bool = True
+    ) -> pd.DataFrame:
+    """Load tracking data from the columnar store.
+
+    Filters on week and game_id prune whole partitions before any file is
+    opened, and the play_id filter is applied while scanning, so only the
+    requested rows and columns are materialized.
+
+    Args:
+        store_path: Root directory of the store.
+        weeks: Weeks to load. Defaults to None (all weeks).
+        game_ids: Games to load. Defaults to None (all games).
+        play_ids: Plays to load. Defaults to None (all plays).
+        columns: Columns to load. Defaults to None (all columns).
+        file_format: Format of the store. Defaults to 'ipc'.
+        compact: Convert to the compact dtypes of `schema.apply_schema`.
+            Defaults to True.
+
+    Returns:
+        The tracking data. Rows of each game are sorted by play and frame.
+    """
+    filters = []
+    if weeks is not None:
+        filters.append(ds.field('week').isin(list(weeks)))
+    if game_ids is not None:
+        filters.append(ds.field('game_id').isin(list(game_ids)))
+    if play_ids is not None:
+        filters.append(ds.field('play_id').isin(list(play_ids)))
+
+    expression = None
+    for f in filters:
+        expression = f if expression is None else expression & f
+
+    table = tracking_dataset(store_path, file_format).to_table(columns=columns, filter=expression)
+    df_tracking = table.to_pandas()
+    return schema.apply_schema(df_tracking) if compact else df_tracking
+
+def load_play(
+        store_path: str,
+        game_id: int,
+        play_id: int,
+        week: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        file_format: str = 'ipc'
+    ) -> pd.DataFrame:
+    """Load the tracking data of a single play from the columnar store."""
+    return load_tracking(
+        store_path,
+        weeks=None if week is None else [week],
+        game_ids=[game_id],
+        play_ids=[play_id],
+        columns=columns,
+        file_format=file_format
+    )
+
+def week_exists(store_path: str, week: int) -> bool:
+    """Check if a week has been written to the columnar store."""
+    return os.path.isdir(join(store_path, f'week={week}'))
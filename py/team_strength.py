@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+def design_matrix(
+        data: pd.DataFrame,
+        teams: list,
+        off_col: str = 'posteam',
+        def_col: str = 'defteam'
+    ) -> sp.csr_matrix:
+    """Sparse design matrix of offensive and defensive strengths.
+
+    Row k predicts game k as `off_str[posteam] - def_str[defteam]`, so it has
+    +1 in the offense column of posteam and -1 in the defense column of
+    defteam.
+
+    Args:
+        data: One row per game and offense.
+        teams: Teams in column order.
+        off_col: Column with the offensive team. Defaults to 'posteam'.
+        def_col: Column with the defensive team. Defaults to 'defteam'.
+
+    Returns:
+        (len(data), 2 * len(teams)) matrix, offense columns first.
+    """
+    team_idx = pd.Index(teams)
+    n_rows, n_teams = len(data), len(teams)
+    off_idx = team_idx.get_indexer(data[off_col])
+    def_idx = team_idx.get_indexer(data[def_col])
+    if (off_idx < 0).any() or (def_idx < 0).any():
+        raise ValueError("All teams in the data must be in teams.")
+
+    rows = np.repeat(np.arange(n_rows), 2)
+    cols = np.column_stack([off_idx, n_teams + def_idx]).ravel()
+    values = np.tile([1., -1.], n_rows)
+    return sp.csr_matrix((values, (rows, cols)), shape=(n_rows, 2 * n_teams))
+
+def _solve(gram: np.ndarray, rhs: np.ndarray, n_teams: int) -> np.ndarray:
+    """Least squares with sum-to-zero offense and defense, from its KKT system."""
+    constraints = np.zeros((2, 2 * n_teams))
+    constraints[0, :n_teams] = 1
+    constraints[1, n_teams:] = 1
+    kkt = np.block([
+        [gram, constraints.T],
+        [constraints, np.zeros((2, 2))]
+    ])
+    # lstsq also handles teams that are not identified (e.g. only on defense)
+    solution = np.linalg.lstsq(kkt, np.concatenate([rhs, np.zeros(2)]), rcond=None)[0]
+    return solution[:2 * n_teams]
+
+def fit_team_strengths(
+        data: pd.DataFrame,
+        week: int,
+        prev_weeks: int = 10,
+        target_col: str = 'epa_per_rush',
+        week_col: str = 'wk_idx'
+    ) -> pd.DataFrame:
+    """Fit offensive and defensive strengths on the weeks before `week`.
+
+    Minimizes the squared error of `off_str[posteam] - def_str[defteam]`
+    against the target over weeks `week - prev_weeks` to `week - 1`, with
+    the offensive and defensive strengths each summing to zero. The
+    constrained least squares is solved in closed form.
+
+    Args:
+        data: One row per game and offense with posteam, defteam, week and
+            target columns.
+        week: The week to fit strengths for.
+        prev_weeks: Number of previous weeks used. Defaults to 10.
+        target_col: Column with the target. Defaults to 'epa_per_rush'.
+        week_col: Column with the week. Defaults to 'wk_idx'.
+
+    Returns:
+        DataFrame with team, off_str and def_str columns.
+    """
+    return fit_team_strengths_rolling(data, [week], prev_weeks, target_col, week_col)[week]
+
+def fit_team_strengths_rolling(
+        data: pd.DataFrame,
+        weeks: list,
+        prev_weeks: int = 10,
+        target_col: str = 'epa_per_rush',
+        week_col: str = 'wk_idx'
+    ) -> dict:
+    """Fit team strengths for several weeks in one call.
+
+    The normal equations of each week are computed once from a sparse design
+    matrix of all games and summed over each rolling window with prefix
+    sums, so every window is a single (2 * n_teams)-sized solve. See
+    `fit_team_strengths`.
+
+    Returns:
+        Dictionary mapping each week to its DataFrame of team, off_str and
+        def_str.
+    """
+    teams = sorted(set(data['posteam']).union(data['defteam']))
+    n_teams = len(teams)
+    X = design_matrix(data, teams)
+    y = data[target_col].to_numpy(dtype=float)
+    data_weeks = data[week_col].to_numpy()
+
+    # Prefix sums over weeks of X'X and X'y
+    all_weeks = np.unique(np.concatenate([data_weeks, np.asarray(weeks)]))
+    week_pos = np.searchsorted(all_weeks, data_weeks)
+    grams = np.zeros((len(all_weeks) + 1, 2 * n_teams, 2 * n_teams))
+    rhs = np.zeros((len(all_weeks) + 1, 2 * n_teams))
+    for pos in np.unique(week_pos):
+        X_week = X[week_pos == pos]
+        grams[pos + 1] = (X_week.T @ X_week).toarray()
+        rhs[pos + 1] = X_week.T @ y[week_pos == pos]
+    grams = np.cumsum(grams, axis=0)
+    rhs = np.cumsum(rhs, axis=0)
+
+    # Games on either side of each team, to know which teams played
+    games = np.abs(X).T @ sp.csr_matrix(
+        (np.ones(len(data)), (np.arange(len(data)), week_pos)),
+        shape=(len(data), len(all_weeks))
+    )
+    games = np.concatenate([np.zeros((2 * n_teams, 1)), np.cumsum(games.toarray(), axis=1)], axis=1)
+
+    results = {}
+    for week in weeks:
+        lo = np.searchsorted(all_weeks, week - prev_weeks)
+        hi = np.searchsorted(all_weeks, week)
+        played = (games[:n_teams, hi] - games[:n_teams, lo] + games[n_teams:, hi] - games[n_teams:, lo]) > 0
+        if not played.any():
+            raise ValueError(f"No games in the {prev_weeks} weeks before week {week}.")
+
+        cols = np.concatenate([played, played])
+        strengths = _solve(
+            (grams[hi] - grams[lo])[np.ix_(cols, cols)],
+            (rhs[hi] - rhs[lo])[cols],
+            int(played.sum())
+        )
+        results[week] = pd.DataFrame({
+            'team': np.asarray(teams)[played],
+            'off_str': strengths[:played.sum()],
+            'def_str': strengths[played.sum():],
+        })
+    return results
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import features
+
+def _tracking(n_frames: int = 20, ball_snap_fid: int = 5) -> pd.DataFrame:
+    """Two players and the football of one play, shuffled."""
+    frames = np.arange(1, n_frames + 1)
+    df = pd.concat([
+        pd.DataFrame({
+            'nfl_id': nfl_id,
+            'position_by_loc': position,
+            'frame_id': frames,
+            'x': x0 + frames,
+        })
+        for nfl_id, position, x0 in [(1., 'QB', 10.), (2., 'RB', 20.), (np.nan, None, 30.)]
+    ], ignore_index=True)
+    df['game_play_id'] = '2022091100_55'
+    df['ball_snap_fid'] = ball_snap_fid
+    return df.sample(frac=1, random_state=0)
+
+def test_football_is_one_segment_per_play():
+    df = _tracking()
+    snap_index = features.SnapIndex(df)
+    assert len(snap_index) == 3
+
+    df_features = snap_index.gather({'x_at_snap': ('x', 0), 'x_mean': ('x', (0, 2), 'mean')})
+    ball = df_features[df_features['nfl_id'].isna()]
+    assert len(ball) == 1
+    assert ball['x_at_snap'].iloc[0] == 35.
+    assert ball['x_mean'].iloc[0] == 36.
@@ -0,0 +1,247 @@
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import motion
+import stages
+
+PLAYERS = [  # nfl_id, display_name, position, club, x, y
+    (1, 'LT', 'T', 'A', 22.0, 49.0), (2, 'LG', 'G', 'A', 23.5, 49.0), (3, 'C', 'C', 'A', 25.0, 49.2),
+    (4, 'RG', 'G', 'A', 26.5, 49.0), (5, 'RT', 'T', 'A', 28.0, 49.0), (6, 'QB', 'QB', 'A', 25.0, 45.0),
+    (7, 'RB', 'RB', 'A', 25.2, 43.0), (8, 'TE', 'TE', 'A', 29.5, 49.0), (9, 'WR1', 'WR', 'A', 10.0, 47.0),
+    (10, 'WR2', 'WR', 'A', 45.0, 49.0), (11, 'WR3', 'WR', 'A', 5.0, 49.0), (12, 'QB2', 'QB', 'A', 40.0, 47.0),
+    (20, 'D1', 'DE', 'B', 22.0, 52.0), (21, 'D2', 'DT', 'B', 25.0, 52.0), (22, 'D3', 'LB', 'B', 28.0, 54.0),
+]
+BALL_SNAP_FID = 40
+
+def _play(game_id: int, play_id: int, rb_dir: float, motion: bool = False, pull: bool = False, two_qbs: bool = False) -> pd.DataFrame:
+    """80 frames of a standardized run play, snapped at frame 40 from the 50.
+
+    The offense shuffles in place and comes set after the first second. With
+    `motion` WR1 runs in jet motion from frame 30, with `pull` the LG pulls
+    right after the snap, and with `two_qbs` WR3 is replaced by a second QB.
+    """
+    rows = []
+    for nfl_id, name, position, club, x, y in PLAYERS:
+        if nfl_id == 12 and not two_qbs or nfl_id == 11 and two_qbs:
+            continue
+        for frame_id in range(1, 81):
+            # shuffle in place until the line is set
+            dx, dy = 0., (0.2 if frame_id % 2 else -0.2) if frame_id <= 10 else 0.
+            if motion and nfl_id == 9 and frame_id >= 30:
+                dx, dy = 0.7, 0.
+            if frame_id > BALL_SNAP_FID and club == 'A':
+                if pull and nfl_id == 2:
+                    dx, dy = 0.4, -0.05
+                elif nfl_id <= 5:
+                    dx, dy = 0.05 * np.sign(90 - rb_dir), 0.15
+                elif nfl_id == 7:
+                    dx, dy = 0.5 * np.cos(np.radians(rb_dir)), 0.5 * np.sin(np.radians(rb_dir))
+            x, y = x + dx, y + dy
+            s = 10 * np.hypot(dx, dy)
+            direction = np.degrees(np.arctan2(dy, dx)) % 360 if s > 0 else 0.
+            rows.append((nfl_id, name, position, club, frame_id, x, y, s, s / 10, direction))
+    rows += [(np.nan, 'football', None, 'football', frame_id, 25.0, 49.5, 0., 0., 0.) for frame_id in range(1, 81)]
+    df = pd.DataFrame(rows, columns=['nfl_id', 'display_name', 'position', 'club', 'frame_id', 'x', 'y', 's', 'dis', 'dir'])
+    df.insert(0, 'game_id', game_id)
+    df.insert(1, 'play_id', play_id)
+    df['frame_type'] = np.select(
+        [df['frame_id'] < BALL_SNAP_FID, df['frame_id'] == BALL_SNAP_FID],
+        ['BEFORE_SNAP', 'SNAP'],
+        default='AFTER_SNAP'
+    )
+    df['a'] = 0.
+    df['o'] = df['dir']
+    return df
+
+def _week() -> tuple:
+    """A week of tracking data as written by `stages.filter_run_plays`, and the players.
+
+    2022091100_100 is a jet motion with a pulling LG run to the right,
+    2022091100_200 a run to the left without motion and 2022091101_100 has
+    two QBs.
+    """
+    df_tracking = pd.concat([
+        _play(2022091100, 100, rb_dir=45., motion=True, pull=True),
+        _play(2022091100, 200, rb_dir=135.),
+        _play(2022091101, 100, rb_dir=45., two_qbs=True),
+    ], ignore_index=True)
+    df_tracking.insert(2, 'game_play_id', stages._game_play_id(df_tracking))
+    df_tracking['week'] = 1
+    df_tracking['time'] = '2022-09-11 13:00:00'
+    df_tracking['jersey_number'] = 1
+    df_tracking['play_direction'] = 'right'
+    df_tracking['event'] = None
+    df_tracking['absolute_yardline_number'] = 50.
+    df_tracking['yards_to_go'] = 10
+    df_tracking['offense'] = df_tracking['club'] == 'A'
+    df_tracking['defense'] = df_tracking['club'] == 'B'
+    ball = df_tracking.loc[df_tracking['club'] == 'football', ['game_play_id', 'frame_id', 'x', 'y']]
+    df_tracking = df_tracking.merge(ball.rename(columns={'x': 'ball_x', 'y': 'ball_y'}), on=['game_play_id', 'frame_id'])
+    df_tracking['euclidean_dist_to_ball'] = np.hypot(df_tracking['x'] - df_tracking['ball_x'], df_tracking['y'] - df_tracking['ball_y'])
+    df_tracking['lateral_dist_to_ball'] = df_tracking['x'] - df_tracking['ball_x']
+    df_tracking['vertical_dist_to_ball'] = df_tracking['y'] - df_tracking['ball_y']
+
+    df_play = df_tracking[['game_id', 'play_id', 'game_play_id']].drop_duplicates().reset_index(drop=True)
+    df_play['offense_formation'] = ['SHOTGUN', 'SINGLEBACK', 'SHOTGUN']
+    df_play['pff_run_concept_primary'] = ['OUTSIDE ZONE', 'POWER', 'MAN']
+    df_play['absolute_yardline_number'] = 50.
+    df_game = pd.DataFrame({'game_id': [2022091100, 2022091101], 'week': 1})
+    df_player_play = df_tracking.loc[df_tracking['nfl_id'].notna(), ['game_id', 'play_id', 'game_play_id', 'nfl_id']].drop_duplicates()
+    df_player_play['had_rush_attempt'] = (df_player_play['nfl_id'] == 7).astype(int)
+    df_player = pd.DataFrame(
+        [(nfl_id, position, name) for nfl_id, name, position, *_ in PLAYERS],
+        columns=['nfl_id', 'position', 'display_name']
+    )
+    return (df_tracking, df_play, df_game, df_player_play), df_player
+
+def _camelcase(col: str) -> str:
+    head, *tail = col.split('_')
+    return head + ''.join(word.title() for word in tail)
+
+def _tracking_final(tmp_path) -> tuple:
+    tracking, df_player = _week()
+    players_path = str(tmp_path / 'players.pkl')
+    df_player.to_pickle(players_path)
+    return stages.finalize_tracking(1, tracking, players_path), players_path
+
+def test_filter_run_plays_keeps_the_run_plays(tmp_path):
+    (df_tracking, df_play, df_game, df_player_play), df_player = _week()
+
+    # raw tracking data is camelcased, and moves along x
+    raw = (
+        df_tracking[['game_id', 'play_id', 'nfl_id', 'display_name', 'frame_id', 'frame_type', 'time', 'jersey_number',
+                     'club', 'play_direction', 'x', 'y', 's', 'a', 'dis', 'o', 'dir', 'event']]
+        .assign(x=df_tracking['y'], y=53.3 - df_tracking['x'], o=(180 - df_tracking['o']) % 360, dir=(180 - df_tracking['dir']) % 360)
+    )
+    raw.columns = [_camelcase(col) for col in raw.columns]
+    raw.to_csv(tmp_path / 'tracking_week_1.csv', index=False)
+    pd.DataFrame({
+        'gameId': df_play['game_id'],
+        'playId': df_play['play_id'],
+        'possessionTeam': 'A',
+        'absoluteYardlineNumber': 50,
+        'yardsToGo': 10,
+        'playNullifiedByPenalty': 'N',
+        'penaltyYards': np.nan,
+        'playDescription': ['R.Back left end', 'R.Back up the middle', 'R.Back right tackle'],
+        'offenseFormation': df_play['offense_formation'],
+        'pffRunConceptPrimary': df_play['pff_run_concept_primary'],
+    }).to_csv(tmp_path / 'plays.csv', index=False)
+    pd.DataFrame({'gameId': df_game['game_id'], 'week': 1}).to_csv(tmp_path / 'games.csv', index=False)
+    (
+        df_player_play.drop(columns='game_play_id')
+        .rename(columns=_camelcase)
+        .to_csv(tmp_path / 'player_play.csv', index=False)
+    )
+    df_player.rename(columns=_camelcase).to_csv(tmp_path / 'players.csv', index=False)
+
+    # 2022091101_100 is not a designed run
+    run_plays_path = str(tmp_path / 'run_plays.pkl')
+    pd.DataFrame({
+        'game_id': [2022091100, 2022091100],
+        'play_id': [100, 200],
+        'run_location': ['left', 'middle'],
+        'offense_personnel': '1 RB, 1 TE, 3 WR',
+        'defenders_in_box': 7.,
+        'defense_personnel': '4 DL, 2 LB, 5 DB',
+    }).to_pickle(run_plays_path)
+
+    df_tracking, df_play, df_game, df_player_play = stages.filter_run_plays(
+        1, str(tmp_path), str(tmp_path / 'tracking_store'), run_plays_path
+    )
+
+    assert sorted(df_tracking['game_play_id'].unique()) == ['2022091100_100', '2022091100_200']
+    assert df_play['run_location_desc'].tolist() == ['left_end', 'middle']
+    assert df_game['game_id'].tolist() == [2022091100]
+    assert set(df_player_play['game_play_id']) == {'2022091100_100', '2022091100_200'}
+
+    snap = df_tracking[(df_tracking['frame_id'] == BALL_SNAP_FID) & (df_tracking['nfl_id'] == 6)]
+    assert snap['offense'].all() and not snap['defense'].any()
+    np.testing.assert_allclose(snap['x'], 25., atol=1e-4)
+    np.testing.assert_allclose(snap['lateral_dist_to_ball'], 0., atol=1e-4)
+
+def test_finalize_tracking_labels_the_line_and_the_motion_player(tmp_path):
+    (df_tracking, df_play, df_game, df_player_play), _ = _tracking_final(tmp_path)
+
+    # the game of the play with two QBs is dropped
+    assert df_game['game_id'].tolist() == [2022091100]
+    assert sorted(df_play['game_play_id']) == ['2022091100_100', '2022091100_200']
+    assert set(df_tracking['game_play_id']) == set(df_play['game_play_id'])
+
+    players = df_tracking.drop_duplicates(['game_play_id', 'nfl_id']).set_index(['game_play_id', 'nfl_id'])
+    play = players.loc['2022091100_100']
+    assert play.loc[[1., 2., 3., 4., 5.], 'position_by_loc'].tolist() == stages.OLINE_LOCATIONS
+    assert play.loc[6., 'position_by_loc'] == 'QB'
+    assert play.index[play['motion_player']].tolist() == [9.]
+    assert not players.loc['2022091100_200', 'motion_player'].any()
+    assert (df_tracking['ball_snap_fid'] == BALL_SNAP_FID).all()
+    assert (df_tracking['last_line_set_fid'] < BALL_SNAP_FID).all()
+
+    # the TE lines up next to the RT
+    assert players.loc[('2022091100_100', 8.), 'extra_on_oline']
+    assert players.loc[('2022091100_100', 8.), 'extra_oline_box_right'] > players.loc[('2022091100_100', 8.), 'oline_box_right']
+
+def test_classify_motion_is_one_row_per_motion_play(tmp_path):
+    tracking_final, _ = _tracking_final(tmp_path)
+
+    df_motion = stages.classify_motion(1, tracking_final)
+
+    assert df_motion['game_play_id'].tolist() == ['2022091100_100']
+    motion = df_motion.iloc[0]
+    assert motion['motion_nfl_id'] == 9
+    assert motion['motion_position'] == 'WR'
+    assert motion['n_direction_changes'] == 0
+    assert motion['same_motion_dir'] == 'right-all'
+    assert motion['pre_snap_motion_dist_traveled'] > 0
+
+def test_classify_motion_on_smoothed_speed(tmp_path):
+    tracking_final, _ = _tracking_final(tmp_path)
+
+    df_motion = stages.classify_motion_frames(tracking_final, speed_window_width=motion.SPEED_WINDOW_WIDTH)
+    df_motion_raw = stages.classify_motion_frames(tracking_final)
+
+    assert df_motion['game_play_id'].unique().tolist() == ['2022091100_100']
+    # the smoothed speed of the jet motion picks up one frame before the raw speed
+    assert df_motion['motion_frame'].sum() == df_motion_raw['motion_frame'].sum() + 1
+
+def test_run_concept_features_mirrors_left_runs(tmp_path):
+    tracking_final, players_path = _tracking_final(tmp_path)
+
+    df_run_concept = stages.run_concept_features(1, tracking_final, players_path).set_index('game_play_id')
+
+    assert df_run_concept.loc['2022091100_100', 'play_dir'] == 'right'
+    assert df_run_concept.loc['2022091100_200', 'play_dir'] == 'left'
+    # the direction of the left run is turned around with the play
+    np.testing.assert_allclose(df_run_concept['rb_dir_post_snap'], [45., 315.])
+    assert df_run_concept.loc['2022091100_100', 'n_pullers_left_of_center'] == 1
+    assert df_run_concept.loc['2022091100_200', 'n_pullers_left_of_center'] == 0
+    assert df_run_concept['shotgun'].tolist() == [1, 0]
+    assert 'dx_oline_1s_after_snap' not in df_run_concept.columns
+    assert (df_run_concept['avg_oline_dx_1s_after_snap'] > 0).all()
+    assert df_run_concept.columns[-3:].tolist() == ['run_concept', 'play_dir', 'play_dir_location']
+
+def test_rb_direction_leaves_out_primary_rb_without_frames_after_snap():
+    frames = np.arange(1, 71)
+    df_tracking = pd.DataFrame({
+        'game_play_id': np.repeat(['2022091100_100', '2022091100_200'], len(frames)),
+        'nfl_id': 7.,
+        'frame_id': np.tile(frames, 2),
+        'dir': 135.,
+        'primary_rb': True,
+        'ball_snap_fid': BALL_SNAP_FID,
+    })
+    # tracking of the second play ends half a second after the snap
+    df_tracking = df_tracking[(df_tracking['game_play_id'] == '2022091100_100') | (df_tracking['frame_id'] <= BALL_SNAP_FID + 5)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        rb_dir = stages.rb_direction(df_tracking)
+
+    assert rb_dir['game_play_id'].tolist() == ['2022091100_100']
+    assert rb_dir['play_dir'].tolist() == ['left']
@@ -1,70 +1,238 @@
 import re
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple
 
 import pandas as pd
 import numpy as np
 
-def standardize_direction(
-        df_tracking: pd.DataFrame,
-        df_play: pd.DataFrame
-    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Standardize the direction of the play and the players to be vertical.
+import schema
 
-    The direction of the play is set to be bottom to top, with the offensive
-    moving from the bottom to the top.
+def _writable_column(
+        df: pd.DataFrame,
+        col: str,
+        downcast: bool = False
+    ) -> np.ndarray:
+    """Get a writable array backed by a column, downcasting it if requested."""
+    if downcast and df[col].dtype != schema.FLOAT_DTYPE:
+        df[col] = df[col].to_numpy(dtype=schema.FLOAT_DTYPE)
+    arr = df[col].to_numpy()
+    if not arr.flags.writeable:
+        arr = arr.copy()
+    return arr
+
+def play_direction_table(df_tracking: pd.DataFrame) -> pd.DataFrame:
+    """Get the direction of each play from the tracking data.
 
     Args:
         df_tracking: The tracking data.
-        df_play: The play data.
 
     Returns:
-        The tracking data and the play data with the direction standardized.
+        DataFrame with one row per play with game_id, play_id and 
+        play_direction columns.
     """
-    
-    left_play = df_tracking['play_direction'] == 'left'
-    
-    original_x = df_tracking['x'].copy()
-    original_y = df_tracking['y'].copy()
-    original_dir = df_tracking['dir'].copy()
-    original_o = df_tracking['o'].copy()
-    
-    df_tracking['y'] = np.where(
-        left_play, 
-        120 - original_x,
-        original_x
-    )
-    df_tracking['x'] = np.where(
-        left_play, 
-        original_y,
-        53.3 - original_y
-    )
-    df_tracking['dir'] = np.where(
-        left_play,
-        (((180 - original_dir) % 360) + 180) % 360,
-        (180 - original_dir) % 360,
-    )
-    df_tracking['o'] = np.where(
-        left_play,
-        (((180 - original_o) % 360) + 180) % 360,
-        (180 - original_o) % 360,
+    return (
+        df_tracking[['game_id','play_id','play_direction']]
+        .drop_duplicates(['game_id','play_id'])
+        .reset_index(drop=True)
     )
 
-    df_play = df_play.merge(
-        df_tracking[['game_id','play_id','play_direction']].drop_duplicates(['game_id','play_id']),
-        on=['game_id','play_id'],
-        how='left'
+def standardize_tracking_direction(
+        df_tracking: pd.DataFrame,
+        chunk_size: int = 1_000_000,
+        downcast: bool = False
+    ) -> pd.DataFrame:
+    """Standardize the direction of the tracking data in place.
+
+    For every row the new coordinates are a sign flip and an offset of the old
+    ones, selected by the play direction. The x, y, dir and o columns are
+    rewritten in place, `chunk_size` rows at a time, so the only temporaries 
+    are a chunk-sized buffer and mask rather than full-length copies.
+
+    Args:
+        df_tracking: The tracking data.
+        chunk_size: Number of rows rewritten at a time. Defaults to 1,000,000.
+        downcast: Convert the coordinate columns to `schema.FLOAT_DTYPE` 
+            first. Defaults to False.
+
+    Returns:
+        The tracking data with the direction standardized.
+    """
+    x = _writable_column(df_tracking, 'x', downcast)
+    y = _writable_column(df_tracking, 'y', downcast)
+    angles = [_writable_column(df_tracking, col, downcast) for col in ['dir', 'o']]
+    play_direction = df_tracking['play_direction']
+
+    n_rows = len(df_tracking)
+    tmp = np.empty(min(chunk_size, n_rows), dtype=x.dtype)
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        left = (play_direction.iloc[start:stop] == 'left').to_numpy()
+        x_chunk, y_chunk, tmp_chunk = x[start:stop], y[start:stop], tmp[:stop - start]
+
+        # left: (x, y) -> (y, 120 - x), right: (x, y) -> (53.3 - y, x)
+        tmp_chunk[:] = x_chunk
+        np.subtract(53.3, y_chunk, out=x_chunk)
+        np.copyto(x_chunk, y_chunk, where=left)
+        y_chunk[:] = tmp_chunk
+        np.subtract(120, tmp_chunk, out=y_chunk, where=left)
+
+        # left: (360 - angle) % 360, right: (180 - angle) % 360
+        for angle in angles:
+            angle_chunk = angle[start:stop]
+            np.subtract(180, angle_chunk, out=angle_chunk)
+            np.add(angle_chunk, 180, out=angle_chunk, where=left)
+            np.mod(angle_chunk, 360, out=angle_chunk)
+
+    for col, arr in zip(['x', 'y', 'dir', 'o'], [x, y] + angles):
+        if not np.shares_memory(df_tracking[col].to_numpy(), arr):
+            df_tracking[col] = arr
+
+    return df_tracking
+
+def standardize_play_direction(
+        df_play: pd.DataFrame,
+        df_play_direction: pd.DataFrame
+    ) -> pd.DataFrame:
+    """Standardize the line of scrimmage of the play data.
+
+    Plays without a direction (no tracking data) are dropped.
+
+    Args:
+        df_play: The play data.
+        df_play_direction: The direction of each play, see 
+            `play_direction_table`.
+
+    Returns:
+        The play data with the direction standardized.
+    """
+    directions = (
+        df_play_direction
+        .drop_duplicates(['game_id','play_id'])
+        .set_index(['game_id','play_id'])['play_direction']
     )
-    df_play = df_play.dropna(subset=['play_direction'])
+    idx = directions.index.get_indexer(pd.MultiIndex.from_frame(df_play[['game_id','play_id']]))
+    df_play = df_play[idx >= 0].copy()
+    left_play = directions.to_numpy()[idx[idx >= 0]] == 'left'
     df_play['absolute_yardline_number'] = np.where(
-        df_play.play_direction == "left", 
+        left_play, 
         120 - df_play.absolute_yardline_number, 
         df_play.absolute_yardline_number
     )
-    
-    df_play = df_play.drop('play_direction', axis=1)
+    return df_play
 
+def standardize_direction(
+        df_tracking: pd.DataFrame,
+        df_play: pd.DataFrame,
+        chunk_size: int = 1_000_000,
+        downcast: bool = False
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Standardize the direction of the play and the players to be vertical.
+
+    The direction of the play is set to be bottom to top, with the offensive
+    moving from the bottom to the top. The tracking data is rewritten in
+    place, see `standardize_tracking_direction`.
+
+    Args:
+        df_tracking: The tracking data.
+        df_play: The play data.
+        chunk_size: Number of tracking rows rewritten at a time. Defaults to 
+            1,000,000.
+        downcast: Convert the coordinate columns to float32. Defaults to False.
+
+    Returns:
+        The tracking data and the play data with the direction standardized.
+    """
+    df_play = standardize_play_direction(df_play, play_direction_table(df_tracking))
+    df_tracking = standardize_tracking_direction(df_tracking, chunk_size, downcast)
     return df_tracking, df_play
 
+def standardize_direction_chunks(
+        tracking_chunks: Iterable[pd.DataFrame],
+        downcast: bool = False
+    ) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Standardize the direction of tracking data as it streams in.
+
+    Args:
+        tracking_chunks: Chunks of tracking data, e.g. from 
+            `pd.read_csv(..., chunksize=...)` or one DataFrame per week.
+        downcast: Convert the coordinate columns to float32. Defaults to False.
+
+    Yields:
+        Each standardized chunk and the direction of its plays. Concatenate 
+        the directions and pass them to `standardize_play_direction` to 
+        standardize the play data.
+    """
+    for chunk in tracking_chunks:
+        df_play_direction = play_direction_table(chunk)
+        chunk = standardize_tracking_direction(chunk, chunk_size=len(chunk) or 1, downcast=downcast)
+        yield chunk, df_play_direction
+
+def segment_starts(*keys: np.ndarray) -> np.ndarray:
+    """Get the start of each run of equal keys in key-sorted arrays.
+
+    Missing keys (NaN or None) are equal to each other, so the rows of the 
+    football (NaN nfl_id, sorted last by `np.lexsort`) form one segment per 
+    play rather than one segment per row.
+
+    Args:
+        keys: Arrays of the same length, e.g. game_play_id and nfl_id, sorted 
+            so that each segment is contiguous.
+
+    Returns:
+        Boolean array which is True at the first row of each segment.
+    """
+    starts = np.zeros(len(keys[0]), dtype=bool)
+    starts[:1] = True
+    for key in keys:
+        key = np.asarray(key)
+        changed = key[1:] != key[:-1]
+        if key.dtype.kind in 'fcO':
+            missing = pd.isna(key)
+            changed &= ~(missing[1:] & missing[:-1])
+        starts[1:] |= changed
+    return starts
+
+def segmented_rolling_mean(
+        values: np.ndarray,
+        starts: np.ndarray,
+        window: int = 3
+    ) -> np.ndarray:
+    """Centered rolling mean which does not cross segment boundaries.
+
+    Equivalent to `groupby(segment).rolling(window, min_periods=1, 
+    center=True).mean()`, computed for all segments at once. NaN values are 
+    skipped.
+
+    Args:
+        values: Values sorted by segment.
+        starts: Boolean array which is True at the first row of each segment,
+            see `segment_starts`.
+        window: Width of the window. Defaults to 3.
+
+    Returns:
+        The smoothed values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    segment_ids = np.cumsum(starts)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.)
+
+    # Add each offset of the window, masking rows which fall in another segment
+    total = np.zeros(len(values))
+    count = np.zeros(len(values))
+    for offset in range(-(window // 2), (window - 1) // 2 + 1):
+        if offset == 0:
+            total += filled
+            count += valid
+            continue
+        src = slice(max(offset, 0), len(values) + min(offset, 0))
+        dst = slice(max(-offset, 0), len(values) + min(-offset, 0))
+        same_segment = segment_ids[src] == segment_ids[dst]
+        total[dst] += np.where(same_segment, filled[src], 0.)
+        count[dst] += same_segment & valid[src]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
 def uncamelcase_columns(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = [re.sub(r'(?<!^)(?=[A-Z])', '_', word).lower() for word in df.columns]
-    return df
\ No newline at end of file
+    return df